@@ -1,5 +1,6 @@
-import openai
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 from typing import Dict, List, Optional
 from models import (
@@ -7,19 +8,45 @@ from models import (
     VSLScript, EmailSequence, SocialContent,
     LanguageEnum
 )
+from instrumentation import OPENAI_REQUEST_SECONDS, OPENAI_TOKENS
+from tracing import CLIENT, span
 
 # Load environment variables
 load_dotenv()
 
+def _analyze_pain_research(pain_research: PainResearch):
+    # pandas is imported on first use, in the worker thread rather than on the event loop
+    from pain_analysis import analyze_pain_research
+    return analyze_pain_research(pain_research)
+
 class OfferForgeAI:
-    def __init__(self):
+    def __init__(self, usage_recorder=None):
+        # Receives every completion's usage (usage_accounting.UsageRecorder)
+        self.usage_recorder = usage_recorder
         api_key = os.getenv('OPENAI_API_KEY')
+        # Point at an OpenAI-compatible server, e.g. tools/fake_openai.py for offline benchmarks
+        base_url = os.getenv('OPENAI_BASE_URL') or None
+        if not api_key and base_url:
+            api_key = 'local'
         if not api_key:
             # Para desenvolvimento local sem API key
             print("⚠️ OPENAI_API_KEY não encontrada - modo desenvolvimento")
-            self.client = None
-        else:
-            self.client = openai.OpenAI(api_key=api_key)
+        self._api_key = api_key
+        self._base_url = base_url
+        self._client = None
+    
+    @property
+    def client(self):
+        """OpenAI client, created on first use: importing openai takes about half a second"""
+        
+        if self._client is None and self._api_key:
+            import openai
+            self._client = openai.OpenAI(api_key=self._api_key, base_url=self._base_url)
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
         
     async def generate_offer(
         self, 
@@ -38,16 +65,14 @@ class OfferForgeAI:
         avatar_context = f"Avatar targeting, price point: {brief.currency} {brief.target_price}"
         promise_context = brief.promise
         
-        # Compile pain points
-        pain_points = []
-        for pain in pain_research.pain_points:
-            pain_points.extend([pain.description] * pain.frequency)
-        
-        pain_context = ", ".join(pain_points[:10])  # Top 10 most frequent pains
+        # Distinct pains ranked by total frequency (manual points + CSV upload);
+        # pandas work runs off the event loop, CSVs can have tens of thousands of rows
+        analysis = await asyncio.to_thread(_analyze_pain_research, pain_research)
+        pain_context = ", ".join(pain.description for pain in analysis.top_pains)  # Top 10 most frequent pains
         
-        # Additional context from reviews and FAQs
-        reviews_context = " | ".join(pain_research.reviews[:5]) if pain_research.reviews else ""
-        faqs_context = " | ".join(pain_research.faqs[:5]) if pain_research.faqs else ""
+        # Additional context from reviews and FAQs (distinct, most repeated first)
+        reviews_context = " | ".join(analysis.reviews)
+        faqs_context = " | ".join(analysis.faqs)
         
         # Language-specific prompts
         prompts = self._get_language_prompts(language)
@@ -60,7 +85,8 @@ class OfferForgeAI:
                 pain_context=pain_context
             )
             
-            headline_response = self.client.chat.completions.create(
+            headline_response = self._complete(
+                "headline",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -79,7 +105,8 @@ class OfferForgeAI:
                 reviews=reviews_context
             )
             
-            proof_response = self.client.chat.completions.create(
+            proof_response = self._complete(
+                "proof",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -102,7 +129,8 @@ class OfferForgeAI:
                 target_price=brief.target_price
             )
             
-            bonus_response = self.client.chat.completions.create(
+            bonus_response = self._complete(
+                "bonus",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -125,7 +153,8 @@ class OfferForgeAI:
                 currency=brief.currency
             )
             
-            guarantee_response = self.client.chat.completions.create(
+            guarantee_response = self._complete(
+                "guarantee",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -149,7 +178,8 @@ class OfferForgeAI:
                 bonuses=", ".join(bonuses[:2])
             )
             
-            price_response = self.client.chat.completions.create(
+            price_response = self._complete(
+                "price",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -199,7 +229,8 @@ class OfferForgeAI:
                 duration=duration
             )
             
-            vsl_response = self.client.chat.completions.create(
+            vsl_response = self._complete(
+                "vsl",
                 model="gpt-4", 
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -250,7 +281,8 @@ class OfferForgeAI:
                 guarantee=offer.guarantees[0] if offer.guarantees else "Garantia"
             )
             
-            email_response = self.client.chat.completions.create(
+            email_response = self._complete(
+                "email",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -306,7 +338,8 @@ class OfferForgeAI:
                 promise=offer.main_promise
             )
             
-            social_response = self.client.chat.completions.create(
+            social_response = self._complete(
+                "social",
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": prompts["system"]},
@@ -339,6 +372,37 @@ class OfferForgeAI:
         except Exception as e:
             raise Exception(f"Social content generation failed: {str(e)}")
     
+    def _complete(self, operation: str, **request):
+        """One chat completion, timed per generation step for /metrics and
+        recorded with its token usage for cost accounting"""
+        
+        model = request.get("model", "")
+        started = time.perf_counter()
+        response = None
+        with span(f"openai.chat {operation}", CLIENT, **{
+            "gen_ai.system": "openai",
+            "gen_ai.operation.name": "chat",
+            "gen_ai.request.model": model,
+            "gen_ai.request.max_tokens": request.get("max_tokens"),
+            "offerforge.prompt_kind": operation
+        }) as completion_span:
+            try:
+                response = self.client.chat.completions.create(**request)
+                return response
+            finally:
+                latency = time.perf_counter() - started
+                outcome = "ok" if response is not None else "error"
+                OPENAI_REQUEST_SECONDS.labels(operation, model, outcome).observe(latency)
+                
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    OPENAI_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+                    OPENAI_TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+                    completion_span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_tokens)
+                    completion_span.set_attribute("gen_ai.usage.output_tokens", usage.completion_tokens)
+                if self.usage_recorder is not None:
+                    self.usage_recorder.record(operation, model, latency, usage, outcome)
+    
     def _get_language_prompts(self, language: LanguageEnum) -> Dict[str, str]:
         """Get language-specific prompts"""
         
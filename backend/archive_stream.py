@@ -0,0 +1,209 @@
+import os
+import re
+import time
+import unicodedata
+import zipfile
+import zlib
+from pathlib import PurePosixPath
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from tracing import span
+
+# Bytes buffered before a chunk is handed to the response stream
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Speed/size trade-off for export archives: "speed", "balanced" or "size"
+EXPORT_COMPRESSION_PROFILE = os.getenv('EXPORT_COMPRESSION_PROFILE', 'balanced')
+
+COMPRESSION_PROFILES = {
+    # level: DEFLATE level; min_saving: fraction the probe must save for a binary entry to be deflated
+    'speed': {'level': 1, 'min_saving': 0.30},
+    'balanced': {'level': 4, 'min_saving': 0.20},
+    'size': {'level': 9, 'min_saving': 0.02}
+}
+
+# Text formats we generate always deflate well
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.json', '.md', '.txt', '.csv'}
+
+# Entries below this size are stored as-is: deflate cannot save enough to matter
+MIN_COMPRESS_SIZE = 256
+
+# The probe compresses PROBE_WINDOWS windows of PROBE_WINDOW bytes at level 1
+PROBE_WINDOW = 2 * 1024
+PROBE_WINDOWS = 8
+
+# Characters never kept in an archive path component: separators and the
+# characters Windows refuses in file names
+UNSAFE_NAME_CHARS = re.compile(r'[/\\:*?"<>|\s]')
+# Longest path component made from a user-controlled name
+MAX_NAME_LENGTH = 100
+
+# Content is a str/bytes, or an iterable of byte chunks for entries written as
+# they are produced (e.g. a streamed JSON document)
+ArchiveEntry = Tuple[str, Union[str, bytes, Iterable[bytes]]]
+
+
+def safe_entry_name(name: Optional[str], default: str = 'OfferForge_Project') -> str:
+    """One archive path component from a user-controlled name (a project name):
+    no separators or control characters, no leading dots ("..", ".hidden"), never empty"""
+    
+    name = ''.join(
+        '_' if unicodedata.category(char).startswith('C') else char
+        for char in unicodedata.normalize('NFC', name or '')
+    )
+    name = UNSAFE_NAME_CHARS.sub('_', name).lstrip('.')[:MAX_NAME_LENGTH].rstrip('.')
+    return name if name.strip('_') else default
+
+
+class CompressionPolicy:
+    """Picks STORED or DEFLATED (and a level) for each archive entry from its
+    file type and, for binary content, a quick compressibility probe"""
+    
+    def __init__(self, profile: str = EXPORT_COMPRESSION_PROFILE):
+        if profile not in COMPRESSION_PROFILES:
+            raise ValueError(f"Unknown compression profile: {profile}. Supported: {', '.join(COMPRESSION_PROFILES)}")
+        self.profile = profile
+        self.level = COMPRESSION_PROFILES[profile]['level']
+        self.min_saving = COMPRESSION_PROFILES[profile]['min_saving']
+    
+    def choose(self, name: str, data: bytes) -> Tuple[int, Optional[int]]:
+        """Return (compress_type, compresslevel) for an entry"""
+        
+        if len(data) < MIN_COMPRESS_SIZE:
+            return zipfile.ZIP_STORED, None
+        
+        if PurePosixPath(name).suffix.lower() in TEXT_EXTENSIONS:
+            return zipfile.ZIP_DEFLATED, self.level
+        
+        # Binary or unknown content (PDF, images...): only deflate if it pays off
+        if self.estimate_saving(data) < self.min_saving:
+            return zipfile.ZIP_STORED, None
+        
+        return zipfile.ZIP_DEFLATED, self.level
+    
+    def choose_streamed(self, name: str) -> Tuple[int, Optional[int]]:
+        """Return (compress_type, compresslevel) for an entry whose content is not known up front"""
+        
+        # Nothing to probe: text formats are deflated, anything else stored
+        if PurePosixPath(name).suffix.lower() in TEXT_EXTENSIONS:
+            return zipfile.ZIP_DEFLATED, self.level
+        return zipfile.ZIP_STORED, None
+    
+    def estimate_saving(self, data: bytes) -> float:
+        """Fraction of bytes a fast deflate saves on evenly spaced sample windows"""
+        
+        if len(data) <= PROBE_WINDOW * PROBE_WINDOWS:
+            sample = data
+        else:
+            # Windows are centred in each stride so headers and trailers (e.g. a
+            # PDF's object table) do not dominate the estimate
+            stride = len(data) // PROBE_WINDOWS
+            offset = (stride - PROBE_WINDOW) // 2
+            sample = b''.join(
+                data[i * stride + offset:i * stride + offset + PROBE_WINDOW]
+                for i in range(PROBE_WINDOWS)
+            )
+        
+        return 1 - len(zlib.compress(sample, 1)) / len(sample)
+
+
+def _zip_info(name: str) -> zipfile.ZipInfo:
+    zip_info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+    zip_info.external_attr = 0o600 << 16
+    return zip_info
+
+
+def write_entry(zip_file: zipfile.ZipFile, name: str, data: Union[str, bytes], policy: CompressionPolicy):
+    """Write one entry with the compression chosen by the policy"""
+    
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    
+    with span('zip.write_entry', **{'zip.entry': name, 'zip.entry.size': len(data)}):
+        compress_type, compresslevel = policy.choose(name, data)
+        zip_file.writestr(_zip_info(name), data, compress_type=compress_type, compresslevel=compresslevel)
+
+
+def open_archive(file: IO[bytes], policy: CompressionPolicy) -> zipfile.ZipFile:
+    """ZipFile for writing export entries; its level is the one streamed entries get"""
+    
+    return zipfile.ZipFile(file, 'w', zipfile.ZIP_DEFLATED, compresslevel=policy.level)
+
+
+def open_entry(zip_file: zipfile.ZipFile, name: str, policy: CompressionPolicy) -> IO[bytes]:
+    """Open an entry for writing when its content is produced in chunks;
+    zip_file must come from open_archive() with the same policy"""
+    
+    compress_type, compresslevel = policy.choose_streamed(name)
+    if compress_type == zipfile.ZIP_STORED:
+        zip_info = _zip_info(name)
+        zip_info.compress_type = zipfile.ZIP_STORED
+        return zip_file.open(zip_info, 'w')
+    
+    # ZipInfo has no public compression level before Python 3.13; opened by
+    # name, the entry takes the archive's compression and compresslevel
+    if (zip_file.compression, zip_file.compresslevel) != (compress_type, compresslevel):
+        raise ValueError(f"Archive not opened for {policy.profile} compression, use open_archive()")
+    return zip_file.open(name, 'w')
+
+
+class ChunkSink:
+    """Write-only file object that collects what ZipFile writes until it is drained"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def build_zip(entries: Iterable[ArchiveEntry], policy: Optional[CompressionPolicy] = None) -> bytes:
+    """Write entries into an in-memory ZIP archive and return its bytes"""
+    
+    return b''.join(stream_zip(entries, policy=policy, chunk_size=0))
+
+
+def stream_zip(
+    entries: Iterable[ArchiveEntry],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    policy: Optional[CompressionPolicy] = None
+) -> Iterator[bytes]:
+    """Write entries into a ZIP archive and yield the archive bytes as they are produced.
+    
+    The sink is not seekable, so ZipFile writes each entry with a data descriptor
+    and only the entry being compressed is held in memory; chunked entries are
+    drained while they are written.
+    """
+    
+    policy = policy or CompressionPolicy()
+    sink = ChunkSink()
+    
+    with open_archive(sink, policy) as zip_file:
+        for name, data in entries:
+            if isinstance(data, (str, bytes)):
+                write_entry(zip_file, name, data, policy)
+            else:
+                with open_entry(zip_file, name, policy) as entry:
+                    for chunk in data:
+                        entry.write(chunk)
+                        if chunk_size and sink.size >= chunk_size:
+                            yield sink.drain()
+            if chunk_size and sink.size >= chunk_size:
+                yield sink.drain()
+    
+    # Remaining entries plus the central directory written on close
+    tail = sink.drain()
+    if tail:
+        yield tail
@@ -0,0 +1,146 @@
+"""
+Multi-project export: every project of a user in one streamed ZIP archive.
+Projects are read from MongoDB with a cursor and rendered at most
+BATCH_EXPORT_CONCURRENCY at a time (the PDF goes through the export cache and
+worker pool); each project's files are written to the archive as soon as its
+render finishes, so memory depends on the concurrency, not on the number of
+projects.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import zipfile
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from archive_stream import STREAM_CHUNK_SIZE, ChunkSink, open_archive, open_entry, safe_entry_name, write_entry
+from export_pool import when_pool_free
+
+logger = logging.getLogger(__name__)
+
+# Projects rendered at the same time for one multi-project export
+BATCH_EXPORT_CONCURRENCY = int(os.getenv('BATCH_EXPORT_CONCURRENCY', '2'))
+
+# render_pdf(project) -> PDF bytes
+RenderPdf = Callable[[Dict[str, Any]], Awaitable[bytes]]
+
+
+class BatchExporter:
+    """Streams the export packages of many projects as a single ZIP archive"""
+    
+    def __init__(
+        self,
+        export_service,
+        render_pdf: RenderPdf,
+        concurrency: int = BATCH_EXPORT_CONCURRENCY,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ):
+        self.export_service = export_service
+        self.render_pdf = render_pdf
+        self.concurrency = max(1, concurrency)
+        self.chunk_size = chunk_size
+    
+    async def iter_archive(self, cursor, include_pdf: bool = True) -> AsyncIterator[bytes]:
+        """Yield the archive bytes for every project the cursor returns.
+        
+        Projects are written in the order their renders finish, each under its
+        own folder; export_summary.json at the end lists what was exported and
+        which projects failed (a failed project does not abort the archive).
+        """
+        
+        sink = ChunkSink()
+        zip_file = open_archive(sink, self.export_service.compression_policy)
+        projects = cursor.__aiter__()
+        pending: Set[asyncio.Task] = set()
+        folders: Set[str] = set()
+        summary = {'exported': [], 'failed': []}
+        exhausted = False
+        
+        try:
+            while True:
+                # Only read the next project from the cursor when a render slot is free
+                while not exhausted and len(pending) < self.concurrency:
+                    project = await anext(projects, None)
+                    if project is None:
+                        exhausted = True
+                    else:
+                        pending.add(asyncio.create_task(self._render(project, include_pdf)))
+                
+                if not pending:
+                    break
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    project, pdf_bytes, error = task.result()
+                    if error:
+                        summary['failed'].append({'id': str(project['_id']), 'name': project.get('name'), 'error': error})
+                        continue
+                    
+                    folder = self._folder_for(project, folders)
+                    # Compression runs off the event loop; only this project's output is buffered
+                    await asyncio.to_thread(self._write_project, zip_file, project, pdf_bytes, folder, include_pdf)
+                    summary['exported'].append({'id': str(project['_id']), 'name': project.get('name'), 'folder': folder})
+                    
+                    if sink.size >= self.chunk_size:
+                        yield sink.drain()
+            
+            summary_json = json.dumps(summary, ensure_ascii=False, indent=2)
+            write_entry(zip_file, 'export_summary.json', summary_json, self.export_service.compression_policy)
+            # Writes the central directory
+            zip_file.close()
+            yield sink.drain()
+        finally:
+            # Client went away (or an error): stop rendering projects nobody will receive
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _render(self, project: Dict[str, Any], include_pdf: bool):
+        """(project, pdf_bytes, error) - errors are reported, not raised"""
+        
+        if not include_pdf:
+            return project, None, None
+        try:
+            return project, await when_pool_free(self.render_pdf, project), None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Batch export of project {project.get('_id')} failed: {str(e)}")
+            return project, None, str(e) or e.__class__.__name__
+    
+    def _write_project(
+        self,
+        zip_file: zipfile.ZipFile,
+        project: Dict[str, Any],
+        pdf_bytes: Optional[bytes],
+        folder: str,
+        include_pdf: bool
+    ):
+        policy = self.export_service.compression_policy
+        entries = self.export_service.iter_package_entries(
+            project,
+            include_landing_page=True,
+            include_pdf=include_pdf,
+            include_json=True,
+            pdf_bytes=pdf_bytes,
+            folder=folder
+        )
+        for name, data in entries:
+            if isinstance(data, (str, bytes)):
+                write_entry(zip_file, name, data, policy)
+            else:
+                with open_entry(zip_file, name, policy) as entry:
+                    for chunk in data:
+                        entry.write(chunk)
+    
+    @staticmethod
+    def _folder_for(project: Dict[str, Any], used: Set[str]) -> str:
+        """Project folder in the archive; projects sharing a name get their ID appended"""
+        
+        folder = safe_entry_name(project.get('name'))
+        if folder in used:
+            folder = f"{folder}_{project['_id']}"
+        used.add(folder)
+        return folder
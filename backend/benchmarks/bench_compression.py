@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Export archive compression benchmark
+Compares the old "ZIP_DEFLATED for every entry" package build with the
+per-entry CompressionPolicy profiles: CPU time to write the archive and
+resulting size. The PDF is rendered once up front so only archive work is timed.
+
+Usage (from backend/):
+    python benchmarks/bench_compression.py --size huge --repeat 20
+"""
+
+import argparse
+import io
+import statistics
+import time
+import zipfile
+
+from fixtures import make_project
+
+from archive_stream import COMPRESSION_PROFILES, CompressionPolicy, build_zip
+from export_service import ExportService
+
+
+def deflate_everything(entries) -> bytes:
+    """Package build before per-entry policies: one DEFLATE level for all entries"""
+    
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name, data in entries:
+            zip_file.writestr(name, data)
+    return buffer.getvalue()
+
+
+def measure(build, repeat: int):
+    cpu_times = []
+    for _ in range(repeat):
+        started = time.process_time()
+        archive = build()
+        cpu_times.append(time.process_time() - started)
+    return statistics.median(cpu_times), len(archive)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export archive compression")
+    parser.add_argument('--size', default='huge', choices=['small', 'medium', 'huge'])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    
+    service = ExportService()
+    project = make_project(args.size)
+    pdf_bytes = service.render_project_pdf(project)
+    entries = list(service.iter_package_entries(project, pdf_bytes=pdf_bytes))
+    
+    print(f"📦 Export archive compression ({args.size} project, {len(entries)} entries, "
+          f"PDF {len(pdf_bytes) / 1024:.0f} KiB, median of {args.repeat})")
+    
+    baseline_cpu, baseline_size = measure(lambda: deflate_everything(entries), args.repeat)
+    print(f"   {'deflate-all (before)':<22} {baseline_cpu * 1000:8.2f} ms CPU {baseline_size / 1024:9.1f} KiB")
+    
+    for profile in COMPRESSION_PROFILES:
+        policy = CompressionPolicy(profile)
+        cpu, size = measure(lambda: build_zip(entries, policy=policy), args.repeat)
+        change = (cpu - baseline_cpu) / baseline_cpu * 100
+        print(f"   {'policy: ' + profile:<22} {cpu * 1000:8.2f} ms CPU {size / 1024:9.1f} KiB  ({change:+.0f}% CPU)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Pain research ranking benchmark
+Compares the old prompt context (pain points expanded by their frequency and
+the first 10 kept) with pain_analysis on a CSV upload: CPU time, peak memory
+and how many of the 10 prompt slots hold distinct pains.
+
+Usage (from backend/):
+    python benchmarks/bench_pain.py --rows 50000
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from fixtures import make_pain_csv
+
+from models import PainPoint, PainResearch
+from pain_analysis import analyze_pain_research, read_pain_csv
+
+
+def expand_by_frequency(pain_research: PainResearch):
+    """Prompt context before pain_analysis (CSV rows as pain points)"""
+    
+    pain_points = []
+    for pain in pain_research.pain_points:
+        pain_points.extend([pain.description] * pain.frequency)
+    return pain_points[:10]
+
+
+def measure(run, repeat: int):
+    cpu_times = []
+    for _ in range(repeat):
+        started = time.process_time()
+        result = run()
+        cpu_times.append(time.process_time() - started)
+    
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(cpu_times), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pain research ranking")
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--distinct', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    csv_data = make_pain_csv(args.rows, args.distinct)
+    rows = read_pain_csv(csv_data)
+    legacy = PainResearch(pain_points=[
+        PainPoint(description=row.description, frequency=row.frequency, source='csv')
+        for row in rows.itertuples(index=False)
+    ])
+    
+    print(f"🔎 Pain research ranking ({args.rows} CSV rows, {args.distinct} distinct pains, "
+          f"{int(rows['frequency'].sum())} total mentions, median of {args.repeat})")
+    
+    cpu, peak, top = measure(lambda: expand_by_frequency(legacy), args.repeat)
+    print(f"   {'expand by frequency (before)':<30} {cpu * 1000:8.2f} ms CPU {peak / 1024 / 1024:7.1f} MiB peak  "
+          f"{len(set(top))}/10 distinct")
+    
+    research = PainResearch(csv_data=csv_data)
+    cpu, peak, analysis = measure(lambda: analyze_pain_research(research), args.repeat)
+    print(f"   {'pain_analysis (CSV parse incl.)':<30} {cpu * 1000:8.2f} ms CPU {peak / 1024 / 1024:7.1f} MiB peak  "
+          f"{len(analysis.top_pains)}/10 distinct")
+
+
+if __name__ == '__main__':
+    main()
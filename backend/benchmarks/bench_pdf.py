@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Project PDF rendering benchmark
+Renders the project report repeatedly and reports pages per second. The
+default "small" fixture is the standard generation output: 5 e-mails and
+6 social posts with one paragraph each.
+
+--regenerate changes one section before every render (as a partial
+regeneration would), so only that section misses the section cache;
+--no-cache renders every section from scratch.
+
+Usage (from backend/):
+    python benchmarks/bench_pdf.py --size small --repeat 50
+    python benchmarks/bench_pdf.py --size huge --regenerate social
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+from fixtures import make_project
+
+from export_service import ExportService
+from pdf_story import SectionCache
+
+PAGE_OBJECT = re.compile(rb'/Type /Page\b(?!s)')
+
+
+def count_pages(pdf_bytes: bytes) -> int:
+    """Number of page objects in an uncompressed-xref ReportLab PDF"""
+    
+    return len(PAGE_OBJECT.findall(pdf_bytes))
+
+
+def regenerate(project, section: str, run: int):
+    """Change one section of the project, as regenerating it would"""
+    
+    materials = project['materials']
+    if section == 'social':
+        materials['social_content'][0]['content'] = f"Post regenerado {run}"
+    elif section == 'emails':
+        materials['email_sequence']['emails'][0]['content'] = f"E-mail regenerado {run}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project PDF rendering")
+    parser.add_argument('--size', default='small', choices=['small', 'medium', 'huge'])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--regenerate', choices=['social', 'emails'], help="section changed before each render")
+    parser.add_argument('--no-cache', action='store_true', help="disable the section cache")
+    args = parser.parse_args()
+    
+    project = make_project(args.size)
+    materials = project['materials']
+    
+    # Service construction is part of a cold export in a fresh pool worker;
+    # CPU time is reported, rendering never waits on I/O
+    started = time.process_time()
+    service = ExportService(section_cache=SectionCache(0) if args.no_cache else None)
+    construct_ms = (time.process_time() - started) * 1000
+    
+    pages = count_pages(service.render_project_pdf(project))
+    
+    cpu_times = []
+    for run in range(args.repeat):
+        if args.regenerate:
+            regenerate(project, args.regenerate, run)
+        started = time.process_time()
+        service.render_project_pdf(project)
+        cpu_times.append(time.process_time() - started)
+    
+    median_s = statistics.median(cpu_times)
+    
+    print(f"📄 Project PDF ({args.size} project: {len(materials['email_sequence']['emails'])} e-mails, "
+          f"{len(materials['social_content'])} social posts, {pages} pages, median of {args.repeat})")
+    print(f"   section cache:    {'off' if args.no_cache else 'on'}, "
+          f"regenerated: {args.regenerate or 'nothing'}")
+    print(f"   ExportService():  {construct_ms:8.2f} ms")
+    print(f"   render:           {median_s * 1000:8.2f} ms CPU per PDF "
+          f"(min {min(cpu_times) * 1000:.2f} ms, max {max(cpu_times) * 1000:.2f} ms)")
+    print(f"   throughput:       {pages / median_s:8.1f} pages/s")
+
+
+if __name__ == '__main__':
+    main()
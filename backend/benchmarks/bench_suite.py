@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Render and export microbenchmark suite with regression gates
+Times the CPU-bound hot paths of landing_generator and export_service over
+the small, medium and huge fixtures: median CPU time (repeated until
+--min-time is spent) and peak traced memory (one separate run, since
+tracemalloc slows the code it traces).
+
+--save writes the results as a JSON baseline; --compare checks them against a
+baseline and exits with status 1 when a case got slower or used more memory
+than the thresholds allow. Baselines are only comparable on the same machine
+and Python version, so save one from the base branch on the runner that
+compares.
+
+Usage (from backend/):
+    python benchmarks/bench_suite.py --save benchmarks/baselines/local.json
+    python benchmarks/bench_suite.py --compare benchmarks/baselines/local.json
+    python benchmarks/bench_suite.py --filter export.pdf --sizes huge
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fixtures import PROJECT_SIZES, make_offer_and_brief, make_project
+
+from export_service import ExportService
+from landing_generator import LandingPageGenerator
+from models import LanguageEnum
+from template_registry import TEMPLATES_DIR
+
+SUITE_VERSION = 1
+
+# (setup, run): setup is not timed and runs before every measured call
+Case = Tuple[Optional[Callable[[], None]], Callable[[], object]]
+
+
+def build_cases(size: str) -> Dict[str, Case]:
+    """Benchmark cases for one fixture size"""
+    
+    project = make_project(size)
+    offer, brief = make_offer_and_brief(size)
+    generator = LandingPageGenerator()
+    service = ExportService()
+    
+    template_source = (TEMPLATES_DIR / 'mobile_modern' / 'index.html').read_text(encoding='utf-8')
+    template_vars = generator._get_offer_vars(offer, brief)
+    template_vars.update(generator._get_language_vars(LanguageEnum.PT_BR))
+    
+    landing_page = generator.generate_landing_page(offer, brief)
+    project_name = project['name'].replace(' ', '_')
+    
+    # PDF cases start from an empty section cache, like the first export of a project
+    clear_sections = service.section_cache.clear
+    
+    return {
+        'landing.generate_landing_page': (None, lambda: generator.generate_landing_page(offer, brief)),
+        'landing._replace_template_vars': (None, lambda: generator._replace_template_vars(template_source, template_vars)),
+        'landing.generate_zip_export': (None, lambda: generator.generate_zip_export(landing_page, project_name)),
+        'export.export_project_pdf': (clear_sections, lambda: service.export_project_pdf(project)),
+        'export.export_materials_json': (None, lambda: service.export_materials_json(project)),
+        'export.create_complete_export_package': (clear_sections, lambda: service.create_complete_export_package(project))
+    }
+
+
+def measure(case: Case, min_time: float, min_repeat: int, max_repeat: int) -> Dict[str, float]:
+    """Median/min CPU time in ms and peak traced memory in KiB"""
+    
+    setup, run = case
+    
+    # Warm-up: imports, template compilation, lazily built styles
+    if setup:
+        setup()
+    run()
+    
+    cpu_times: List[float] = []
+    while len(cpu_times) < max_repeat and (len(cpu_times) < min_repeat or sum(cpu_times) < min_time):
+        if setup:
+            setup()
+        started = time.process_time()
+        run()
+        cpu_times.append(time.process_time() - started)
+    
+    if setup:
+        setup()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    return {
+        'median_ms': statistics.median(cpu_times) * 1000,
+        'min_ms': min(cpu_times) * 1000,
+        'runs': len(cpu_times),
+        'peak_kib': peak / 1024
+    }
+
+
+def environment() -> Dict[str, object]:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count()
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, object],
+    time_threshold: float,
+    memory_threshold: float,
+    min_delta_ms: float
+) -> List[str]:
+    """Print the comparison and return the regressed cases"""
+    
+    if baseline.get('environment') != environment():
+        print("⚠️  Baseline was recorded on a different machine or Python version; "
+              "differences may not be regressions")
+    
+    regressions = []
+    print(f"   {'case':<48} {'base ms':>9} {'now ms':>9} {'Δ time':>8} {'base KiB':>9} {'now KiB':>9} {'Δ mem':>7}")
+    for name, current in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f"   {name:<48} {'':>9} {current['median_ms']:>9.2f} {'new':>8}")
+            continue
+        
+        time_change = current['median_ms'] / previous['median_ms'] - 1 if previous['median_ms'] else 0.0
+        memory_change = current['peak_kib'] / previous['peak_kib'] - 1 if previous['peak_kib'] else 0.0
+        # Cases of a few tenths of a millisecond are too noisy for a relative threshold alone
+        slower = time_change > time_threshold and current['median_ms'] - previous['median_ms'] > min_delta_ms
+        bigger = memory_change > memory_threshold
+        
+        flag = '  ❌' if slower or bigger else ''
+        if slower or bigger:
+            regressions.append(name)
+        print(f"   {name:<48} {previous['median_ms']:>9.2f} {current['median_ms']:>9.2f} {time_change * 100:>+7.1f}% "
+              f"{previous['peak_kib']:>9.1f} {current['peak_kib']:>9.1f} {memory_change * 100:>+6.1f}%{flag}")
+    
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render/export microbenchmarks with baseline comparison")
+    parser.add_argument('--sizes', default=','.join(PROJECT_SIZES), help="comma-separated fixture sizes")
+    parser.add_argument('--filter', default='', help="only cases whose name contains this")
+    parser.add_argument('--min-time', type=float, default=0.3, help="CPU seconds to spend per case")
+    parser.add_argument('--min-repeat', type=int, default=5)
+    parser.add_argument('--max-repeat', type=int, default=500)
+    parser.add_argument('--save', help="write the results to this baseline file")
+    parser.add_argument('--compare', help="baseline file to compare against")
+    parser.add_argument('--time-threshold', type=float, default=0.15, help="allowed median CPU time increase (0.15 = 15%%)")
+    parser.add_argument('--memory-threshold', type=float, default=0.10, help="allowed peak memory increase")
+    parser.add_argument('--min-delta-ms', type=float, default=0.1, help="ignore time increases smaller than this")
+    args = parser.parse_args()
+    
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in PROJECT_SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"⏱️  Render/export suite (sizes: {', '.join(sizes)}, ≥{args.min_time:g}s CPU per case)")
+    print(f"   {'case':<48} {'median ms':>10} {'min ms':>9} {'runs':>5} {'peak KiB':>10}")
+    for size in sizes:
+        for name, case in build_cases(size).items():
+            if args.filter not in name:
+                continue
+            key = f"{name}[{size}]"
+            results[key] = measure(case, args.min_time, args.min_repeat, args.max_repeat)
+            stats = results[key]
+            print(f"   {key:<48} {stats['median_ms']:>10.2f} {stats['min_ms']:>9.2f} {stats['runs']:>5} {stats['peak_kib']:>10.1f}")
+    
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            'suite_version': SUITE_VERSION,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': environment(),
+            'results': results
+        }, indent=2))
+        print(f"💾 Baseline saved to {path}")
+    
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get('suite_version') != SUITE_VERSION:
+            print(f"❌ Baseline is from suite version {baseline.get('suite_version')}, expected {SUITE_VERSION}")
+            sys.exit(2)
+        
+        print(f"📊 Compared with {args.compare} ({baseline.get('recorded_at')}; "
+              f"limits +{args.time_threshold * 100:g}% time, +{args.memory_threshold * 100:g}% memory)")
+        regressions = compare(results, baseline, args.time_threshold, args.memory_threshold, args.min_delta_ms)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Deterministic project fixtures for the export and render benchmarks.
+Projects are plain dicts shaped like the documents stored in MongoDB.
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# name -> (paragraphs per email, emails, social posts, list items per offer section)
+PROJECT_SIZES = {
+    'small': (1, 5, 6, 3),
+    'medium': (6, 5, 6, 5),
+    'huge': (60, 40, 30, 20)
+}
+
+# Copy is generated from a fixed vocabulary with a seeded RNG, so it compresses
+# like real prose instead of like one sentence repeated
+VOCABULARY = (
+    "você resultado método rotina semana treino dieta energia corpo saúde peso meta plano simples "
+    "rápido garantia bônus oferta desconto hoje agora exclusivo limitado acesso comunidade suporte "
+    "aula vídeo guia receita lista desafio progresso hábito sono água proteína força foco disciplina "
+    "transformação depoimento aluno cliente mulher homem família trabalho tempo dinheiro investimento "
+    "valor preço parcela cartão pix segurança confiança prova ciência estudo especialista nutricionista "
+    "personal academia casa manhã noite minuto dia mês ano primeiro segundo último melhor maior menor "
+    "fácil difícil possível real verdadeiro novo antigo certo errado começar continuar terminar mudar "
+    "aprender descobrir conquistar perder ganhar manter sentir viver cuidar escolher decidir confiar"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 18))]
+    return ' '.join(words).capitalize() + rng.choice(['.', '.', '!', '?'])
+
+
+def _paragraphs(count: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return '\n'.join(' '.join(_sentence(rng) for _ in range(rng.randint(3, 6))) for _ in range(count))
+
+
+def make_project(size: str = 'medium') -> Dict[str, Any]:
+    """Build a realistic project document of the given size"""
+    
+    paragraphs, email_count, post_count, list_items = PROJECT_SIZES[size]
+    
+    offer = {
+        'headline': "Emagreça 5kg em 30 dias sem abrir mão do que você gosta",
+        'main_promise': "Perder peso com um plano simples, sem dietas malucas",
+        'proof_elements': [f"Prova social {i}: {_paragraphs(1, 100 + i)}" for i in range(list_items)],
+        'bonuses': [f"Bônus {i}: guia prático com receitas e treinos" for i in range(list_items)],
+        'guarantees': [f"Garantia {i}: 30 dias ou seu dinheiro de volta" for i in range(max(3, list_items // 2))],
+        'price_justification': _paragraphs(2, 200),
+        'urgency_elements': ["Oferta válida apenas por 48 horas", "Apenas 50 vagas disponíveis"]
+    }
+    
+    return {
+        '_id': f"bench-{size}",
+        'name': f"Projeto Benchmark {size}",
+        'user_id': 'bench-user',
+        'language': 'pt-BR',
+        'status': 'materials_generated',
+        'brief': {
+            'niche': 'fitness',
+            'avatar_id': 'avatar-1',
+            'promise': offer['main_promise'],
+            'target_price': 197.0,
+            'currency': 'BRL'
+        },
+        'generated_offer': offer,
+        'materials': {
+            'vsl_script': {
+                'title': offer['headline'],
+                'hook': _paragraphs(paragraphs, 1),
+                'problem_agitation': _paragraphs(paragraphs, 2),
+                'solution_intro': _paragraphs(paragraphs, 3),
+                'benefits': offer['proof_elements'][:3],
+                'social_proof': _paragraphs(paragraphs, 4),
+                'offer_presentation': _paragraphs(paragraphs, 5),
+                'guarantee': offer['guarantees'][0],
+                'call_to_action': "Clique agora e comece hoje mesmo!",
+                'estimated_duration': 90,
+                'language': 'pt-BR'
+            },
+            'email_sequence': {
+                'sequence_name': 'Sequência fitness',
+                'emails': [
+                    {'subject': f"E-mail {i + 1}: o segredo que ninguém conta", 'content': _paragraphs(paragraphs, 10 + i)}
+                    for i in range(email_count)
+                ],
+                'language': 'pt-BR'
+            },
+            'social_content': [
+                {
+                    'platform': ['instagram', 'facebook', 'linkedin'][i % 3],
+                    'content_type': 'post',
+                    'content': f"Hook {i + 1}: {_paragraphs(1, 300 + i)}",
+                    'hashtags': ['#fitness', '#oferta', '#limitado'],
+                    'language': 'pt-BR'
+                }
+                for i in range(post_count)
+            ]
+        }
+    }
+
+
+def make_offer_and_brief(size: str = 'medium'):
+    """GeneratedOffer and ProductBrief models for landing page rendering"""
+    
+    from models import GeneratedOffer, ProductBrief
+    
+    project = make_project(size)
+    return GeneratedOffer(**project['generated_offer']), ProductBrief(**project['brief'])
+
+
+def make_pain_csv(rows: int = 50000, distinct: int = 2000, seed: int = 7) -> str:
+    """Pain research CSV upload: repeated pains with wording variants (case, accents, punctuation)"""
+    
+    rng = random.Random(seed)
+    pains = [' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(3, 7))) for _ in range(distinct)]
+    variants = (str, str.capitalize, str.upper, lambda text: text + '!', lambda text: text + '.')
+    lines = ['descricao,frequencia,categoria']
+    for _ in range(rows):
+        # Skewed popularity, like real survey answers
+        pain = pains[min(int(rng.paretovariate(1.2)) - 1, distinct - 1)] if rng.random() < 0.5 else rng.choice(pains)
+        lines.append(f"{rng.choice(variants)(pain)},{rng.randint(1, 20)},{rng.choice(['rotina', 'custo', 'saúde'])}")
+    return '\n'.join(lines)
@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# "disk", "gridfs" or "none"
+EXPORT_CACHE_BACKEND = os.getenv('EXPORT_CACHE_BACKEND', 'disk')
+EXPORT_CACHE_DIR = os.getenv('EXPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'offerforge_export_cache'))
+EXPORT_CACHE_MAX_BYTES = int(float(os.getenv('EXPORT_CACHE_MAX_MB', '512')) * 1024 * 1024)
+
+# Bump when the export layout changes so old artifacts are never served
+EXPORT_FORMAT_VERSION = '1'
+
+# Project fields that end up in exported files
+EXPORTED_FIELDS = ('name', 'language', 'status', 'brief', 'generated_offer', 'materials')
+
+ArtifactData = Union[bytes, BinaryIO]
+
+
+def project_content_hash(project_data: Dict[str, Any]) -> str:
+    """Stable hash of everything an export is rendered from"""
+    
+    content = {field: project_data.get(field) for field in EXPORTED_FIELDS}
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+class DiskArtifactStore:
+    """Size-bounded LRU store of export artifacts under a local directory,
+    one sub-directory per project"""
+    
+    def __init__(self, root: str = EXPORT_CACHE_DIR, max_bytes: int = EXPORT_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._index: Optional[OrderedDict] = None  # key -> size, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+    
+    def _path(self, key: str) -> Path:
+        return self.root / key
+    
+    def _load_index(self):
+        # Rebuilt from disk on first use, oldest access first
+        if self._index is not None:
+            return
+        entries = []
+        if self.root.exists():
+            for path in self.root.glob('*/*'):
+                if path.is_file() and not path.name.startswith('.'):
+                    stat = path.stat()
+                    entries.append((stat.st_mtime, str(path.relative_to(self.root)), stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total = sum(self._index.values())
+    
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        
+        try:
+            path = self._path(key)
+            data = path.read_bytes()
+            os.utime(path)  # mtime doubles as last access for the LRU order after a restart
+            return data
+        except OSError:
+            with self._lock:
+                self._total -= self._index.pop(key, 0)
+            return None
+    
+    def put(self, key: str, data: ArtifactData):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Write to a temp file and rename, so readers never see a partial artifact
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as tmp_file:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                tmp_file.write(data)
+            else:
+                shutil.copyfileobj(data, tmp_file)
+            size = tmp_file.tell()
+        
+        if size > self.max_bytes:
+            os.unlink(tmp_path)
+            return
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._load_index()
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._evict()
+    
+    def _evict(self):
+        while self._total > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+    
+    def delete_project(self, project_id: str):
+        with self._lock:
+            self._load_index()
+            for key in [key for key in self._index if key.startswith(f"{project_id}/")]:
+                self._total -= self._index.pop(key)
+        shutil.rmtree(self.root / project_id, ignore_errors=True)
+    
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+
+class GridFSArtifactStore:
+    """Export artifacts in a GridFS bucket, evicted by last access when over the size limit"""
+    
+    def __init__(self, db, bucket_name: str = 'export_cache', max_bytes: int = EXPORT_CACHE_MAX_BYTES):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+        self.max_bytes = max_bytes
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        file_doc = await self.files.find_one({"filename": key}, sort=[("uploadDate", -1)])
+        if not file_doc:
+            return None
+        
+        stream = await self.bucket.open_download_stream(file_doc["_id"])
+        data = await stream.read()
+        await self.files.update_one({"_id": file_doc["_id"]}, {"$set": {"metadata.last_access": datetime.utcnow()}})
+        return data
+    
+    async def put(self, key: str, data: ArtifactData, project_id: str):
+        await self.bucket.upload_from_stream(
+            key,
+            data,
+            metadata={"project_id": project_id, "last_access": datetime.utcnow()}
+        )
+        await self._evict()
+    
+    async def _evict(self):
+        totals = await self.files.aggregate([{"$group": {"_id": None, "total": {"$sum": "$length"}}}]).to_list(1)
+        total = totals[0]["total"] if totals else 0
+        if total <= self.max_bytes:
+            return
+        
+        async for file_doc in self.files.find({}, {"length": 1}).sort("metadata.last_access", 1):
+            await self.bucket.delete(file_doc["_id"])
+            total -= file_doc["length"]
+            if total <= self.max_bytes:
+                break
+    
+    async def delete_project(self, project_id: str):
+        async for file_doc in self.files.find({"metadata.project_id": project_id}, {"_id": 1}):
+            await self.bucket.delete(file_doc["_id"])
+
+
+class ExportArtifactCache:
+    """Content-addressed cache of rendered exports (PDF, ZIP packages).
+    
+    Keys combine the project ID, its updated_at, a hash of the exported content,
+    the export type and the landing page template version, so a changed project
+    can never be served a stale artifact; invalidate_project() frees the space early.
+    """
+    
+    def __init__(self, backend: str = EXPORT_CACHE_BACKEND, db=None):
+        self.backend = backend
+        if backend == 'disk':
+            self.store = DiskArtifactStore()
+        elif backend == 'gridfs':
+            self.store = GridFSArtifactStore(db)
+        elif backend == 'none':
+            self.store = None
+        else:
+            raise ValueError(f"Unknown export cache backend: {backend}. Supported: disk, gridfs, none")
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+    
+    def key_for(self, project_data: Dict[str, Any], export_type: str, variant: str = '') -> str:
+        """Cache key for one export of the project in its current state"""
+        
+        landing_page = (project_data.get('materials') or {}).get('landing_page') or {}
+        updated_at = project_data.get('updated_at')
+        parts = [
+            EXPORT_FORMAT_VERSION,
+            str(project_data.get('_id', '')),
+            updated_at.isoformat() if isinstance(updated_at, datetime) else str(updated_at),
+            project_content_hash(project_data),
+            export_type,
+            landing_page.get('template_version') or '',
+            variant
+        ]
+        digest = hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()[:32]
+        return f"{project_data.get('_id', 'unknown')}/{export_type}-{digest}"
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        
+        try:
+            if self.backend == 'disk':
+                data = await asyncio.to_thread(self.store.get, key)
+            else:
+                data = await self.store.get(key)
+        except Exception as e:
+            logger.warning(f"Export cache read failed for {key}: {str(e)}")
+            data = None
+        
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+    
+    async def put(self, key: str, project_id: str, data: ArtifactData):
+        if not self.enabled:
+            return
+        
+        try:
+            if self.backend == 'disk':
+                await asyncio.to_thread(self.store.put, key, data)
+            else:
+                await self.store.put(key, data, project_id)
+        except Exception as e:
+            # A cache write failure must never fail the export itself
+            logger.warning(f"Export cache write failed for {key}: {str(e)}")
+    
+    async def get_or_render(
+        self,
+        project_data: Dict[str, Any],
+        export_type: str,
+        render: Callable[[], Awaitable[bytes]],
+        variant: str = ''
+    ) -> bytes:
+        """Serve the cached artifact, or render it and cache the result"""
+        
+        key = self.key_for(project_data, export_type, variant)
+        data = await self.get(key)
+        if data is not None:
+            return data
+        
+        data = await render()
+        await self.put(key, str(project_data.get('_id', '')), data)
+        return data
+    
+    async def invalidate_project(self, project_id: str):
+        """Drop every cached artifact of a project (called when it changes)"""
+        
+        if not self.enabled:
+            return
+        
+        try:
+            if self.backend == 'disk':
+                await asyncio.to_thread(self.store.delete_project, project_id)
+            else:
+                await self.store.delete_project(project_id)
+        except Exception as e:
+            logger.warning(f"Export cache invalidation failed for project {project_id}: {str(e)}")
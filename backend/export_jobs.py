@@ -0,0 +1,355 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+from archive_stream import STREAM_CHUNK_SIZE
+from export_pool import when_pool_free
+
+logger = logging.getLogger(__name__)
+
+# "gridfs" (any instance can serve any job) or "disk" (single instance only)
+EXPORT_JOBS_BACKEND = os.getenv('EXPORT_JOBS_BACKEND', 'gridfs')
+# Where finished export artifacts are kept with the disk backend
+EXPORT_JOBS_DIR = os.getenv('EXPORT_JOBS_DIR', os.path.join(tempfile.gettempdir(), 'offerforge_export_jobs'))
+# Hours a finished artifact stays downloadable
+EXPORT_JOB_TTL_HOURS = float(os.getenv('EXPORT_JOB_TTL_HOURS', '24'))
+# Jobs rendering at the same time, so background jobs leave room for direct exports
+EXPORT_JOB_CONCURRENCY = int(os.getenv('EXPORT_JOB_CONCURRENCY', '2'))
+# A queued or running job whose worker has not checked in for this many seconds
+# was lost (e.g. worker restart); workers check in every third of it
+EXPORT_JOB_STALE_SECONDS = float(os.getenv('EXPORT_JOB_STALE_SECONDS', '900'))
+# Seconds between sweeps deleting expired artifact files
+EXPORT_JOB_SWEEP_INTERVAL = float(os.getenv('EXPORT_JOB_SWEEP_INTERVAL', '600'))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+EXPORT_MEDIA_TYPES = {
+    'zip': 'application/zip',
+    'html': 'application/zip',
+    'pdf': 'application/pdf',
+    'json': 'application/json'
+}
+
+# render(project, export_type, **options) -> artifact bytes
+RenderExport = Callable[..., Awaitable[bytes]]
+# Artifact bytes for StreamingResponse, read from disk or GridFS
+ArtifactChunks = Union[Iterable[bytes], AsyncIterator[bytes]]
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single "bytes=" Range header into inclusive (start, end).
+    
+    Returns None when the header should be ignored (other units, several
+    ranges) and raises ValueError when the range cannot be satisfied.
+    """
+    
+    unit, _, ranges = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+    
+    first, _, last = ranges.strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    
+    if start >= size or start > end or start < 0:
+        raise ValueError(f"Range not satisfiable: {header}")
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path: Path, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a file in chunks"""
+    
+    remaining = end - start + 1
+    with open(path, 'rb') as artifact:
+        artifact.seek(start)
+        while remaining > 0:
+            chunk = artifact.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class DiskJobArtifactStore:
+    """Artifacts as files under a local directory, swept by modification time.
+    Only the instance that rendered a job can serve it."""
+    
+    def __init__(self, root: str = EXPORT_JOBS_DIR):
+        self.root = Path(root)
+    
+    def _path(self, job_id) -> Path:
+        return self.root / str(job_id)
+    
+    async def put(self, job_id, data: bytes, expires_at: datetime):
+        await asyncio.to_thread(self._write, self._path(job_id), data)
+    
+    def _write(self, path: Path, data: bytes):
+        # Written under a temporary name so a download never sees half a file
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    
+    async def exists(self, job_id) -> bool:
+        return await asyncio.to_thread(self._path(job_id).exists)
+    
+    def iter_range(self, job_id, start: int, end: int) -> ArtifactChunks:
+        return iter_file_range(self._path(job_id), start, end)
+    
+    async def sweep(self, ttl: timedelta) -> int:
+        return await asyncio.to_thread(self._sweep, ttl)
+    
+    def _sweep(self, ttl: timedelta) -> int:
+        if not self.root.exists():
+            return 0
+        
+        cutoff = time.time() - ttl.total_seconds()
+        removed = 0
+        for path in self.root.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+class GridFSJobArtifactStore:
+    """Artifacts in a GridFS bucket under the job id, so every API instance can
+    serve every job; files are swept once their expiry has passed"""
+    
+    def __init__(self, db, bucket_name: str = 'export_job_artifacts', chunk_size: int = STREAM_CHUNK_SIZE):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+        self.chunk_size = chunk_size
+    
+    async def put(self, job_id, data: bytes, expires_at: datetime):
+        await self.bucket.upload_from_stream_with_id(job_id, str(job_id), data, metadata={"expires_at": expires_at})
+    
+    async def exists(self, job_id) -> bool:
+        return await self.files.find_one({"_id": job_id}, {"_id": 1}) is not None
+    
+    async def iter_range(self, job_id, start: int, end: int) -> AsyncIterator[bytes]:
+        stream = await self.bucket.open_download_stream(job_id)
+        stream.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await stream.read(min(self.chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    
+    async def sweep(self, ttl: timedelta) -> int:
+        removed = 0
+        async for file_doc in self.files.find({"metadata.expires_at": {"$lt": datetime.utcnow()}}, {"_id": 1}):
+            await self.bucket.delete(file_doc["_id"])
+            removed += 1
+        return removed
+
+
+class ExportJobManager:
+    """Runs exports in the background and keeps the artifacts for download.
+    
+    Job documents live in MongoDB (export_jobs, removed by a TTL index when they
+    expire); artifacts are kept in GridFS (or under EXPORT_JOBS_DIR with the
+    disk backend) and swept once expired.
+    The render callable is the same one the synchronous export endpoint uses,
+    so jobs share the export cache and the export worker pool.
+    """
+    
+    def __init__(
+        self,
+        db,
+        render: RenderExport,
+        backend: str = EXPORT_JOBS_BACKEND,
+        ttl_hours: float = EXPORT_JOB_TTL_HOURS,
+        concurrency: int = EXPORT_JOB_CONCURRENCY
+    ):
+        self.collection = db.export_jobs
+        self.render = render
+        if backend == 'gridfs':
+            self.store = GridFSJobArtifactStore(db)
+        elif backend == 'disk':
+            self.store = DiskJobArtifactStore()
+        else:
+            raise ValueError(f"Unknown export jobs backend: {backend}. Supported: gridfs, disk")
+        self.ttl = timedelta(hours=ttl_hours)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._job_ids: Set[Any] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+    
+    @property
+    def active(self) -> int:
+        """Jobs of this process still queued or rendering"""
+        return len(self._tasks)
+    
+    async def has_artifact(self, job: Dict[str, Any]) -> bool:
+        return await self.store.exists(job['_id'])
+    
+    def iter_artifact(self, job: Dict[str, Any], start: int, end: int) -> ArtifactChunks:
+        """Bytes start..end (inclusive) of a finished job's artifact"""
+        return self.store.iter_range(job['_id'], start, end)
+    
+    async def submit(
+        self,
+        project: Dict[str, Any],
+        export_type: str,
+        filename: str,
+        **options
+    ) -> Dict[str, Any]:
+        """Queue an export of the project as it is now; returns the job document"""
+        
+        now = datetime.utcnow()
+        job = {
+            'project_id': str(project['_id']),
+            'export_type': export_type,
+            'filename': filename,
+            'media_type': EXPORT_MEDIA_TYPES[export_type],
+            'status': QUEUED,
+            'created_at': now,
+            'heartbeat_at': now,
+            # Replaced by completion time + TTL; bounds the life of a lost job too
+            'expires_at': now + self.ttl,
+            'size': None,
+            'etag': None,
+            'error': None
+        }
+        result = await self.collection.insert_one(job)
+        job['_id'] = result.inserted_id
+        
+        job_id = job['_id']
+        self._job_ids.add(job_id)
+        task = asyncio.create_task(self._run(job_id, project, export_type, options))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _task: self._job_ids.discard(job_id))
+        return job
+    
+    async def get(self, job_id) -> Optional[Dict[str, Any]]:
+        """Job document, with jobs lost by a restarted worker reported as failed"""
+        
+        job = await self.collection.find_one({'_id': job_id})
+        if job and job['status'] in (QUEUED, RUNNING):
+            # Waiting for a render slot is not stale: the owning worker keeps checking in
+            silence = (datetime.utcnow() - job.get('heartbeat_at', job['created_at'])).total_seconds()
+            if silence > EXPORT_JOB_STALE_SECONDS:
+                job.update(status=FAILED, error="Export was interrupted, please submit it again")
+                await self.collection.update_one(
+                    {'_id': job_id, 'status': {'$in': [QUEUED, RUNNING]}},
+                    {'$set': {'status': FAILED, 'error': job['error']}}
+                )
+        return job
+    
+    async def _run(self, job_id, project: Dict[str, Any], export_type: str, options: Dict[str, Any]):
+        # Every transition requires the state this worker left the job in, so a
+        # job already reported as failed is never flipped back
+        async with self._semaphore:
+            started = await self.collection.update_one(
+                {'_id': job_id, 'status': QUEUED},
+                {'$set': {'status': RUNNING, 'started_at': datetime.utcnow(), 'heartbeat_at': datetime.utcnow()}}
+            )
+            if started.matched_count == 0:
+                logger.warning(f"Export job {job_id} is no longer queued, not rendering it")
+                return
+            
+            try:
+                data = await when_pool_free(self.render, project, export_type, **options)
+                completed_at = datetime.utcnow()
+                await self.store.put(job_id, data, completed_at + self.ttl)
+                
+                completed = await self.collection.update_one(
+                    {'_id': job_id, 'status': RUNNING},
+                    {'$set': {
+                        'status': COMPLETED,
+                        'completed_at': completed_at,
+                        'expires_at': completed_at + self.ttl,
+                        'size': len(data),
+                        'etag': f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+                    }}
+                )
+                if completed.matched_count == 0:
+                    # The artifact expires with the sweep
+                    logger.warning(f"Export job {job_id} was marked failed while rendering, result discarded")
+            except Exception as e:
+                detail = getattr(e, 'detail', None) or str(e)
+                logger.error(f"Export job {job_id} ({export_type}) failed: {detail}")
+                await self.collection.update_one(
+                    {'_id': job_id, 'status': RUNNING},
+                    {'$set': {'status': FAILED, 'error': detail, 'completed_at': datetime.utcnow()}}
+                )
+    
+    async def sweep(self) -> int:
+        """Delete artifacts older than the TTL; returns how many were removed"""
+        return await self.store.sweep(self.ttl)
+    
+    async def start(self):
+        """Create indexes and start the expiry sweeper (app startup)"""
+        
+        try:
+            await self.collection.create_index('expires_at', expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"Could not create export job indexes: {str(e)}")
+        
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._check_in_periodically())
+    
+    async def _check_in_periodically(self):
+        """Refresh heartbeat_at of this worker's unfinished jobs"""
+        
+        while True:
+            await asyncio.sleep(EXPORT_JOB_STALE_SECONDS / 3)
+            if not self._job_ids:
+                continue
+            try:
+                await self.collection.update_many(
+                    {'_id': {'$in': list(self._job_ids)}, 'status': {'$in': [QUEUED, RUNNING]}},
+                    {'$set': {'heartbeat_at': datetime.utcnow()}}
+                )
+            except Exception as e:
+                logger.warning(f"Export job heartbeat failed: {str(e)}")
+    
+    async def _sweep_periodically(self):
+        while True:
+            try:
+                removed = await self.sweep()
+                if removed:
+                    logger.info(f"Removed {removed} expired export artifact(s)")
+            except Exception as e:
+                logger.warning(f"Export artifact sweep failed: {str(e)}")
+            await asyncio.sleep(EXPORT_JOB_SWEEP_INTERVAL)
+    
+    async def stop(self):
+        """Cancel the background tasks and running jobs (app shutdown)"""
+        
+        tasks = list(self._tasks)
+        for task in (self._sweeper, self._heartbeat):
+            if task is not None:
+                tasks.append(task)
+        self._sweeper = self._heartbeat = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,187 @@
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import profiler
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for CPU-bound export work (0 = run in the thread pool instead)
+EXPORT_POOL_WORKERS = int(os.getenv('EXPORT_POOL_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to be running or waiting before new exports are rejected
+EXPORT_POOL_MAX_QUEUE = int(os.getenv('EXPORT_POOL_MAX_QUEUE', '16'))
+# Seconds an export may take before the request gives up on it
+EXPORT_POOL_TIMEOUT = float(os.getenv('EXPORT_POOL_TIMEOUT', '60'))
+
+
+class ExportPoolBusy(Exception):
+    """Raised when the export queue is full"""
+
+
+class ExportPoolTimeout(Exception):
+    """Raised when an export job does not finish in time"""
+
+
+async def when_pool_free(render: Callable[..., Awaitable[Any]], *args, attempts: int = 10, **kwargs) -> Any:
+    """Await render(*args, **kwargs), waiting for room instead of failing while
+    the export pool is full (for background work; requests get a 503 instead)"""
+    
+    delay = 0.5
+    for _ in range(attempts):
+        try:
+            return await render(*args, **kwargs)
+        except ExportPoolBusy:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10)
+    return await render(*args, **kwargs)
+
+
+# Jobs executed in the worker processes. They are module-level so they can be
+# pickled, and each process builds its own ExportService on first use.
+_worker_services: Dict[str, Any] = {}
+
+
+def _worker_export_service():
+    if 'export' not in _worker_services:
+        from export_service import ExportService
+        _worker_services['export'] = ExportService()
+    return _worker_services['export']
+
+
+def _worker_landing_generator():
+    if 'landing' not in _worker_services:
+        from landing_generator import LandingPageGenerator
+        _worker_services['landing'] = LandingPageGenerator()
+    return _worker_services['landing']
+
+
+def _run_traced(parent, func: Callable, *args) -> Any:
+    """Run a job under the trace of the request that submitted it"""
+    
+    try:
+        with tracing.remote_span(func.__name__, parent, tracing.INTERNAL, **{'process.pid': os.getpid()}):
+            return func(*args)
+    finally:
+        # Workers can be stopped at any time; their spans are not left queued
+        tracing.flush()
+
+
+# Jobs return raw bytes: pickling bytes back to the parent is cheaper than a
+# base64 str, and base64 is only applied at the HTTP edge for legacy clients.
+def render_project_pdf(project_data: Dict[str, Any]) -> bytes:
+    return _worker_export_service().render_project_pdf(project_data)
+
+
+def render_export_package(project_data: Dict[str, Any]) -> bytes:
+    return _worker_export_service().build_export_package(
+        project_data,
+        include_landing_page=True,
+        include_pdf=True,
+        include_json=True
+    )
+
+
+def render_landing_zip(landing_page: Dict[str, str], project_name: str) -> bytes:
+    return _worker_landing_generator().build_zip_export(landing_page, project_name)
+
+
+class ExportWorkerPool:
+    """Bounded process pool for PDF builds and ZIP compression, so exports use
+    every core and never run on the event loop"""
+    
+    def __init__(
+        self,
+        max_workers: int = EXPORT_POOL_WORKERS,
+        max_queue: int = EXPORT_POOL_MAX_QUEUE,
+        timeout: float = EXPORT_POOL_TIMEOUT
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def depth(self) -> int:
+        """Jobs currently running or waiting for a worker"""
+        return self._pending
+    
+    def _get_executor(self) -> Executor:
+        # Created on first export so idle workers do not slow down startup
+        if self._executor is None:
+            if self.max_workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._executor = ThreadPoolExecutor(thread_name_prefix='export-pool')
+        return self._executor
+    
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+    
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Run a module-level job function in the pool and await its result"""
+        
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise ExportPoolBusy(f"Export queue is full ({self.max_queue} jobs)")
+            self._pending += 1
+        
+        # The span covers the queue wait; the job's own spans nest under it
+        with tracing.span('export_pool.run', **{'export_pool.job': func.__name__, 'export_pool.depth': self._pending}):
+            return await self._submit_and_wait(func, args, timeout)
+    
+    async def _submit_and_wait(self, func: Callable, args: tuple, timeout: Optional[float]) -> Any:
+        parent = tracing.trace_context()
+        if parent is not None and self.max_workers > 0:
+            func, args = _run_traced, (parent, func) + args
+        # Thread jobs are already sampled by the API process profiler
+        profile_id = profiler.current_profile_id()
+        if profile_id is not None and self.max_workers > 0:
+            func, args = profiler.run_profiled, (profile_id, func) + args
+        
+        if self.max_workers == 0:
+            # With the caller's context, so its trace continues in the thread
+            func, args = contextvars.copy_context().run, (func,) + args
+        
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM killed); start a fresh pool for the next export
+            self._release()
+            logger.error("Export process pool is broken, restarting it")
+            self._executor = None
+            raise
+        except Exception:
+            self._release()
+            raise
+        
+        # Attached to the executor's future, not the asyncio one wait_for cancels:
+        # the slot is freed when the job really finishes (or is cancelled before
+        # it started), so the queue depth reflects the work the workers still have
+        future.add_done_callback(self._release)
+        
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise ExportPoolTimeout(f"Export did not finish within {timeout or self.timeout:g}s")
+        except BrokenProcessPool:
+            logger.error("Export process pool is broken, restarting it")
+            self._executor = None
+            raise
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
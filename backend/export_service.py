@@ -1,204 +1,215 @@
 import os
 import io
-import zipfile
 import base64
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from datetime import datetime
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.colors import HexColor
+from reportlab.platypus import SimpleDocTemplate, Flowable
+from reportlab import rl_config
 import json
 
 from models import Project, GeneratedOffer, VSLScript, EmailSequence, SocialContent, LanguageEnum
+from archive_stream import ArchiveEntry, CompressionPolicy, build_zip, safe_entry_name, stream_zip
+from json_stream import iter_json
+from pdf_story import SectionCache, StoryBuilder, get_stylesheet
+from instrumentation import OPERATION_SECONDS, timed, timed_operation
+from tracing import span
+
+# Page streams are already Flate-compressed; ReportLab's default ASCII85 layer
+# on top only inflates them by 25% and makes them look compressible again
+rl_config.useA85 = 0
 
 class ExportService:
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom PDF styles"""
-        self.styles.add(ParagraphStyle(
-            name='CustomHeading1',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            textColor=HexColor('#212529'),
-            fontName='Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CustomHeading2',
-            parent=self.styles['Heading2'],
-            fontSize=18,
-            spaceAfter=20,
-            textColor=HexColor('#495057'),
-            fontName='Helvetica-Bold'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CustomBody',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            spaceAfter=12,
-            textColor=HexColor('#212529'),
-            fontName='Helvetica'
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='HighlightBox',
-            parent=self.styles['Normal'],
-            fontSize=14,
-            spaceAfter=20,
-            textColor=HexColor('#007AFF'),
-            fontName='Helvetica-Bold',
-            borderColor=HexColor('#007AFF'),
-            borderWidth=1,
-            borderPadding=10
-        ))
+    def __init__(
+        self,
+        compression_policy: Optional[CompressionPolicy] = None,
+        section_cache: Optional[SectionCache] = None
+    ):
+        # Styles are built once per process and shared (see pdf_story)
+        self.styles = get_stylesheet()
+        self.compression_policy = compression_policy or CompressionPolicy()
+        self.section_cache = section_cache or SectionCache()
     
     def export_project_pdf(self, project_data: Dict[str, Any]) -> str:
-        """Export complete project as PDF"""
+        """Export complete project as PDF (base64, for legacy JSON clients)"""
+        
+        return base64.b64encode(self.render_project_pdf(project_data)).decode('utf-8')
+    
+    @timed_operation('export.pdf')
+    def render_project_pdf(self, project_data: Dict[str, Any]) -> bytes:
+        """Render complete project as PDF bytes"""
         
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
         
-        # Build PDF content
-        story = []
+        # Build PDF content, one independent section at a time; everything but
+        # the title (which carries the export time) is reused while unchanged
+        story = self._title_section(project_data)
+        
+        sections = [
+            ('brief', project_data.get('brief'), self._brief_section),
+            ('offer', project_data.get('generated_offer'), self._offer_section)
+        ]
+        
+        materials = project_data.get('materials', {})
+        sections += [
+            ('vsl', materials.get('vsl_script'), self._vsl_section),
+            ('emails', materials.get('email_sequence'), self._email_section),
+            ('social', materials.get('social_content'), self._social_section)
+        ]
         
-        # Title Page
-        story.append(Paragraph("OfferForge - Projeto Completo", self.styles['CustomHeading1']))
-        story.append(Spacer(1, 20))
+        for name, content, build_section in sections:
+            if content:
+                story += self.section_cache.get_or_build(name, content, build_section)
+        
+        # Build PDF
+        with timed(OPERATION_SECONDS, 'export.pdf_layout'), span('export.pdf_layout'):
+            self.section_cache.build(doc, story)
+        
+        return buffer.getvalue()
+    
+    def _title_section(self, project_data: Dict[str, Any]) -> List[Flowable]:
+        """Title page header"""
+        
+        section = StoryBuilder(self.styles)
+        section.markup("OfferForge - Projeto Completo", 'CustomHeading1')
+        section.spacer(20)
         
         if project_data.get('name'):
-            story.append(Paragraph(f"Projeto: {project_data['name']}", self.styles['CustomHeading2']))
-            story.append(Spacer(1, 10))
+            section.text(f"Projeto: {project_data['name']}", 'CustomHeading2')
+            section.spacer(10)
         
-        story.append(Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}", self.styles['CustomBody']))
-        story.append(Spacer(1, 20))
+        section.text(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+        section.spacer(20)
+        return section.story
+    
+    def _brief_section(self, brief: Dict[str, Any]) -> List[Flowable]:
+        """Project brief, on the title page"""
         
-        # Project Brief
-        if project_data.get('brief'):
-            story.append(Paragraph("📋 Brief do Produto", self.styles['CustomHeading2']))
-            brief = project_data['brief']
-            
-            story.append(Paragraph(f"<b>Nicho:</b> {brief.get('niche', 'N/A')}", self.styles['CustomBody']))
-            story.append(Paragraph(f"<b>Promessa:</b> {brief.get('promise', 'N/A')}", self.styles['CustomBody']))
-            story.append(Paragraph(f"<b>Preço-alvo:</b> {brief.get('currency', 'BRL')} {brief.get('target_price', 0)}", self.styles['CustomBody']))
-            story.append(Spacer(1, 20))
-        
-        # Generated Offer
-        if project_data.get('generated_offer'):
-            story.append(PageBreak())
-            story.append(Paragraph("🎯 Oferta Gerada pela IA", self.styles['CustomHeading2']))
-            offer = project_data['generated_offer']
-            
-            story.append(Paragraph(f"<b>Headline:</b>", self.styles['CustomBody']))
-            story.append(Paragraph(offer.get('headline', 'N/A'), self.styles['HighlightBox']))
-            
-            story.append(Paragraph(f"<b>Promessa Principal:</b>", self.styles['CustomBody']))
-            story.append(Paragraph(offer.get('main_promise', 'N/A'), self.styles['CustomBody']))
-            story.append(Spacer(1, 10))
-            
-            # Proof Elements
-            if offer.get('proof_elements'):
-                story.append(Paragraph("✅ <b>Elementos de Prova:</b>", self.styles['CustomBody']))
-                for proof in offer['proof_elements']:
-                    story.append(Paragraph(f"• {proof}", self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
-            
-            # Bonuses
-            if offer.get('bonuses'):
-                story.append(Paragraph("🎁 <b>Bônus:</b>", self.styles['CustomBody']))
-                for bonus in offer['bonuses']:
-                    story.append(Paragraph(f"• {bonus}", self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
-            
-            # Guarantees
-            if offer.get('guarantees'):
-                story.append(Paragraph("🛡️ <b>Garantias:</b>", self.styles['CustomBody']))
-                for guarantee in offer['guarantees']:
-                    story.append(Paragraph(f"• {guarantee}", self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
-            
-            # Price Justification
-            if offer.get('price_justification'):
-                story.append(Paragraph("💰 <b>Justificativa de Preço:</b>", self.styles['CustomBody']))
-                story.append(Paragraph(offer['price_justification'], self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
+        section = StoryBuilder(self.styles)
+        section.markup("📋 Brief do Produto", 'CustomHeading2')
         
-        # VSL Script
-        if project_data.get('materials', {}).get('vsl_script'):
-            story.append(PageBreak())
-            story.append(Paragraph("🎬 Roteiro VSL", self.styles['CustomHeading2']))
-            vsl = project_data['materials']['vsl_script']
-            
-            story.append(Paragraph(f"<b>Título:</b> {vsl.get('title', 'N/A')}", self.styles['CustomBody']))
-            story.append(Paragraph(f"<b>Duração estimada:</b> {vsl.get('estimated_duration', 90)} segundos", self.styles['CustomBody']))
-            story.append(Spacer(1, 15))
-            
-            sections = [
-                ('Hook Inicial', vsl.get('hook', '')),
-                ('Agitação do Problema', vsl.get('problem_agitation', '')),
-                ('Introdução da Solução', vsl.get('solution_intro', '')),
-                ('Prova Social', vsl.get('social_proof', '')),
-                ('Apresentação da Oferta', vsl.get('offer_presentation', '')),
-                ('Garantia', vsl.get('guarantee', '')),
-                ('Call-to-Action', vsl.get('call_to_action', ''))
-            ]
-            
-            for section_name, content in sections:
-                if content:
-                    story.append(Paragraph(f"<b>{section_name}:</b>", self.styles['CustomBody']))
-                    story.append(Paragraph(content, self.styles['CustomBody']))
-                    story.append(Spacer(1, 10))
+        section.labeled("<b>Nicho:</b>", brief.get('niche', 'N/A'))
+        section.labeled("<b>Promessa:</b>", brief.get('promise', 'N/A'))
+        section.labeled("<b>Preço-alvo:</b>", f"{brief.get('currency', 'BRL')} {brief.get('target_price', 0)}")
+        section.spacer(20)
+        return section.story
+    
+    def _offer_section(self, offer: Dict[str, Any]) -> List[Flowable]:
+        """Generated offer"""
         
-        # Email Sequence
-        if project_data.get('materials', {}).get('email_sequence'):
-            story.append(PageBreak())
-            story.append(Paragraph("📧 Sequência de E-mails", self.styles['CustomHeading2']))
-            email_seq = project_data['materials']['email_sequence']
-            
-            emails = email_seq.get('emails', [])
-            for i, email in enumerate(emails[:5]):
-                story.append(Paragraph(f"<b>E-mail {i+1}:</b>", self.styles['CustomBody']))
-                story.append(Paragraph(f"<b>Assunto:</b> {email.get('subject', 'N/A')}", self.styles['CustomBody']))
-                story.append(Paragraph(f"<b>Conteúdo:</b>", self.styles['CustomBody']))
-                # Clean content for PDF
-                content = email.get('content', '').replace('\n', '<br/>')
-                story.append(Paragraph(content, self.styles['CustomBody']))
-                story.append(Spacer(1, 15))
+        section = StoryBuilder(self.styles)
+        section.page_break()
+        section.markup("🎯 Oferta Gerada pela IA", 'CustomHeading2')
         
-        # Social Content
-        if project_data.get('materials', {}).get('social_content'):
-            story.append(PageBreak())
-            story.append(Paragraph("📱 Conteúdo para Redes Sociais", self.styles['CustomHeading2']))
-            social_content = project_data['materials']['social_content']
-            
-            for i, post in enumerate(social_content[:6]):
-                story.append(Paragraph(f"<b>Post {i+1} ({post.get('platform', 'N/A').title()}):</b>", self.styles['CustomBody']))
-                story.append(Paragraph(post.get('content', 'N/A'), self.styles['CustomBody']))
-                
-                hashtags = post.get('hashtags', [])
-                if hashtags:
-                    story.append(Paragraph(f"<b>Hashtags:</b> {' '.join(hashtags)}", self.styles['CustomBody']))
-                story.append(Spacer(1, 10))
+        section.markup("<b>Headline:</b>")
+        section.text(offer.get('headline', 'N/A'), 'HighlightBox')
         
-        # Build PDF
-        doc.build(story)
+        section.markup("<b>Promessa Principal:</b>")
+        section.text(offer.get('main_promise', 'N/A'))
+        section.spacer(10)
+        
+        list_sections = [
+            ('proof_elements', "✅ <b>Elementos de Prova:</b>"),
+            ('bonuses', "🎁 <b>Bônus:</b>"),
+            ('guarantees', "🛡️ <b>Garantias:</b>")
+        ]
         
-        # Convert to base64
-        buffer.seek(0)
-        pdf_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        for key, label in list_sections:
+            if offer.get(key):
+                section.markup(label)
+                for item in offer[key]:
+                    section.text(f"• {item}")
+                section.spacer(10)
         
-        return pdf_base64
+        # Price Justification
+        if offer.get('price_justification'):
+            section.markup("💰 <b>Justificativa de Preço:</b>")
+            section.text(offer['price_justification'])
+            section.spacer(10)
+        
+        return section.story
     
+    def _vsl_section(self, vsl: Dict[str, Any]) -> List[Flowable]:
+        """VSL script"""
+        
+        section = StoryBuilder(self.styles)
+        section.page_break()
+        section.markup("🎬 Roteiro VSL", 'CustomHeading2')
+        
+        section.labeled("<b>Título:</b>", vsl.get('title', 'N/A'))
+        section.labeled("<b>Duração estimada:</b>", f"{vsl.get('estimated_duration', 90)} segundos")
+        section.spacer(15)
+        
+        sections = [
+            ("<b>Hook Inicial:</b>", vsl.get('hook', '')),
+            ("<b>Agitação do Problema:</b>", vsl.get('problem_agitation', '')),
+            ("<b>Introdução da Solução:</b>", vsl.get('solution_intro', '')),
+            ("<b>Prova Social:</b>", vsl.get('social_proof', '')),
+            ("<b>Apresentação da Oferta:</b>", vsl.get('offer_presentation', '')),
+            ("<b>Garantia:</b>", vsl.get('guarantee', '')),
+            ("<b>Call-to-Action:</b>", vsl.get('call_to_action', ''))
+        ]
+        
+        for label, content in sections:
+            if content:
+                section.markup(label)
+                section.text(content)
+                section.spacer(10)
+        
+        return section.story
+    
+    def _email_section(self, email_seq: Dict[str, Any]) -> List[Flowable]:
+        """E-mail sequence (first five e-mails)"""
+        
+        section = StoryBuilder(self.styles)
+        section.page_break()
+        section.markup("📧 Sequência de E-mails", 'CustomHeading2')
+        
+        emails = email_seq.get('emails', [])
+        for i, email in enumerate(emails[:5]):
+            section.text(f"E-mail {i+1}:", bold=True)
+            section.labeled("<b>Assunto:</b>", email.get('subject', 'N/A'))
+            section.markup("<b>Conteúdo:</b>")
+            section.lines(email.get('content', ''))
+            section.spacer(15)
+        
+        return section.story
+    
+    def _social_section(self, social_content: List[Dict[str, Any]]) -> List[Flowable]:
+        """Social media posts (first six posts)"""
+        
+        section = StoryBuilder(self.styles)
+        section.page_break()
+        section.markup("📱 Conteúdo para Redes Sociais", 'CustomHeading2')
+        
+        for i, post in enumerate(social_content[:6]):
+            section.text(f"Post {i+1} ({post.get('platform', 'N/A').title()}):", bold=True)
+            section.text(post.get('content', 'N/A'))
+            
+            hashtags = post.get('hashtags', [])
+            if hashtags:
+                section.labeled("<b>Hashtags:</b>", ' '.join(hashtags))
+            section.spacer(10)
+        
+        return section.story
+    
+    @timed_operation('export.json')
     def export_materials_json(self, project_data: Dict[str, Any]) -> str:
         """Export materials as JSON for API integrations"""
         
-        export_data = {
+        return json.dumps(self._materials_document(project_data), indent=2, ensure_ascii=False, default=str)
+    
+    def iter_materials_json(self, project_data: Dict[str, Any], compact: bool = False) -> Iterator[bytes]:
+        """Stream the materials JSON as UTF-8 chunks; compact drops indentation"""
+        
+        return iter_json(self._materials_document(project_data), compact=compact)
+    
+    def _materials_document(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Materials export document; references the project data, nothing is copied"""
+        
+        return {
             'project_info': {
                 'name': project_data.get('name', ''),
                 'language': project_data.get('language', 'pt-BR'),
@@ -214,17 +225,20 @@ class ExportService:
                 'format': 'json'
             }
         }
-        
-        return json.dumps(export_data, indent=2, ensure_ascii=False)
     
-    def export_webhook_payload(self, project_data: Dict[str, Any], webhook_url: str = None) -> Dict[str, Any]:
+    def export_webhook_payload(
+        self,
+        project_data: Dict[str, Any],
+        webhook_url: str = None,
+        event: str = 'project_completed'
+    ) -> Dict[str, Any]:
         """Prepare webhook payload for external integrations"""
         
         payload = {
-            'event': 'project_completed',
+            'event': event,
             'timestamp': datetime.now().isoformat(),
             'project': {
-                'id': project_data.get('_id', ''),
+                'id': str(project_data.get('_id', '')),
                 'name': project_data.get('name', ''),
                 'language': project_data.get('language', 'pt-BR'),
                 'status': project_data.get('status', '')
@@ -252,37 +266,86 @@ class ExportService:
         include_pdf: bool = True,
         include_json: bool = True
     ) -> str:
-        """Create a complete export package with all materials"""
+        """Create a complete export package with all materials (base64, for legacy JSON clients)"""
         
-        zip_buffer = io.BytesIO()
-        project_name = project_data.get('name', 'OfferForge_Project').replace(' ', '_')
+        zip_bytes = self.build_export_package(project_data, include_landing_page, include_pdf, include_json)
+        return base64.b64encode(zip_bytes).decode('utf-8')
+    
+    @timed_operation('export.package')
+    def build_export_package(
+        self,
+        project_data: Dict[str, Any],
+        include_landing_page: bool = True,
+        include_pdf: bool = True,
+        include_json: bool = True,
+        pdf_bytes: Optional[bytes] = None
+    ) -> bytes:
+        """Build the complete export package as ZIP bytes"""
         
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            
-            # Add landing page files if requested
-            if include_landing_page and project_data.get('materials', {}).get('landing_page'):
-                landing_page = project_data['materials']['landing_page']
-                zip_file.writestr(f'{project_name}/landing_page/index.html', landing_page.get('html_content', ''))
-                zip_file.writestr(f'{project_name}/landing_page/styles.css', landing_page.get('css_content', ''))
-            
-            # Add PDF export if requested
-            if include_pdf:
-                pdf_content = self.export_project_pdf(project_data)
-                pdf_bytes = base64.b64decode(pdf_content)
-                zip_file.writestr(f'{project_name}/{project_name}_complete.pdf', pdf_bytes)
-            
-            # Add JSON export if requested
-            if include_json:
-                json_content = self.export_materials_json(project_data)
-                zip_file.writestr(f'{project_name}/{project_name}_materials.json', json_content)
-            
-            # Add individual material files
-            materials = project_data.get('materials', {})
-            
-            # VSL Script
-            if materials.get('vsl_script'):
-                vsl = materials['vsl_script']
-                vsl_content = f"""# Roteiro VSL - {project_data.get('name', 'Projeto')}
+        return build_zip(
+            self.iter_package_entries(project_data, include_landing_page, include_pdf, include_json, pdf_bytes),
+            policy=self.compression_policy
+        )
+    
+    def iter_complete_export_package(
+        self,
+        project_data: Dict[str, Any],
+        include_landing_page: bool = True,
+        include_pdf: bool = True,
+        include_json: bool = True,
+        pdf_bytes: Optional[bytes] = None
+    ) -> Iterator[bytes]:
+        """Stream the complete export package as ZIP bytes, entry by entry.
+        
+        pdf_bytes lets the caller pass a PDF already rendered elsewhere (e.g. in the export pool).
+        """
+        
+        return stream_zip(
+            self.iter_package_entries(project_data, include_landing_page, include_pdf, include_json, pdf_bytes),
+            policy=self.compression_policy
+        )
+    
+    def iter_package_entries(
+        self,
+        project_data: Dict[str, Any],
+        include_landing_page: bool = True,
+        include_pdf: bool = True,
+        include_json: bool = True,
+        pdf_bytes: Optional[bytes] = None,
+        folder: Optional[str] = None
+    ) -> Iterator[ArchiveEntry]:
+        """Yield (archive path, content) for every file of the export package.
+        
+        Files go under folder, by default the project name.
+        """
+        
+        project_name = safe_entry_name(project_data.get('name'))
+        folder = folder or project_name
+        
+        # Add landing page files if requested
+        if include_landing_page and project_data.get('materials', {}).get('landing_page'):
+            landing_page = project_data['materials']['landing_page']
+            yield f'{folder}/landing_page/index.html', landing_page.get('html_content', '')
+            yield f'{folder}/landing_page/styles.css', landing_page.get('css_content', '')
+        
+        # Add PDF export if requested
+        if include_pdf:
+            if pdf_bytes is None:
+                pdf_bytes = self.render_project_pdf(project_data)
+            yield f'{folder}/{project_name}_complete.pdf', pdf_bytes
+        
+        # Add JSON export if requested
+        if include_json:
+            # Serialized while it is compressed into the archive
+            yield f'{folder}/{project_name}_materials.json', self.iter_materials_json(project_data)
+        
+        # Add individual material files
+        materials = project_data.get('materials', {})
+        
+        # VSL Script
+        if materials.get('vsl_script'):
+            vsl = materials['vsl_script']
+            vsl_content = f"""# Roteiro VSL - {project_data.get('name', 'Projeto')}
 
 ## Informações Gerais
 - Título: {vsl.get('title', 'N/A')}
@@ -312,15 +375,15 @@ class ExportService:
 ### Call-to-Action
 {vsl.get('call_to_action', 'N/A')}
 """
-                zip_file.writestr(f'{project_name}/materials/vsl_script.md', vsl_content)
+            yield f'{folder}/materials/vsl_script.md', vsl_content
+        
+        # Email Sequence
+        if materials.get('email_sequence'):
+            email_seq = materials['email_sequence']
+            emails = email_seq.get('emails', [])
             
-            # Email Sequence
-            if materials.get('email_sequence'):
-                email_seq = materials['email_sequence']
-                emails = email_seq.get('emails', [])
-                
-                for i, email in enumerate(emails[:5]):
-                    email_content = f"""# E-mail {i+1} - {email_seq.get('sequence_name', 'Sequência')}
+            for i, email in enumerate(emails[:5]):
+                email_content = f"""# E-mail {i+1} - {email_seq.get('sequence_name', 'Sequência')}
 
 ## Assunto
 {email.get('subject', 'N/A')}
@@ -328,14 +391,14 @@ class ExportService:
 ## Conteúdo
 {email.get('content', 'N/A')}
 """
-                    zip_file.writestr(f'{project_name}/materials/email_{i+1}.md', email_content)
+                yield f'{folder}/materials/email_{i+1}.md', email_content
+        
+        # Social Content
+        if materials.get('social_content'):
+            social_content = materials['social_content']
             
-            # Social Content
-            if materials.get('social_content'):
-                social_content = materials['social_content']
-                
-                for i, post in enumerate(social_content[:6]):
-                    post_content = f"""# Post {i+1} - {post.get('platform', 'Social').title()}
+            for i, post in enumerate(social_content[:6]):
+                post_content = f"""# Post {i+1} - {post.get('platform', 'Social').title()}
 
 ## Conteúdo
 {post.get('content', 'N/A')}
@@ -346,10 +409,10 @@ class ExportService:
 ## Tipo de Conteúdo
 {post.get('content_type', 'post')}
 """
-                    zip_file.writestr(f'{project_name}/materials/social_post_{i+1}.md', post_content)
-            
-            # Add README
-            readme_content = f"""# {project_data.get('name', 'OfferForge Project')}
+                yield f'{folder}/materials/social_post_{i+1}.md', post_content
+        
+        # Add README
+        readme_content = f"""# {project_data.get('name', 'OfferForge Project')}
 
 ## Projeto gerado com OfferForge
 Exportado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}
@@ -371,10 +434,4 @@ Exportado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}
 ## Suporte:
 Para dúvidas sobre este export, consulte a documentação do OfferForge.
 """
-            zip_file.writestr(f'{project_name}/README.md', readme_content)
-        
-        # Convert to base64
-        zip_buffer.seek(0)
-        zip_base64 = base64.b64encode(zip_buffer.getvalue()).decode('utf-8')
-        
-        return zip_base64
\ No newline at end of file
+        yield f'{folder}/README.md', readme_content
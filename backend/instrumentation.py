@@ -0,0 +1,409 @@
+"""
+Operational metrics in the Prometheus text format.
+Counters, gauges and histograms kept in process memory and rendered on each
+scrape of /metrics. Recording is a bisect and a locked increment, cheap enough
+to leave on for every request, Mongo command and OpenAI call. Metrics are per
+process: with several uvicorn workers each one is scraped on its own, and
+renders done inside export pool workers only show up as the pool job time.
+"""
+
+import functools
+import hmac
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+from tracing import TRACING_ENABLED, span
+
+logger = logging.getLogger(__name__)
+
+# Set to "false" to skip the request middleware and Mongo command listener
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+# When set, /metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; spans Mongo round trips up to multi-second LLM calls and huge PDF renders
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+# Bytes, from a small JSON export to a large ZIP package
+SIZE_BUCKETS = tuple(1024 * 4 ** power for power in range(10))
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+    
+    def labels(self, *values):
+        """Child series for these label values (created on first use)"""
+        
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def _samples(self, key: Tuple[str, ...], child) -> Iterator[str]:
+        raise NotImplementedError
+    
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, child in list(self._children.items()):
+            yield from self._samples(key, child)
+
+
+class _Value:
+    __slots__ = ('value', 'lock')
+    
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+    
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1):
+        with self.lock:
+            self.value -= amount
+    
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    
+    def _new_child(self):
+        return _Value()
+    
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+    
+    def _samples(self, key, child):
+        yield f"{self.name}{_label_text(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+    
+    def dec(self, amount: float = 1):
+        self._default.dec(amount)
+    
+    def set(self, value: float):
+        self._default.set(value)
+
+
+class _HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum', 'lock')
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+    
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float):
+        self._default.observe(value)
+    
+    def _samples(self, key, child):
+        with child.lock:
+            counts = list(child.counts)
+            total = child.sum
+        
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            yield f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}"
+        labels = _label_text(self.labelnames, key)
+        yield f"{self.name}_sum{labels} {_format_value(total)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class _Callback:
+    """Gauge or counter read from a function at scrape time (queue depths, service counters)"""
+    
+    def __init__(self, name: str, documentation: str, kind: str, read: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.read = read
+    
+    def render(self) -> Iterator[str]:
+        try:
+            value = float(self.read())
+        except Exception as e:
+            logger.warning(f"Could not read metric {self.name}: {str(e)}")
+            return
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric):
+        with self._lock:
+            # Re-registering returns the existing metric, so modules can be re-imported
+            return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def gauge_function(self, name: str, documentation: str, read: Callable[[], float]):
+        with self._lock:
+            self._metrics[name] = _Callback(name, documentation, 'gauge', read)
+    
+    def counter_function(self, name: str, documentation: str, read: Callable[[], float]):
+        with self._lock:
+            self._metrics[name] = _Callback(name, documentation, 'counter', read)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'offerforge_http_request_duration_seconds',
+    'HTTP request latency by route template',
+    ['method', 'route', 'status']
+)
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    'offerforge_http_requests_in_progress',
+    'HTTP requests currently being served'
+)
+OPENAI_REQUEST_SECONDS = REGISTRY.histogram(
+    'offerforge_openai_request_duration_seconds',
+    'OpenAI chat completion latency by generation step',
+    ['operation', 'model', 'outcome']
+)
+OPENAI_TOKENS = REGISTRY.counter(
+    'offerforge_openai_tokens_total',
+    'Tokens reported by the OpenAI API',
+    ['model', 'kind']
+)
+MONGO_COMMAND_SECONDS = REGISTRY.histogram(
+    'offerforge_mongo_command_duration_seconds',
+    'MongoDB command latency',
+    ['command', 'collection', 'outcome']
+)
+OPERATION_SECONDS = REGISTRY.histogram(
+    'offerforge_operation_duration_seconds',
+    'CPU-bound render and export steps (landing pages, PDF, archives)',
+    ['operation']
+)
+EXPORT_SECONDS = REGISTRY.histogram(
+    'offerforge_export_duration_seconds',
+    'Time to produce an export, cache and export pool included',
+    ['export_type']
+)
+EXPORT_BYTES = REGISTRY.histogram(
+    'offerforge_export_size_bytes',
+    'Size of produced exports',
+    ['export_type'],
+    buckets=SIZE_BUCKETS
+)
+EVENT_LOOP_LAG_SECONDS = REGISTRY.histogram(
+    'offerforge_event_loop_lag_seconds',
+    'How late the event loop ran a timer it was asked to wake up'
+)
+EVENT_LOOP_BLOCKS = REGISTRY.counter(
+    'offerforge_event_loop_blocks_total',
+    'Event loop stalls over the blocking threshold, by the code that was running',
+    ['location']
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels):
+    """Observe the duration of the block, whether it succeeds or raises"""
+    
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(*labels).observe(time.perf_counter() - started)
+
+
+def timed_operation(operation: str):
+    """Decorator recording a (synchronous) function in OPERATION_SECONDS, and
+    as a span when tracing is on"""
+    
+    series = OPERATION_SECONDS.labels(operation)
+    
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - started)
+        
+        if not TRACING_ENABLED:
+            return wrapper
+        
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            with span(operation):
+                return wrapper(*args, **kwargs)
+        return traced
+    
+    return decorator
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request, labelled with the matched
+    route template (never the raw path, which would carry project ids)"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+        
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            # The router stores the matched route in the scope
+            route = scope.get('route')
+            HTTP_REQUEST_SECONDS.labels(
+                scope['method'],
+                getattr(route, 'path', '<unmatched>'),
+                status
+            ).observe(time.perf_counter() - started)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding MONGO_COMMAND_SECONDS; pass it to the
+    client as event_listeners=[MongoCommandMetrics()]"""
+    
+    def __init__(self):
+        self._collections: Dict[Tuple, str] = {}
+    
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            # getMore carries the cursor id there and the collection separately
+            target = event.command.get('collection', '')
+        self._collections[(event.connection_id, event.request_id)] = target
+    
+    def succeeded(self, event):
+        self._finished(event, 'ok')
+    
+    def failed(self, event):
+        self._finished(event, 'error')
+    
+    def _finished(self, event, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), '')
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection, outcome).observe(
+            event.duration_micros / 1_000_000
+        )
+
+
+def check_token(authorization: Optional[str]) -> bool:
+    """Whether a /metrics request may be served"""
+    
+    if not METRICS_TOKEN:
+        return True
+    return hmac.compare_digest(authorization or '', f"Bearer {METRICS_TOKEN}")
@@ -0,0 +1,39 @@
+"""
+Streaming JSON writer for exports.
+Serializes a document piece by piece and hands out UTF-8 chunks of about
+STREAM_CHUNK_SIZE, so a large project is never held as one JSON string (plus
+its encoded and base64 copies) in memory.
+"""
+
+import json
+from typing import Any, Iterator
+
+from archive_stream import STREAM_CHUNK_SIZE
+
+
+def _encoder(compact: bool) -> json.JSONEncoder:
+    """Pretty (indent=2, like the legacy export) or compact JSON; values JSON
+    does not know (ObjectId, datetime) are written as strings"""
+    
+    if compact:
+        return json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str)
+    return json.JSONEncoder(ensure_ascii=False, indent=2, default=str)
+
+
+def iter_json(value: Any, compact: bool = False, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the JSON encoding of value as UTF-8 chunks"""
+    
+    pending = []
+    pending_size = 0
+    
+    for piece in _encoder(compact).iterencode(value):
+        pending.append(piece)
+        pending_size += len(piece)
+        if pending_size >= chunk_size:
+            yield ''.join(pending).encode('utf-8')
+            pending = []
+            pending_size = 0
+    
+    if pending:
+        yield ''.join(pending).encode('utf-8')
+
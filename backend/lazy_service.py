@@ -0,0 +1,57 @@
+"""
+Services built on first use.
+Some service modules are expensive to import (ReportLab for the PDF export,
+openai, pandas for pain research). A LazyService stands in for the instance
+while server.py is imported and builds it on first attribute access, so a
+fresh worker can answer /api/health before paying for them. After startup,
+warm_up() builds what is still pending in a thread, before traffic needs it.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Set to "false" to build deferred services only when a request first needs them
+WARM_UP_ENABLED = os.getenv('WARM_UP_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+
+class LazyService:
+    """Proxy building its service with factory() on first attribute access"""
+    
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+    
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+    
+    def get(self) -> Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names the proxy itself does not have
+        return getattr(self.get(), name)
+
+
+async def warm_up(steps: Dict[str, Callable[[], Any]]):
+    """Run each warm-up step in a thread, one after the other, logging its time"""
+    
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(step)
+        except Exception as e:
+            logger.warning(f"Warm-up of {name} failed, it will load on first use: {str(e)}")
+            continue
+        logger.info(f"Warmed up {name} in {(time.perf_counter() - started) * 1000:.0f} ms")
@@ -0,0 +1,134 @@
+"""
+Event loop lag monitor and blocking-call detector.
+A ticker task measures how late the event loop wakes it up and feeds
+offerforge_event_loop_lag_seconds. A watchdog thread notices when the loop has
+not ticked for LOOP_BLOCK_THRESHOLD_MS and, while the loop is still stuck,
+captures the stack of what is running on it. Handlers that do blocking work on
+the loop (a synchronous client, a PDF build, base64 of a large buffer) are
+logged with that stack and counted per code location.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from instrumentation import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Set to "false" to run without the ticker task and watchdog thread
+LOOP_MONITOR_ENABLED = os.getenv('LOOP_MONITOR_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+# Milliseconds between lag measurements
+LOOP_LAG_INTERVAL_MS = float(os.getenv('LOOP_LAG_INTERVAL_MS', '100'))
+# A stall this long (milliseconds) is reported with the stack of the blocking code
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv('LOOP_BLOCK_THRESHOLD_MS', '250'))
+# Frames of the blocking stack kept in the log
+LOOP_BLOCK_STACK_LIMIT = 40
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def blocking_location(frame) -> str:
+    """Innermost frame of our own code ("server.py:export_project"), else the innermost frame"""
+    
+    innermost = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        label = f"{os.path.basename(filename)}:{frame.f_code.co_name}"
+        if innermost is None:
+            innermost = label
+        if filename.startswith(BACKEND_DIR) and filename != __file__:
+            return label
+        frame = frame.f_back
+    return innermost or 'unknown'
+
+
+class LoopLagMonitor:
+    """Ticker task plus watchdog thread for the running event loop"""
+    
+    def __init__(
+        self,
+        interval_ms: float = LOOP_LAG_INTERVAL_MS,
+        threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS
+    ):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.last_tick = time.monotonic()
+        self.blocks = 0
+        self._block: Optional[Dict[str, Any]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+    
+    async def start(self):
+        """Start measuring the current loop (app startup)"""
+        
+        if self._task is not None:
+            return
+        
+        self._loop_thread = threading.get_ident()
+        self.last_tick = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            # From the previous tick, so a stall before the first sleep is measured too
+            now = time.monotonic()
+            lag = max(now - self.last_tick - self.interval, 0.0)
+            self.last_tick = now
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            
+            # Reported once the loop is back, so the log has the whole stall
+            block, self._block = self._block, None
+            if block is not None:
+                self._report(block, lag)
+    
+    def _watch(self):
+        while not self._stopping.wait(self.threshold / 4):
+            tick = self.last_tick
+            if self._block is not None or time.monotonic() - tick - self.interval < self.threshold:
+                continue
+            
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            block = {
+                'location': blocking_location(frame),
+                'stack': ''.join(traceback.format_list(traceback.extract_stack(frame, limit=LOOP_BLOCK_STACK_LIMIT)))
+            }
+            del frame
+            # The loop may have moved on while the stack was read
+            if self.last_tick == tick:
+                self._block = block
+    
+    def _report(self, block: Dict[str, Any], lag: float):
+        self.blocks += 1
+        EVENT_LOOP_BLOCKS.labels(block['location']).inc()
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f} ms in {block['location']}:\n{block['stack'].rstrip()}"
+        )
+    
+    async def stop(self):
+        """Stop the ticker and the watchdog (app shutdown)"""
+        
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
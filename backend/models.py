@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 
+from webhook_urls import validate_webhook_url
+
 class LanguageEnum(str, Enum):
     PT_BR = "pt-BR"
     EN_US = "en-US"
@@ -52,12 +54,36 @@ class PainPoint(BaseModel):
     source: str  # "manual", "csv", "review"
     category: Optional[str] = None
 
+class PainCsvUpload(BaseModel):
+    file_id: str  # raw file in the pain_uploads GridFS bucket
+    filename: str
+    size: Optional[int] = None  # bytes
+    rows: int
+    total_mentions: int
+    distinct_pains: int
+    uploaded_at: datetime = Field(default_factory=datetime.utcnow)
+
 class PainResearch(BaseModel):
     pain_points: List[PainPoint] = []
     reviews: List[str] = []
     faqs: List[str] = []
     manual_input: Optional[str] = None
-    csv_data: Optional[str] = None
+    csv_data: Optional[str] = None  # small pasted CSVs; large ones go through the upload endpoint
+    csv_upload: Optional[PainCsvUpload] = None
+
+class RankedPain(BaseModel):
+    description: str  # most common wording among the merged duplicates
+    frequency: int  # summed frequency of every duplicate
+    mentions: int  # rows/entries merged into this pain
+    sources: List[str] = []
+    category: Optional[str] = None
+
+class PainAnalysis(BaseModel):
+    top_pains: List[RankedPain] = []
+    reviews: List[str] = []  # distinct, most repeated first
+    faqs: List[str] = []  # distinct, most repeated first
+    total_mentions: int = 0
+    distinct_pains: int = 0
 
 # Offer Generation Models
 class GeneratedOffer(BaseModel):
@@ -101,12 +127,20 @@ class LandingPageTemplate(BaseModel):
     css_content: str
     is_mobile_optimized: bool = True
     language: LanguageEnum = LanguageEnum.PT_BR
+    variant_id: Optional[str] = None  # "template_name:language" for A/B variants
+    template_version: Optional[str] = None  # content hash of the template that rendered it
 
 class GeneratedMaterials(BaseModel):
     vsl_script: Optional[VSLScript] = None
     email_sequence: Optional[EmailSequence] = None
     social_content: List[SocialContent] = []
     landing_page: Optional[LandingPageTemplate] = None
+    landing_page_variants: List[LandingPageTemplate] = []
+
+class LandingPageBatchRequest(BaseModel):
+    templates: List[str] = ["mobile_modern", "classic_sales", "minimal_clean"]
+    languages: Optional[List[LanguageEnum]] = None  # defaults to the project language
+    store: bool = False  # store variants on the project for A/B testing
 
 # Main Project Model
 class Project(BaseModel):
@@ -130,11 +164,20 @@ class Project(BaseModel):
     
     # Export tracking
     exports: List[Dict[str, Any]] = []  # Track export history
+    
+    # Integrations
+    webhook_url: Optional[str] = None  # receives project events (falls back to WEBHOOK_DEFAULT_URL)
 
 class ProjectCreate(BaseModel):
     name: str
     user_id: str
     language: LanguageEnum = LanguageEnum.PT_BR
+    webhook_url: Optional[str] = None
+    
+    @field_validator('webhook_url')
+    @classmethod
+    def check_webhook_url(cls, value: Optional[str]) -> Optional[str]:
+        return validate_webhook_url(value) if value else value
 
 class ProjectUpdate(BaseModel):
     name: Optional[str] = None
@@ -143,6 +186,12 @@ class ProjectUpdate(BaseModel):
     pain_research: Optional[PainResearch] = None
     generated_offer: Optional[GeneratedOffer] = None
     materials: Optional[GeneratedMaterials] = None
+    webhook_url: Optional[str] = None
+    
+    @field_validator('webhook_url')
+    @classmethod
+    def check_webhook_url(cls, value: Optional[str]) -> Optional[str]:
+        return validate_webhook_url(value) if value else value
 
 # API Response Models
 class ProjectResponse(Project):
@@ -164,11 +213,52 @@ class ProjectMetrics(BaseModel):
 # Export Models
 class ExportRequest(BaseModel):
     project_id: str
-    export_type: str  # "html", "pdf", "zip"
+    export_type: str  # "html", "pdf", "zip", "json"
     include_assets: bool = True
+    compact: bool = False  # json: no indentation
+
+class PainUploadResponse(BaseModel):
+    success: bool
+    upload: PainCsvUpload
+    stored_pain_points: int
+    top_pains: List[RankedPain] = []
+    truncated: bool = False  # rare pains were dropped while aggregating
+    message: str
 
 class ExportResponse(BaseModel):
     success: bool
     file_url: Optional[str] = None
     file_data: Optional[str] = None  # base64 for small files
-    message: str
\ No newline at end of file
+    message: str
+
+class ExportJobResponse(ExportResponse):
+    job_id: str
+    status: str  # "queued", "running", "completed", "failed"
+    export_type: str
+    size: Optional[int] = None  # bytes, once completed
+    expires_at: Optional[datetime] = None  # artifact is deleted after this
+
+
+class UsageBucket(BaseModel):
+    # Grouping fields; only the requested ones are set
+    day: Optional[str] = None  # YYYY-MM-DD (UTC)
+    user_id: Optional[str] = None
+    project_id: Optional[str] = None
+    language: Optional[str] = None
+    kind: Optional[str] = None  # prompt kind: headline, proof, vsl, email...
+    material: Optional[str] = None  # offer, vsl, emails, social
+    model: Optional[str] = None
+    requests: int
+    errors: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float  # estimated from the model price table
+    avg_latency_ms: float
+    max_latency_ms: float
+
+class UsageSummary(BaseModel):
+    group_by: List[str]
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    buckets: List[UsageBucket] = []
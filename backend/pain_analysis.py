@@ -0,0 +1,270 @@
+"""
+Pain research analysis for offer prompts.
+Merges the manual pain points, the uploaded CSV, reviews and FAQs into one
+frame, de-duplicates wording variants (case, accents, punctuation) and ranks
+distinct pains by summed frequency with pandas, without ever expanding rows
+by their frequency.
+"""
+
+import csv
+import io
+import os
+from typing import BinaryIO, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from models import PainAnalysis, PainResearch, RankedPain
+
+# Distinct pains kept for prompting
+PAIN_TOP_K = int(os.getenv('PAIN_TOP_K', '10'))
+
+# Recognized CSV headers (case-insensitive); without a description header the first column is used
+DESCRIPTION_COLUMNS = (
+    'description', 'descricao', 'descrição', 'pain', 'pain_point', 'dor',
+    'text', 'texto', 'comment', 'comentario'
+)
+FREQUENCY_COLUMNS = ('frequency', 'frequencia', 'frequência', 'count', 'mentions', 'votes')
+CATEGORY_COLUMNS = ('category', 'categoria')
+
+# Rows parsed at a time from an uploaded CSV file
+PAIN_CSV_CHUNK_ROWS = int(os.getenv('PAIN_CSV_CHUNK_ROWS', '20000'))
+# Distinct pains tracked while aggregating an upload; the rarest are dropped beyond this
+PAIN_AGGREGATE_MAX_KEYS = int(os.getenv('PAIN_AGGREGATE_MAX_KEYS', '20000'))
+
+FRAME_COLUMNS = ['description', 'frequency', 'source', 'category']
+
+
+def _pick_column(columns: Iterable[str], candidates) -> Optional[str]:
+    by_name = {str(column).strip().lower(): column for column in columns}
+    for candidate in candidates:
+        if candidate in by_name:
+            return by_name[candidate]
+    return None
+
+
+def read_pain_csv(csv_data: str) -> pd.DataFrame:
+    """Parse an uploaded pain CSV into description/frequency/source/category rows"""
+    
+    if not csv_data or not csv_data.strip():
+        return pd.DataFrame(columns=FRAME_COLUMNS)
+    
+    raw = pd.read_csv(
+        io.StringIO(csv_data),
+        dtype=str,
+        keep_default_na=False,
+        skipinitialspace=True,
+        on_bad_lines='skip'
+    )
+    return pain_frame_from_csv(raw)
+
+
+def pain_frame_from_csv(raw: pd.DataFrame) -> pd.DataFrame:
+    """Map a parsed CSV (or a chunk of one) to description/frequency/source/category rows"""
+    
+    if raw.empty or not len(raw.columns):
+        return pd.DataFrame(columns=FRAME_COLUMNS)
+    
+    description = _pick_column(raw.columns, DESCRIPTION_COLUMNS) or raw.columns[0]
+    frequency = _pick_column(raw.columns, FREQUENCY_COLUMNS)
+    category = _pick_column(raw.columns, CATEGORY_COLUMNS)
+    
+    frame = pd.DataFrame({'description': raw[description].astype(str)})
+    if frequency is not None:
+        counts = pd.to_numeric(raw[frequency], errors='coerce').fillna(1)
+        frame['frequency'] = counts.clip(lower=1).astype(np.int64)
+    else:
+        frame['frequency'] = 1
+    frame['source'] = 'csv'
+    frame['category'] = raw[category].where(raw[category] != '') if category is not None else None
+    return frame
+
+
+def normalize_texts(texts: pd.Series) -> pd.Series:
+    """Duplicate-detection key: lower case, no accents or punctuation, single spaces"""
+    
+    # Normalize each distinct text once; uploads repeat the same pains a lot
+    codes, uniques = pd.factorize(texts, sort=False)
+    normalized = (
+        pd.Series(uniques, dtype=str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', 'ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.replace(r'[^\w\s]', ' ', regex=True)
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+    )
+    return pd.Series(normalized.to_numpy()[codes], index=texts.index)
+
+
+def rank_pains(frame: pd.DataFrame, top_k: int = PAIN_TOP_K) -> List[RankedPain]:
+    """Merge duplicate pains and return the top_k by summed frequency"""
+    
+    if frame.empty:
+        return []
+    
+    if 'key' not in frame:
+        frame = frame.assign(key=normalize_texts(frame['description']))
+    frame = frame[frame['key'] != '']
+    
+    # Ties keep the order pains were first listed in (stable sort, unsorted groupby);
+    # pre-aggregated frames carry their own mention counts
+    if 'mentions' not in frame:
+        frame = frame.assign(mentions=1)
+    totals = frame.groupby('key', sort=False).agg(frequency=('frequency', 'sum'), mentions=('mentions', 'sum'))
+    top = totals.sort_values(['frequency', 'mentions'], ascending=False, kind='stable').head(top_k)
+    
+    # Only the winners need a wording, sources and category
+    winners = frame[frame['key'].isin(top.index)]
+    wording = (
+        winners.groupby(['key', 'description'], sort=False)['frequency'].sum()
+        .reset_index()
+        .sort_values('frequency', ascending=False, kind='stable')
+        .drop_duplicates('key')
+        .set_index('key')['description']
+    )
+    sources = winners.drop_duplicates(['key', 'source']).groupby('key', sort=False)['source'].agg(list)
+    categories = winners.dropna(subset=['category']).drop_duplicates('key').set_index('key')['category']
+    
+    return [
+        RankedPain(
+            description=wording[key].strip(),
+            frequency=int(row.frequency),
+            mentions=int(row.mentions),
+            sources=sources[key],
+            category=categories.get(key)
+        )
+        for key, row in zip(top.index, top.itertuples(index=False))
+    ]
+
+
+def rank_texts(texts: List[str], top_k: int) -> List[str]:
+    """Distinct texts (reviews, FAQs), most repeated first"""
+    
+    if not texts:
+        return []
+    frame = pd.DataFrame({'description': texts, 'frequency': 1, 'source': 'text', 'category': None})
+    return [pain.description for pain in rank_pains(frame, top_k)]
+
+
+def analyze_pain_research(
+    pain_research: PainResearch,
+    top_k: int = PAIN_TOP_K,
+    text_top_k: int = 5
+) -> PainAnalysis:
+    """Ranked, distinct pains plus the most repeated reviews and FAQs"""
+    
+    frames = []
+    if pain_research.pain_points:
+        frames.append(pd.DataFrame(
+            [pain.model_dump() for pain in pain_research.pain_points],
+            columns=FRAME_COLUMNS
+        ))
+    if pain_research.csv_data:
+        frames.append(read_pain_csv(pain_research.csv_data))
+    
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return PainAnalysis(
+            reviews=rank_texts(pain_research.reviews, text_top_k),
+            faqs=rank_texts(pain_research.faqs, text_top_k)
+        )
+    
+    frame = pd.concat(frames, ignore_index=True)
+    frame['key'] = normalize_texts(frame['description'])
+    
+    return PainAnalysis(
+        top_pains=rank_pains(frame, top_k),
+        reviews=rank_texts(pain_research.reviews, text_top_k),
+        faqs=rank_texts(pain_research.faqs, text_top_k),
+        total_mentions=int(frame['frequency'].sum()),
+        distinct_pains=int(frame.loc[frame['key'] != '', 'key'].nunique())
+    )
+
+
+class PainAggregator:
+    """Incremental pain ranking for CSV files parsed chunk by chunk.
+    
+    Keeps one row per (pain, wording) with summed frequency and mentions, so
+    memory follows the number of distinct pains, not the number of rows; past
+    max_keys distinct pains the rarest ones are dropped (the top of the
+    ranking is what gets stored).
+    """
+    
+    def __init__(self, max_keys: int = PAIN_AGGREGATE_MAX_KEYS):
+        self.max_keys = max_keys
+        self.rows = 0
+        self.total_mentions = 0
+        self.dropped = False
+        # Typed, so the summed counts stay integers (nlargest() refuses object columns)
+        self._state = pd.DataFrame({
+            'key': pd.Series(dtype=object),
+            'description': pd.Series(dtype=object),
+            'frequency': pd.Series(dtype=np.int64),
+            'mentions': pd.Series(dtype=np.int64),
+            'category': pd.Series(dtype=object)
+        })
+    
+    def add(self, frame: pd.DataFrame):
+        """Fold a description/frequency/source/category frame into the aggregate"""
+        
+        if frame.empty:
+            return
+        
+        self.rows += len(frame)
+        self.total_mentions += int(frame['frequency'].sum())
+        
+        frame = frame.assign(key=normalize_texts(frame['description']), mentions=1)
+        frame = frame[frame['key'] != '']
+        merged = pd.concat([self._state, frame[self._state.columns]], ignore_index=True)
+        self._state = (
+            merged.groupby(['key', 'description'], sort=False)
+            .agg(frequency=('frequency', 'sum'), mentions=('mentions', 'sum'), category=('category', 'first'))
+            .reset_index()
+        )
+        
+        # Prune once the cap is well exceeded, not after every chunk
+        if self._state['key'].nunique() > self.max_keys * 2:
+            totals = self._state.groupby('key', sort=False)['frequency'].sum()
+            keep = totals.nlargest(self.max_keys).index
+            self._state = self._state[self._state['key'].isin(keep)].reset_index(drop=True)
+            self.dropped = True
+    
+    def add_csv(self, file: BinaryIO, chunk_rows: int = PAIN_CSV_CHUNK_ROWS):
+        """Parse a CSV file in chunks of chunk_rows rows"""
+        
+        sample = file.read(64 * 1024)
+        file.seek(0)
+        
+        reader = pd.read_csv(
+            file,
+            sep=_sniff_delimiter(sample),
+            dtype=str,
+            keep_default_na=False,
+            skipinitialspace=True,
+            on_bad_lines='skip',
+            encoding='utf-8-sig',
+            encoding_errors='replace',
+            chunksize=chunk_rows
+        )
+        with reader:
+            for raw in reader:
+                self.add(pain_frame_from_csv(raw))
+    
+    @property
+    def distinct_pains(self) -> int:
+        return int(self._state['key'].nunique())
+    
+    def top(self, top_k: int) -> List[RankedPain]:
+        return rank_pains(self._state.assign(source='csv'), top_k)
+
+
+def _sniff_delimiter(sample: bytes) -> str:
+    """Comma, semicolon (common in pt-BR spreadsheet exports) or tab"""
+    
+    text = sample.decode('utf-8', errors='ignore')
+    try:
+        return csv.Sniffer().sniff(text, delimiters=',;\t').delimiter
+    except csv.Error:
+        return ','
@@ -0,0 +1,83 @@
+import logging
+import os
+from datetime import datetime
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Largest pain research CSV accepted by the upload endpoint
+PAIN_UPLOAD_MAX_BYTES = int(float(os.getenv('PAIN_UPLOAD_MAX_MB', '50')) * 1024 * 1024)
+# Aggregated pain points stored on the project from one upload
+PAIN_UPLOAD_MAX_POINTS = int(os.getenv('PAIN_UPLOAD_MAX_POINTS', '200'))
+# Room for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+UPLOAD_PATH_SUFFIX = '/pain-research/csv'
+
+
+def _too_large_detail() -> str:
+    return f"CSV larger than {PAIN_UPLOAD_MAX_BYTES // (1024 * 1024)} MB"
+
+
+class PainUploadLimitMiddleware:
+    """ASGI middleware capping the body of pain research uploads before the
+    multipart parser spools it: a too large Content-Length is answered 413 right
+    away, and a body without one is cut off once it passes the limit"""
+    
+    def __init__(self, app, max_bytes: int = PAIN_UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'POST' or not scope['path'].endswith(UPLOAD_PATH_SUFFIX):
+            return await self.app(scope, receive, send)
+        
+        content_length = dict(scope.get('headers') or []).get(b'content-length')
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse({"detail": _too_large_detail()}, status_code=413, headers={"Connection": "close"})
+            return await response(scope, receive, send)
+        
+        received = 0
+        
+        async def receive_capped():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    # Re-raised by FastAPI's body parsing, answered by its exception handler
+                    raise HTTPException(status_code=413, detail=_too_large_detail())
+            return message
+        
+        await self.app(scope, receive_capped, send)
+
+
+class PainUploadStore:
+    """Raw pain research uploads in a GridFS bucket; projects only keep a reference"""
+    
+    def __init__(self, db, bucket_name: str = 'pain_uploads'):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+    
+    async def save(self, file: BinaryIO, filename: str, project_id: str, content_type: Optional[str] = None):
+        """Copy the file into GridFS chunk by chunk; returns the file id"""
+        
+        return await self.bucket.upload_from_stream(
+            filename,
+            file,
+            metadata={"project_id": project_id, "content_type": content_type, "uploaded_at": datetime.utcnow()}
+        )
+    
+    async def delete(self, file_id):
+        try:
+            await self.bucket.delete(file_id)
+        except Exception as e:
+            logger.warning(f"Could not delete pain upload {file_id}: {str(e)}")
+    
+    async def delete_project(self, project_id: str):
+        async for file_doc in self.files.find({"metadata.project_id": project_id}, {"_id": 1}):
+            await self.delete(file_doc["_id"])
@@ -0,0 +1,263 @@
+"""
+Shared ReportLab styles and flowable factories for the project PDF.
+
+Styles are built once per process and shared by every ExportService; treat
+them as read-only. Static labels ("<b>Nicho:</b>") are parsed once and their
+fragments reused, and generated copy is laid out as plain text without going
+through ReportLab's markup parser.
+
+Line breaking, the bulk of the layout work, depends only on a paragraph's
+text and the frame width. SectionCache keeps the laid-out flowables of recent
+report sections, keyed by a hash of the section content, so a re-export only
+wraps the sections that changed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+from reportlab.platypus import Flowable, PageBreak, Paragraph, Spacer
+from reportlab.platypus.paraparser import ParaFrag, ParaParser
+
+BODY_STYLE = 'CustomBody'
+
+# Laid-out sections kept per process (0 disables the cache)
+PDF_SECTION_CACHE_SIZE = int(os.getenv('PDF_SECTION_CACHE_SIZE', '64'))
+
+
+@lru_cache(maxsize=None)
+def get_stylesheet() -> StyleSheet1:
+    """Sample stylesheet plus the OfferForge report styles (shared, do not mutate)"""
+    
+    styles = getSampleStyleSheet()
+    
+    styles.add(ParagraphStyle(
+        name='CustomHeading1',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=HexColor('#212529'),
+        fontName='Helvetica-Bold'
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='CustomHeading2',
+        parent=styles['Heading2'],
+        fontSize=18,
+        spaceAfter=20,
+        textColor=HexColor('#495057'),
+        fontName='Helvetica-Bold'
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='CustomBody',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=12,
+        textColor=HexColor('#212529'),
+        fontName='Helvetica'
+    ))
+    
+    # Inner lines of a multi-line body text: same metrics, no gap between lines
+    styles.add(ParagraphStyle(
+        name='CustomBodyLine',
+        parent=styles['CustomBody'],
+        spaceAfter=0
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='HighlightBox',
+        parent=styles['Normal'],
+        fontSize=14,
+        spaceAfter=20,
+        textColor=HexColor('#007AFF'),
+        fontName='Helvetica-Bold',
+        borderColor=HexColor('#007AFF'),
+        borderWidth=1,
+        borderPadding=10
+    ))
+    
+    return styles
+
+
+@lru_cache(maxsize=256)
+def _parse_markup(markup: str, style_name: str) -> Tuple[ParaFrag, ...]:
+    """Parse static markup once per style"""
+    
+    style = get_stylesheet()[style_name]
+    _, frags, _ = ParaParser().parse(markup, style)
+    if frags is None:
+        raise ValueError(f"Invalid PDF markup: {markup!r}")
+    return tuple(frags)
+
+
+def _clone(frag: ParaFrag, **attrs) -> ParaFrag:
+    """Copy a cached fragment; ReportLab keeps per-fragment state in these lists"""
+    
+    return frag.clone(link=[], us_lines=[], **attrs)
+
+
+def markup_frags(markup: str, style_name: str = BODY_STYLE) -> List[ParaFrag]:
+    """Fragments for a static markup string"""
+    
+    return [_clone(frag) for frag in _parse_markup(markup, style_name)]
+
+
+def text_frag(text: str, style_name: str = BODY_STYLE, bold: bool = False) -> ParaFrag:
+    """A single fragment for plain text; markup characters are kept literally"""
+    
+    base = _parse_markup('<b>x</b>' if bold else 'x', style_name)[0]
+    return _clone(base, text=text)
+
+
+class LayoutParagraph(Paragraph):
+    """Paragraph that keeps its line breaking and page splits between builds"""
+    
+    # Splits remembered per paragraph; a section is normally split at the same
+    # heights on every build since it starts on a fresh page
+    MAX_SPLITS = 4
+    
+    def wrap(self, availWidth, availHeight):
+        # Line breaking only depends on the width; split() drops blPara when it
+        # has to start over, which invalidates this too
+        if getattr(self, '_wrapped_width', None) == availWidth and hasattr(self, 'blPara'):
+            return self.width, self.height
+        
+        size = super().wrap(availWidth, availHeight)
+        self._wrapped_width = availWidth
+        return size
+    
+    def split(self, availWidth, availHeight):
+        # Reusing the same pieces also reuses their line breaking, instead of
+        # re-wrapping the rest of a long paragraph on every page it spans
+        splits = self.__dict__.setdefault('_splits', {})
+        key = (availWidth, availHeight)
+        if key not in splits:
+            if len(splits) >= self.MAX_SPLITS:
+                splits.clear()
+            splits[key] = super().split(availWidth, availHeight)
+        return list(splits[key])
+
+
+def _reset_layout_flags(flowables):
+    """Clear the marks layout leaves on flowables it pushed to the next page"""
+    
+    for flowable in flowables:
+        flowable.__dict__.pop('_postponed', None)
+        for pieces in getattr(flowable, '_splits', {}).values():
+            _reset_layout_flags([piece for piece in pieces if piece is not flowable])
+
+
+class StoryBuilder:
+    """Collects the flowables of one PDF section"""
+    
+    def __init__(self, styles: Optional[StyleSheet1] = None):
+        self.styles = styles or get_stylesheet()
+        self.story: List[Flowable] = []
+    
+    def markup(self, markup: str, style_name: str = BODY_STYLE):
+        """Static markup, parsed once per process"""
+        
+        self.story.append(LayoutParagraph(markup, self.styles[style_name], frags=markup_frags(markup, style_name)))
+    
+    def text(self, text: str, style_name: str = BODY_STYLE, bold: bool = False):
+        """Plain text in a single paragraph"""
+        
+        self.story.append(LayoutParagraph(text, self.styles[style_name], frags=[text_frag(text, style_name, bold)]))
+    
+    def labeled(self, label_markup: str, value: str, style_name: str = BODY_STYLE):
+        """Static label followed by a plain-text value on the same line"""
+        
+        frags = markup_frags(label_markup, style_name)
+        frags.append(text_frag(f" {value}", style_name))
+        self.story.append(LayoutParagraph(f"{label_markup} {value}", self.styles[style_name], frags=frags))
+    
+    def lines(self, text: str):
+        """Multi-line body text, one paragraph per line.
+        
+        Splitting keeps page breaks cheap: a single paragraph spanning several
+        pages is re-wrapped from the split point on every page.
+        """
+        
+        lines = text.strip('\n').split('\n')
+        last = len(lines) - 1
+        line_style = self.styles['CustomBodyLine']
+        
+        for index, line in enumerate(lines):
+            if index == last or line.strip():
+                self.text(line, BODY_STYLE if index == last else 'CustomBodyLine')
+            else:
+                # Blank line, as the <br/><br/> it used to be rendered with
+                self.story.append(Spacer(1, line_style.leading))
+    
+    def spacer(self, height: float):
+        self.story.append(Spacer(1, height))
+    
+    def page_break(self):
+        self.story.append(PageBreak())
+
+
+def section_key(name: str, content: Any) -> str:
+    """Cache key for a report section: its name and a hash of its content"""
+    
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{name}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class SectionCache:
+    """LRU of laid-out section flowables, keyed by section content hash.
+    
+    Cached flowables keep their layout state, so documents using them are built
+    through build(), one at a time.
+    """
+    
+    def __init__(self, max_sections: int = PDF_SECTION_CACHE_SIZE):
+        self.max_sections = max_sections
+        self._build_lock = threading.Lock()
+        self._sections: "OrderedDict[str, List[Flowable]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_build(self, name: str, content: Any, build: Callable[[Any], List[Flowable]]) -> List[Flowable]:
+        """Flowables for a section, built only when its content changed"""
+        
+        if self.max_sections <= 0:
+            return build(content)
+        
+        key = section_key(name, content)
+        with self._lock:
+            flowables = self._sections.get(key)
+            if flowables is not None:
+                self._sections.move_to_end(key)
+                self.hits += 1
+                return list(flowables)
+            self.misses += 1
+        
+        flowables = build(content)
+        with self._lock:
+            self._sections[key] = flowables
+            while len(self._sections) > self.max_sections:
+                self._sections.popitem(last=False)
+        return list(flowables)
+    
+    def build(self, doc, story: List[Flowable]):
+        """Build a document whose story may contain cached flowables"""
+        
+        with self._build_lock:
+            try:
+                doc.build(list(story))
+            finally:
+                # A flowable still marked as postponed is refused outright the
+                # next time it does not fit
+                _reset_layout_flags(story)
+    
+    def clear(self):
+        with self._lock:
+            self._sections.clear()
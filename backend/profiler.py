@@ -0,0 +1,315 @@
+"""
+On-demand sampling profiler.
+A background thread snapshots the Python stacks of the process every few
+milliseconds and counts them in the folded format ("frame;frame;frame count")
+read by flamegraph.pl, speedscope and inferno. It only runs while asked to:
+for one request carrying a signed X-OfferForge-Profile header, or for a time
+window started from the admin endpoint. Export pool jobs started meanwhile are
+profiled in their worker process into a file of the same profile.
+Disabled unless PROFILER_SECRET is set.
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Signs profile request headers and authorizes the admin endpoints; unset = profiling off
+PROFILER_SECRET = os.getenv('PROFILER_SECRET')
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'offerforge_profiles'))
+# Milliseconds between stack samples
+PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+# Longest window the admin endpoint may profile
+PROFILER_MAX_SECONDS = float(os.getenv('PROFILER_MAX_SECONDS', '120'))
+# Longest validity of a signed profile header
+PROFILER_MAX_TOKEN_SECONDS = 3600
+
+PROFILE_HEADER = 'x-offerforge-profile'
+# Ids made by new_profile_id(); anything else is refused before touching PROFILE_DIR
+PROFILE_ID_PATTERN = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{8}$')
+
+# Python frames threads sit in while waiting; stacks ending there are not work
+IDLE_FRAMES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('thread.py', '_worker'),
+    ('queue.py', 'get'),
+    ('process.py', '_process_worker'),
+    ('connection.py', '_recv')
+}
+
+# Profile started by the request or window being served, inherited by export pool jobs
+active_profile: ContextVar[Optional[str]] = ContextVar('active_profile', default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of every thread but its own into folded-stack counts"""
+    
+    def __init__(self, interval_ms: float = PROFILER_INTERVAL_MS, thread_ids: Optional[List[int]] = None):
+        self.interval = interval_ms / 1000
+        self.thread_ids = thread_ids
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> 'SamplingProfiler':
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids and thread_id not in self.thread_ids):
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(f"thread {names.get(thread_id, thread_id)}")
+                self.stacks[';'.join(reversed(stack))] += 1
+    
+    def folded(self) -> str:
+        """Stacks in the folded format, most sampled first"""
+        
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def save_profile(profile_id: str, profiler: SamplingProfiler, label: str, part: str = '') -> Path:
+    """Write the folded stacks plus a metadata header comment"""
+    
+    root = Path(PROFILE_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f"{profile_id}{part}.folded"
+    temp_path = path.with_name(f".{path.name}.tmp")
+    # flamegraph.pl and speedscope skip lines that do not end in a count
+    header = (
+        f"# {label}; pid {os.getpid()}; {profiler.duration:.3f}s; "
+        f"{profiler.samples} samples every {profiler.interval * 1000:g}ms\n"
+    )
+    temp_path.write_text(header + profiler.folded(), encoding='utf-8')
+    os.replace(temp_path, path)
+    return path
+
+
+def new_profile_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Stored profiles, newest first, with their files (API process and workers)"""
+    
+    root = Path(PROFILE_DIR)
+    if not root.exists():
+        return []
+    
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for path in root.glob('*.folded'):
+        profile_id = path.name.split('.')[0]
+        entry = profiles.setdefault(profile_id, {'profile_id': profile_id, 'files': [], 'size': 0})
+        entry['files'].append(path.name)
+        entry['size'] += path.stat().st_size
+    return sorted(profiles.values(), key=lambda entry: entry['profile_id'], reverse=True)
+
+
+def read_profile(profile_id: str) -> Optional[str]:
+    """All files of a profile merged into one folded document"""
+    
+    root = Path(PROFILE_DIR)
+    if not PROFILE_ID_PATTERN.match(profile_id) or not root.exists():
+        return None
+    # The API process file plus one .worker-<pid> file per export worker
+    paths = sorted(root.glob(f"{profile_id}.folded")) + sorted(root.glob(f"{profile_id}.worker-*.folded"))
+    if not paths:
+        return None
+    return ''.join(path.read_text(encoding='utf-8') for path in paths)
+
+
+def _header_signature(secret: str, expires: str, nonce: str, method: str, path: str) -> str:
+    message = f"{expires}.{nonce}.{method.upper()} {path}".encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def sign_profile_header(method: str, path: str, ttl: float = 300, secret: Optional[str] = PROFILER_SECRET) -> str:
+    """Value of X-OfferForge-Profile allowing one profiled request to method + path"""
+    
+    expires = str(int(time.time() + ttl))
+    nonce = secrets.token_hex(8)
+    return f"{expires}.{nonce}.{_header_signature(secret, expires, nonce, method, path)}"
+
+
+# Nonces of accepted headers until they expire, so a captured header cannot be replayed
+_used_nonces: Dict[str, float] = {}
+_used_nonces_lock = threading.Lock()
+
+
+def verify_profile_header(value: str, method: str, path: str) -> bool:
+    """True for a valid, unexpired header seen for the first time by this process"""
+    
+    if not PROFILER_SECRET or not value:
+        return False
+    parts = value.split('.')
+    if len(parts) != 3:
+        return False
+    expires, nonce, signature = parts
+    try:
+        expires_at = int(expires)
+    except ValueError:
+        return False
+    now = time.time()
+    if not 0 < expires_at - now <= PROFILER_MAX_TOKEN_SECONDS:
+        return False
+    if not hmac.compare_digest(signature, _header_signature(PROFILER_SECRET, expires, nonce, method, path)):
+        return False
+    
+    with _used_nonces_lock:
+        for used, used_expires_at in list(_used_nonces.items()):
+            if used_expires_at <= now:
+                del _used_nonces[used]
+        if nonce in _used_nonces:
+            return False
+        _used_nonces[nonce] = expires_at
+    return True
+
+
+def check_admin_token(authorization: Optional[str]) -> bool:
+    if not PROFILER_SECRET:
+        return False
+    return hmac.compare_digest(authorization or '', f"Bearer {PROFILER_SECRET}")
+
+
+class ProfilerSession:
+    """One profiler per process at a time: a request or a window"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current: Optional[Dict[str, Any]] = None
+    
+    def begin(self, label: str, window: bool = False) -> Optional[str]:
+        """Start sampling; returns the profile id, or None while another profile runs"""
+        
+        with self._lock:
+            if self.current is not None:
+                return None
+            profiler = SamplingProfiler()
+            profile_id = new_profile_id()
+            self.current = {'profile_id': profile_id, 'label': label, 'window': window, 'profiler': profiler}
+        profiler.start()
+        return profile_id
+    
+    def begin_window(self, seconds: float) -> Optional[str]:
+        """Start a profile saved after seconds, whatever the event loop is doing"""
+        
+        profile_id = self.begin(f"window of {seconds:g}s", window=True)
+        if profile_id is not None:
+            timer = threading.Timer(seconds, self.end, args=(profile_id,))
+            timer.daemon = True
+            timer.start()
+        return profile_id
+    
+    @property
+    def window_id(self) -> Optional[str]:
+        current = self.current
+        return current['profile_id'] if current is not None and current['window'] else None
+    
+    def end(self, profile_id: str) -> Optional[Path]:
+        with self._lock:
+            if self.current is None or self.current['profile_id'] != profile_id:
+                return None
+            current, self.current = self.current, None
+        profiler = current['profiler'].stop()
+        return save_profile(profile_id, profiler, current['label'])
+
+
+session = ProfilerSession()
+
+
+def current_profile_id() -> Optional[str]:
+    """Profile that work started now belongs to: the profiled request's, or the open window's"""
+    
+    return active_profile.get() or session.window_id
+
+
+def run_profiled(profile_id: str, func: Callable, *args) -> Any:
+    """Export pool job wrapper: profile the job in the worker into the same profile"""
+    
+    profiler = SamplingProfiler(thread_ids=[threading.get_ident()])
+    profiler.start()
+    try:
+        return func(*args)
+    finally:
+        profiler.stop()
+        try:
+            save_profile(profile_id, profiler, f"export pool job {getattr(func, '__name__', func)}", part=f".worker-{os.getpid()}")
+        except OSError as e:
+            logger.warning(f"Could not save worker profile {profile_id}: {str(e)}")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that carry a valid signed
+    X-OfferForge-Profile header; answers carry X-Profile-Id"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not PROFILER_SECRET:
+            return await self.app(scope, receive, send)
+        
+        header = dict(scope.get('headers') or []).get(PROFILE_HEADER.encode())
+        if header is None or not verify_profile_header(header.decode('latin-1'), scope['method'], scope['path']):
+            return await self.app(scope, receive, send)
+        
+        profile_id = session.begin(f"{scope['method']} {scope['path']}")
+        if profile_id is None:
+            logger.warning(f"Profile of {scope['method']} {scope['path']} skipped, another profile is running")
+            return await self.app(scope, receive, send)
+        
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers', [])) + [(b'x-profile-id', profile_id.encode())]
+            await send(message)
+        
+        token = active_profile.set(profile_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            active_profile.reset(token)
+            session.end(profile_id)
@@ -1,28 +1,53 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, File, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 import os
+import asyncio
+import importlib
 import logging
 import base64
+import tempfile
+import time
 from pathlib import Path
+from urllib.parse import quote
 from datetime import datetime
-from typing import List, Optional
-import openai
-import stripe
+from typing import Iterator, List, Optional
 
 # Import models and services
 from models import (
     Project, ProjectCreate, ProjectUpdate, ProjectResponse,
     Avatar, AvatarCreate, AvatarResponse,
-    ProductBrief, PainResearch, GeneratedOffer, GeneratedMaterials,
-    VSLScript, EmailSequence, SocialContent, LandingPageTemplate,
-    ProjectMetrics, ExportRequest, ExportResponse,
+    ProductBrief, PainResearch, PainPoint, PainCsvUpload, PainUploadResponse, GeneratedOffer, GeneratedMaterials,
+    VSLScript, EmailSequence, SocialContent, LandingPageTemplate, LandingPageBatchRequest,
+    ProjectMetrics, ExportRequest, ExportResponse, ExportJobResponse, UsageBucket, UsageSummary,
     ProjectStatusEnum, LanguageEnum
 )
 from ai_service import OfferForgeAI
 from landing_generator import LandingPageGenerator
-from export_service import ExportService
+from export_cache import ExportArtifactCache
+from archive_stream import safe_entry_name
+from export_pool import (
+    ExportWorkerPool, ExportPoolBusy, ExportPoolTimeout,
+    render_project_pdf, render_export_package, render_landing_zip
+)
+from webhook_dispatcher import WebhookDispatcher
+from batch_export import BatchExporter
+from pain_uploads import PainUploadStore, PainUploadLimitMiddleware, PAIN_UPLOAD_MAX_BYTES, PAIN_UPLOAD_MAX_POINTS
+from export_jobs import ExportJobManager, COMPLETED, FAILED, parse_byte_range
+from usage_accounting import UsageRecorder, usage_scope, GROUP_FIELDS as USAGE_GROUP_FIELDS
+import tracing
+from tracing import TRACING_ENABLED, TracingMiddleware, MongoCommandTracer
+from instrumentation import (
+    REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_ENABLED, EXPORT_BYTES, EXPORT_SECONDS,
+    MetricsMiddleware, MongoCommandMetrics, check_token as check_metrics_token
+)
+from loop_monitor import LoopLagMonitor, LOOP_MONITOR_ENABLED
+from lazy_service import LazyService, WARM_UP_ENABLED, warm_up
+import profiler
+from profiler import PROFILER_SECRET, PROFILER_MAX_SECONDS, ProfilingMiddleware
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -33,30 +58,69 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
 STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY')
 
-# Initialize external services
-if OPENAI_API_KEY:
-    # Note: OpenAI client initialization is handled in ai_service.py
-    pass
+def _build_export_service():
+    from export_service import ExportService
+    return ExportService()
 
-if STRIPE_SECRET_KEY:
-    stripe.api_key = STRIPE_SECRET_KEY
-
-# Initialize services
+# Initialize services. The OpenAI client, ReportLab (export_service) and pandas
+# (pain_analysis) are loaded on first use or by the warm-up after startup, so a
+# fresh worker answers /api/health quickly.
 ai_service = OfferForgeAI()
 landing_generator = LandingPageGenerator()
-export_service = ExportService()
+export_service = LazyService(_build_export_service)
+export_pool = ExportWorkerPool()
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_listeners = []
+if METRICS_ENABLED:
+    mongo_listeners.append(MongoCommandMetrics())
+if TRACING_ENABLED:
+    mongo_listeners.append(MongoCommandTracer())
+client = AsyncIOMotorClient(mongo_url, event_listeners=mongo_listeners)
 db = client[os.environ['DB_NAME']]
 
+# Rendered exports, keyed by project content and invalidated when the project changes
+export_cache = ExportArtifactCache(db=db)
+
+# OpenAI token usage and estimated cost, written to MongoDB in batches
+usage_recorder = UsageRecorder(db)
+ai_service.usage_recorder = usage_recorder
+
+# Outbound webhooks: queued in MongoDB, delivered by a background task
+webhook_dispatcher = WebhookDispatcher(db)
+
+# Raw pain research CSV uploads (projects store the aggregate only)
+pain_uploads = PainUploadStore(db)
+
+# Multi-project exports stream one archive, rendering a few projects at a time
+batch_exporter = BatchExporter(
+    export_service,
+    render_pdf=lambda project: export_cache.get_or_render(
+        project, "pdf",
+        lambda: export_pool.run(render_project_pdf, project)
+    )
+)
+
+# Event loop lag and stacks of handlers that block it
+loop_monitor = LoopLagMonitor()
+
+# Background exports, stored for resumable download until they expire
+export_jobs = ExportJobManager(db, render=lambda project, export_type, **options: _render_export(project, export_type, **options))
+
 # Create the main app without a prefix
 app = FastAPI(title="OfferForge API", version="2.0.0")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Middleware added later wraps middleware added earlier, so requests pass
+# through tracing, profiling, metrics, CORS and the upload limit in that order
+
+# Oversized pain research uploads are refused before their body is read; added
+# before CORS so the 413 goes out through it and the web app can read it
+app.add_middleware(PainUploadLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -66,10 +130,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
+# Request latency histograms for /metrics; wraps CORS, so preflights and early
+# 413s are timed too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Sampling profile of requests sent with a signed X-OfferForge-Profile header;
+# wraps metrics, so the profile covers everything the latency histogram times
+if PROFILER_SECRET:
+    app.add_middleware(ProfilingMiddleware)
+
+# Server span per request; outermost, so every other span nests under it
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# Queue depths and delivery counters, read when /metrics is scraped
+REGISTRY.gauge_function("offerforge_export_pool_depth", "Export pool jobs running or waiting", lambda: export_pool.depth)
+REGISTRY.gauge_function("offerforge_export_jobs_active", "Background export jobs queued or rendering", lambda: export_jobs.active)
+REGISTRY.counter_function("offerforge_webhooks_delivered_total", "Webhook deliveries acknowledged", lambda: webhook_dispatcher.delivered)
+REGISTRY.counter_function("offerforge_webhooks_retried_total", "Webhook deliveries scheduled for retry", lambda: webhook_dispatcher.retried)
+REGISTRY.counter_function("offerforge_webhooks_dead_lettered_total", "Webhook deliveries dead-lettered", lambda: webhook_dispatcher.dead_lettered)
+
+# Configure logging (records carry the trace id of the request being served)
+tracing.install_log_correlation()
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s'
 )
 logger = logging.getLogger(__name__)
 
@@ -155,8 +241,12 @@ async def update_project(project_id: str, updates: ProjectUpdate):
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
+        
+        await export_cache.invalidate_project(project_id)
             
         updated_project = await db.projects.find_one({"_id": ObjectId(project_id)})
+        if updates.status == ProjectStatusEnum.COMPLETED:
+            await _enqueue_project_event(updated_project, "project_completed")
         updated_project["_id"] = str(updated_project["_id"])
         
         return ProjectResponse(**updated_project)
@@ -173,12 +263,88 @@ async def delete_project(project_id: str):
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
+        
+        await export_cache.invalidate_project(project_id)
+        await pain_uploads.delete_project(project_id)
             
         return {"message": "Project deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting project {project_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to delete project: {str(e)}")
 
+@api_router.post("/projects/{project_id}/pain-research/csv", response_model=PainUploadResponse)
+async def upload_pain_csv(project_id: str, file: UploadFile = File(...)):
+    """Upload a pain research CSV: aggregated into pain points, raw file kept in GridFS"""
+    try:
+        from bson import ObjectId
+        project = await db.projects.find_one({"_id": ObjectId(project_id)}, {"pain_research": 1})
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        # PainUploadLimitMiddleware refused bodies over the limit plus multipart
+        # framing before they were spooled; this is the exact check on the file
+        if file.size is not None and file.size > PAIN_UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"CSV larger than {PAIN_UPLOAD_MAX_BYTES // (1024 * 1024)} MB")
+        
+        # Parsed and aggregated in chunks, off the event loop (pandas is
+        # imported there too when the warm-up has not loaded it yet)
+        pain_analysis = await asyncio.to_thread(importlib.import_module, "pain_analysis")
+        aggregator = pain_analysis.PainAggregator()
+        try:
+            await asyncio.to_thread(aggregator.add_csv, file.file)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV: {str(e)}")
+        if aggregator.distinct_pains == 0:
+            raise HTTPException(status_code=400, detail="CSV has no pain descriptions")
+        
+        await file.seek(0)
+        file_id = await pain_uploads.save(file.file, file.filename or "pain_research.csv", project_id, file.content_type)
+        
+        top_pains = aggregator.top(PAIN_UPLOAD_MAX_POINTS)
+        upload = PainCsvUpload(
+            file_id=str(file_id),
+            filename=file.filename or "pain_research.csv",
+            size=file.size,
+            rows=aggregator.rows,
+            total_mentions=aggregator.total_mentions,
+            distinct_pains=aggregator.distinct_pains
+        )
+        
+        # A new upload replaces the pain points of the previous one; manual ones stay
+        pain_research = project.get("pain_research") or {}
+        previous_upload = pain_research.get("csv_upload")
+        pain_points = [point for point in pain_research.get("pain_points", []) if point.get("source") != "csv"]
+        pain_points.extend(
+            PainPoint(description=pain.description, frequency=pain.frequency, source="csv", category=pain.category).dict()
+            for pain in top_pains
+        )
+        pain_research.update(pain_points=pain_points, csv_upload=upload.dict(), csv_data=None)
+        
+        await db.projects.update_one(
+            {"_id": ObjectId(project_id)},
+            {"$set": {"pain_research": pain_research, "updated_at": datetime.utcnow()}}
+        )
+        if previous_upload:
+            await pain_uploads.delete(ObjectId(previous_upload["file_id"]))
+        
+        return PainUploadResponse(
+            success=True,
+            upload=upload,
+            stored_pain_points=len(top_pains),
+            top_pains=top_pains[:10],
+            truncated=aggregator.dropped,
+            message=f"{aggregator.rows} rows aggregated into {aggregator.distinct_pains} distinct pains"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error uploading pain research CSV for project {project_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to upload pain research CSV: {str(e)}")
+    finally:
+        await file.close()
+
 # Avatar Management Endpoints
 @api_router.post("/avatars", response_model=AvatarResponse)
 async def create_avatar(avatar: AvatarCreate):
@@ -210,6 +376,15 @@ async def get_avatars(limit: int = 50):
         logger.error(f"Error fetching avatars: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch avatars: {str(e)}")
 
+# OpenAI usage attribution
+def _project_usage_scope(project: dict):
+    """Attribute the OpenAI completions made for a project to it and its user"""
+    return usage_scope(
+        project_id=str(project["_id"]),
+        user_id=project.get("user_id"),
+        language=project.get("language", "pt-BR")
+    )
+
 # AI-Powered Content Generation Endpoints
 @api_router.post("/generate/offer/{project_id}")
 async def generate_offer(project_id: str):
@@ -230,7 +405,8 @@ async def generate_offer(project_id: str):
         language = LanguageEnum(project.get("language", "pt-BR"))
         
         # Generate offer using AI
-        generated_offer = await ai_service.generate_offer(brief, pain_research, language)
+        with _project_usage_scope(project):
+            generated_offer = await ai_service.generate_offer(brief, pain_research, language)
         
         # Update project with generated offer
         update_result = await db.projects.update_one(
@@ -244,6 +420,7 @@ async def generate_offer(project_id: str):
                 }
             }
         )
+        await export_cache.invalidate_project(project_id)
         
         return {"success": True, "offer": generated_offer.dict()}
         
@@ -277,20 +454,21 @@ async def generate_materials(project_id: str, material_types: List[str] = None):
         
         generated_materials = {}
         
-        # Generate VSL Script
-        if "vsl" in material_types:
-            vsl_script = await ai_service.generate_vsl_script(offer, brief, language)
-            generated_materials["vsl_script"] = vsl_script.dict()
-        
-        # Generate Email Sequence
-        if "emails" in material_types:
-            email_sequence = await ai_service.generate_email_sequence(offer, brief, language)
-            generated_materials["email_sequence"] = email_sequence.dict()
-        
-        # Generate Social Content
-        if "social" in material_types:
-            social_content = await ai_service.generate_social_content(offer, brief, language)
-            generated_materials["social_content"] = [content.dict() for content in social_content]
+        with _project_usage_scope(project):
+            # Generate VSL Script
+            if "vsl" in material_types:
+                vsl_script = await ai_service.generate_vsl_script(offer, brief, language)
+                generated_materials["vsl_script"] = vsl_script.dict()
+            
+            # Generate Email Sequence
+            if "emails" in material_types:
+                email_sequence = await ai_service.generate_email_sequence(offer, brief, language)
+                generated_materials["email_sequence"] = email_sequence.dict()
+            
+            # Generate Social Content
+            if "social" in material_types:
+                social_content = await ai_service.generate_social_content(offer, brief, language)
+                generated_materials["social_content"] = [content.dict() for content in social_content]
         
         # Update project with generated materials
         update_result = await db.projects.update_one(
@@ -303,6 +481,10 @@ async def generate_materials(project_id: str, material_types: List[str] = None):
                 }
             }
         )
+        await export_cache.invalidate_project(project_id)
+        
+        project.update(materials=generated_materials, status=ProjectStatusEnum.MATERIALS_GENERATED)
+        await _enqueue_project_event(project, "materials_generated")
         
         return {"success": True, "materials": generated_materials}
         
@@ -338,6 +520,7 @@ async def generate_landing_page(project_id: str, template_name: str = "mobile_mo
         current_materials = project.get("materials", {})
         current_materials["landing_page"] = {
             "template_name": template_name,
+            "template_version": landing_page["template_version"],
             "html_content": landing_page["html"],
             "css_content": landing_page["css"],
             "js_content": landing_page["js"],
@@ -356,6 +539,10 @@ async def generate_landing_page(project_id: str, template_name: str = "mobile_mo
                 }
             }
         )
+        await export_cache.invalidate_project(project_id)
+        
+        project.update(materials=current_materials, status=ProjectStatusEnum.MATERIALS_GENERATED)
+        await _enqueue_project_event(project, "landing_page_generated")
         
         return {"success": True, "landing_page": landing_page}
         
@@ -365,7 +552,102 @@ async def generate_landing_page(project_id: str, template_name: str = "mobile_mo
         logger.error(f"Error generating landing page for project {project_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate landing page: {str(e)}")
 
+@api_router.post("/generate/landing-pages/{project_id}")
+async def generate_landing_page_variants(project_id: str, batch_request: LandingPageBatchRequest):
+    """Generate several template x language landing page variants from a single project read"""
+    try:
+        from bson import ObjectId
+        project = await db.projects.find_one({"_id": ObjectId(project_id)})
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+            
+        if not project.get("brief") or not project.get("generated_offer"):
+            raise HTTPException(status_code=400, detail="Project must have brief and generated offer")
+        
+        unknown_templates = [name for name in batch_request.templates if name not in landing_generator.templates]
+        if not batch_request.templates or unknown_templates:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid templates: {unknown_templates}. Supported: {', '.join(landing_generator.templates)}"
+            )
+        
+        # Convert dict to Pydantic models once for every variant
+        brief = ProductBrief(**project["brief"])
+        offer = GeneratedOffer(**project["generated_offer"])
+        languages = batch_request.languages or [LanguageEnum(project.get("language", "pt-BR"))]
+        
+        variants = landing_generator.generate_landing_page_variants(offer, brief, batch_request.templates, languages)
+        
+        if batch_request.store:
+            current_materials = project.get("materials") or {}
+            current_materials["landing_page_variants"] = [
+                {
+                    "variant_id": variant["variant_id"],
+                    "template_name": variant["template_name"],
+                    "template_version": variant["template_version"],
+                    "html_content": variant["html"],
+                    "css_content": variant["css"],
+                    "js_content": variant["js"],
+                    "is_mobile_optimized": True,
+                    "language": variant["language"],
+                    "generated_at": variant["generated_at"]
+                }
+                for variant in variants
+            ]
+            
+            await db.projects.update_one(
+                {"_id": ObjectId(project_id)},
+                {
+                    "$set": {
+                        "materials": current_materials,
+                        "status": ProjectStatusEnum.MATERIALS_GENERATED,
+                        "updated_at": datetime.utcnow()
+                    }
+                }
+            )
+            await export_cache.invalidate_project(project_id)
+        
+        return {"success": True, "stored": batch_request.store, "variants": variants}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating landing page variants for project {project_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate landing page variants: {str(e)}")
+
+# Landing page template registry
+@api_router.get("/templates")
+async def get_templates():
+    """List landing page templates with their current content-hash versions"""
+    try:
+        return {"templates": landing_generator.registry.versions()}
+    except Exception as e:
+        logger.error(f"Error listing templates: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list templates: {str(e)}")
+
+@api_router.post("/templates/reload")
+async def reload_templates(template_name: Optional[str] = None):
+    """Recompile templates changed on disk without restarting the worker"""
+    try:
+        if template_name and template_name not in landing_generator.templates:
+            raise HTTPException(status_code=404, detail="Template not found")
+        
+        return {"success": True, "templates": landing_generator.registry.reload(template_name)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reloading templates: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to reload templates: {str(e)}")
+
 # NEW: Export Endpoints
+EXPORT_MESSAGES = {
+    "zip": "Complete project package exported successfully",
+    "pdf": "Project exported as PDF successfully",
+    "html": "Landing page exported as HTML package successfully",
+    "json": "Project materials exported as JSON successfully"
+}
+
 @api_router.post("/export/{project_id}")
 async def export_project(project_id: str, export_request: ExportRequest):
     """Export project in various formats (HTML, PDF, ZIP)"""
@@ -377,75 +659,485 @@ async def export_project(project_id: str, export_request: ExportRequest):
             raise HTTPException(status_code=404, detail="Project not found")
         
         export_type = export_request.export_type.lower()
+        file_bytes = await _render_export(project, export_type, compact=export_request.compact)
         
-        if export_type == "zip":
-            # Create complete ZIP package
-            zip_base64 = export_service.create_complete_export_package(
-                project,
-                include_landing_page=True,
-                include_pdf=True,
-                include_json=True
+        file_url = f"/api/export/{project_id}/download?export_type={export_type}"
+        if export_type == "json" and export_request.compact:
+            file_url += "&compact=true"
+        return ExportResponse(
+            success=True,
+            file_url=file_url,
+            file_data=_to_base64(file_bytes),
+            message=EXPORT_MESSAGES[export_type]
+        )
+        
+    except HTTPException:
+        raise
+    except ExportPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ExportPoolTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error exporting project {project_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to export project: {str(e)}")
+
+async def _render_export(project: dict, export_type: str, compact: bool = False) -> bytes:
+    """Render one export of a project as bytes, through the export cache and worker pool"""
+    started = time.perf_counter()
+    data = await _build_export(project, export_type, compact)
+    EXPORT_SECONDS.labels(export_type).observe(time.perf_counter() - started)
+    EXPORT_BYTES.labels(export_type).observe(len(data))
+    return data
+
+async def _build_export(project: dict, export_type: str, compact: bool) -> bytes:
+    if export_type == "zip":
+        # Create complete ZIP package
+        return await export_cache.get_or_render(
+            project, "zip",
+            lambda: export_pool.run(render_export_package, project),
+            variant=export_service.compression_policy.profile
+        )
+    
+    if export_type == "pdf":
+        return await export_cache.get_or_render(
+            project, "pdf",
+            lambda: export_pool.run(render_project_pdf, project)
+        )
+    
+    if export_type == "html":
+        # Export landing page HTML
+        landing_page = project.get("materials", {}).get("landing_page")
+        if not landing_page:
+            raise HTTPException(status_code=400, detail="Landing page not generated yet")
+        
+        # Create ZIP with HTML files
+        return await export_cache.get_or_render(
+            project, "html",
+            lambda: export_pool.run(render_landing_zip, _landing_page_export(landing_page), _export_file_stem(project)),
+            variant=landing_generator.compression_policy.profile
+        )
+    
+    if export_type == "json":
+        return b"".join(export_service.iter_materials_json(project, compact=compact))
+    
+    raise HTTPException(status_code=400, detail="Invalid export type. Supported: zip, pdf, html, json")
+
+def _to_base64(data: bytes) -> str:
+    """Legacy JSON export responses carry the file as base64; only done at the HTTP edge"""
+    return base64.b64encode(data).decode("ascii")
+
+def _export_file_stem(project: dict) -> str:
+    """File name used for a project's export archives"""
+    return safe_entry_name(project.get("name"))
+
+def _export_filename(project: dict, export_type: str) -> str:
+    """Download file name for one export type"""
+    file_stem = _export_file_stem(project)
+    return {
+        "zip": f"{file_stem}.zip",
+        "html": f"{file_stem}_landing_page.zip",
+        "pdf": f"{file_stem}.pdf",
+        "json": f"{file_stem}_materials.json"
+    }[export_type]
+
+def _landing_page_export(landing_page: dict) -> dict:
+    """Stored landing page document -> dict expected by LandingPageGenerator ZIP export"""
+    return {
+        "html": landing_page["html_content"],
+        "css": landing_page["css_content"],
+        "js": landing_page.get("js_content", ""),
+        "template_name": landing_page.get("template_name", "mobile_modern"),
+        "template_version": landing_page.get("template_version", "unknown"),
+        "generated_at": landing_page.get("generated_at", datetime.now().isoformat())
+    }
+
+def _attachment_headers(filename: str) -> dict:
+    """Content-Disposition for a download, safe for non-ASCII project names"""
+    ascii_name = filename.encode("ascii", "ignore").decode() or "export"
+    return {"Content-Disposition": f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"}
+
+def _tee_to_spool(chunks: Iterator[bytes], spool, state: dict) -> Iterator[bytes]:
+    """Pass chunks through to the response while keeping a copy for the export cache"""
+    for chunk in chunks:
+        spool.write(chunk)
+        yield chunk
+    state["complete"] = True
+
+async def _cache_spooled_export(key: str, project_id: str, spool, state: dict):
+    """Background task: store a fully streamed export in the cache"""
+    try:
+        if state.get("complete"):
+            spool.seek(0)
+            await export_cache.put(key, project_id, spool)
+    finally:
+        spool.close()
+
+@api_router.get("/export/{project_id}/download")
+async def download_export(project_id: str, export_type: str = "zip", compact: bool = False):
+    """Download a project export as binary (zip/html/json streamed in chunks, no base64)"""
+    try:
+        from bson import ObjectId
+        project = await db.projects.find_one({"_id": ObjectId(project_id)})
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        export_type = export_type.lower()
+        file_stem = _export_file_stem(project)
+        
+        if export_type == "pdf":
+            pdf_bytes = await export_cache.get_or_render(
+                project, "pdf",
+                lambda: export_pool.run(render_project_pdf, project)
             )
-            
-            return ExportResponse(
-                success=True,
-                file_data=zip_base64,
-                message=f"Complete project package exported successfully"
+            return Response(
+                content=pdf_bytes,
+                media_type="application/pdf",
+                headers=_attachment_headers(_export_filename(project, "pdf"))
             )
         
-        elif export_type == "pdf":
-            # Export as PDF
-            pdf_base64 = export_service.export_project_pdf(project)
-            
-            return ExportResponse(
-                success=True,
-                file_data=pdf_base64,
-                message="Project exported as PDF successfully"
+        if export_type == "json":
+            # Serialized straight into the response; compact drops indentation
+            return StreamingResponse(
+                export_service.iter_materials_json(project, compact=compact),
+                media_type="application/json",
+                headers=_attachment_headers(_export_filename(project, "json"))
             )
         
+        if export_type == "zip":
+            filename = _export_filename(project, "zip")
+            cache_key = export_cache.key_for(project, "zip", export_service.compression_policy.profile)
         elif export_type == "html":
-            # Export landing page HTML
             landing_page = project.get("materials", {}).get("landing_page")
             if not landing_page:
                 raise HTTPException(status_code=400, detail="Landing page not generated yet")
-            
-            # Create ZIP with HTML files
-            zip_base64 = landing_generator.generate_zip_export(
-                {
-                    "html": landing_page["html_content"],
-                    "css": landing_page["css_content"],
-                    "js": landing_page.get("js_content", ""),
-                    "template_name": landing_page.get("template_name", "mobile_modern"),
-                    "generated_at": landing_page.get("generated_at", datetime.now().isoformat())
-                },
-                project.get("name", "OfferForge_Project").replace(" ", "_")
+            filename = _export_filename(project, "html")
+            cache_key = export_cache.key_for(project, "html", landing_generator.compression_policy.profile)
+        else:
+            raise HTTPException(status_code=400, detail="Invalid export type. Supported: zip, html, pdf, json")
+        
+        cached = await export_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/zip", headers=_attachment_headers(filename))
+        
+        if export_type == "zip":
+            # The PDF is the expensive part: render it in the export pool, then
+            # write and send the package entry by entry
+            pdf_bytes = await export_cache.get_or_render(
+                project, "pdf",
+                lambda: export_pool.run(render_project_pdf, project)
             )
-            
-            return ExportResponse(
-                success=True,
-                file_data=zip_base64,
-                message="Landing page exported as HTML package successfully"
+            chunks = export_service.iter_complete_export_package(
+                project,
+                include_landing_page=True,
+                include_pdf=True,
+                include_json=True,
+                pdf_bytes=pdf_bytes
             )
+        else:
+            chunks = landing_generator.iter_zip_export(_landing_page_export(landing_page), file_stem)
         
-        elif export_type == "json":
-            # Export as JSON
-            json_content = export_service.export_materials_json(project)
-            
-            return ExportResponse(
-                success=True,
-                file_data=base64.b64encode(json_content.encode()).decode(),
-                message="Project materials exported as JSON successfully"
-            )
+        background = None
+        if export_cache.enabled:
+            # Spooled copy (in memory up to 1 MiB, then on disk) stored once the download completes
+            spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+            state = {"complete": False}
+            chunks = _tee_to_spool(chunks, spool, state)
+            background = BackgroundTask(_cache_spooled_export, cache_key, project_id, spool, state)
         
-        else:
-            raise HTTPException(status_code=400, detail="Invalid export type. Supported: zip, pdf, html, json")
+        # Sync iterators are consumed in the threadpool, off the event loop
+        return StreamingResponse(
+            chunks,
+            media_type="application/zip",
+            headers=_attachment_headers(filename),
+            background=background
+        )
         
     except HTTPException:
         raise
+    except ExportPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ExportPoolTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        logger.error(f"Error exporting project {project_id}: {str(e)}")
+        logger.error(f"Error downloading export for project {project_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to export project: {str(e)}")
 
+@api_router.get("/export/user/{user_id}/download")
+async def download_user_export(user_id: str, include_pdf: bool = True):
+    """Download every project of a user as one streamed ZIP (a folder per project)"""
+    try:
+        if not await db.projects.find_one({"user_id": user_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="No projects found for this user")
+        
+        # Sorted cursor: projects are fetched as render slots free up, never all at
+        # once; batches of one render wave, so the driver does not prefetch 101 documents
+        cursor = db.projects.find({"user_id": user_id}).sort("_id", 1).batch_size(batch_exporter.concurrency)
+        return StreamingResponse(
+            batch_exporter.iter_archive(cursor, include_pdf=include_pdf),
+            media_type="application/zip",
+            headers=_attachment_headers(f"OfferForge_{user_id}.zip")
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting projects of user {user_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to export projects: {str(e)}")
+
+# Export jobs: submit, poll, then download the stored artifact (resumable)
+@api_router.post("/export/{project_id}/jobs", response_model=ExportJobResponse, status_code=202)
+async def submit_export_job(project_id: str, export_request: ExportRequest):
+    """Start an export in the background; poll the job and download it when completed"""
+    try:
+        from bson import ObjectId
+        project = await db.projects.find_one({"_id": ObjectId(project_id)})
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        export_type = export_request.export_type.lower()
+        if export_type not in EXPORT_MESSAGES:
+            raise HTTPException(status_code=400, detail="Invalid export type. Supported: zip, pdf, html, json")
+        if export_type == "html" and not project.get("materials", {}).get("landing_page"):
+            raise HTTPException(status_code=400, detail="Landing page not generated yet")
+        
+        job = await export_jobs.submit(
+            project, export_type, _export_filename(project, export_type),
+            compact=export_request.compact
+        )
+        return _export_job_response(job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting export job for project {project_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit export job: {str(e)}")
+
+@api_router.get("/export/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(job_id: str):
+    """Export job status; file_url is set once the artifact can be downloaded"""
+    try:
+        from bson import ObjectId
+        job = await export_jobs.get(ObjectId(job_id))
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Export job not found")
+        
+        return _export_job_response(job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching export job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch export job: {str(e)}")
+
+@api_router.api_route("/export/jobs/{job_id}/download", methods=["GET", "HEAD"])
+async def download_export_job(job_id: str, request: Request):
+    """Download a finished export; supports Range/If-Range so interrupted downloads can resume"""
+    try:
+        from bson import ObjectId
+        job = await export_jobs.get(ObjectId(job_id))
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Export job not found")
+        if job["status"] != COMPLETED:
+            raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+        
+        if job["expires_at"] < datetime.utcnow() or not await export_jobs.has_artifact(job):
+            raise HTTPException(status_code=410, detail="Export artifact expired, please submit the export again")
+        
+        size = job["size"]
+        headers = {"Accept-Ranges": "bytes", "ETag": job["etag"], **_attachment_headers(job["filename"])}
+        
+        # A stale If-Range (the client holds part of another artifact) gets the whole file
+        byte_range = None
+        range_header = request.headers.get("range")
+        if range_header and request.headers.get("if-range", job["etag"]) == job["etag"]:
+            try:
+                byte_range = parse_byte_range(range_header, size)
+            except ValueError:
+                raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+        
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            start, end = 0, size - 1
+            status_code = 200
+        headers["Content-Length"] = str(end - start + 1)
+        
+        if request.method == "HEAD":
+            return Response(status_code=status_code, headers=headers, media_type=job["media_type"])
+        
+        return StreamingResponse(
+            export_jobs.iter_artifact(job, start, end),
+            status_code=status_code,
+            media_type=job["media_type"],
+            headers=headers
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error downloading export job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to download export: {str(e)}")
+
+def _export_job_response(job: dict) -> ExportJobResponse:
+    """Job document -> API response"""
+    job_id = str(job["_id"])
+    messages = {
+        COMPLETED: "Export ready for download",
+        FAILED: f"Export failed: {job.get('error')}"
+    }
+    return ExportJobResponse(
+        success=job["status"] != FAILED,
+        job_id=job_id,
+        status=job["status"],
+        export_type=job["export_type"],
+        size=job.get("size"),
+        expires_at=job.get("expires_at"),
+        file_url=f"/api/export/jobs/{job_id}/download" if job["status"] == COMPLETED else None,
+        message=messages.get(job["status"], "Export in progress")
+    )
+
+async def _enqueue_project_event(project: dict, event: str):
+    """Queue a webhook event for the project's endpoint; never fails the request"""
+    try:
+        endpoint = project.get("webhook_url")
+        payload = export_service.export_webhook_payload(project, endpoint, event=event)
+        await webhook_dispatcher.enqueue(endpoint, event, payload, project_id=str(project["_id"]))
+    except Exception as e:
+        logger.error(f"Error queueing {event} webhook for project {project.get('_id')}: {str(e)}")
+
+# Webhook delivery queue
+@api_router.get("/webhooks/deliveries")
+async def list_webhook_deliveries(status: Optional[str] = None, project_id: Optional[str] = None, limit: int = 50):
+    """List queued, delivered and dead-lettered webhook deliveries (newest first)"""
+    try:
+        query = {}
+        if status:
+            query["status"] = status
+        if project_id:
+            query["project_id"] = project_id
+        
+        cursor = db.webhook_deliveries.find(query, {"payload": 0}).sort("created_at", -1).limit(limit)
+        deliveries = await cursor.to_list(limit)
+        
+        for delivery in deliveries:
+            delivery["_id"] = str(delivery["_id"])
+        
+        return {
+            "deliveries": deliveries,
+            "queue_depth": await webhook_dispatcher.queue_depth()
+        }
+    except Exception as e:
+        logger.error(f"Error listing webhook deliveries: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list webhook deliveries: {str(e)}")
+
+@api_router.post("/webhooks/deliveries/{delivery_id}/retry")
+async def retry_webhook_delivery(delivery_id: str):
+    """Send a dead-lettered delivery again"""
+    try:
+        from bson import ObjectId
+        if not await webhook_dispatcher.retry(ObjectId(delivery_id)):
+            raise HTTPException(status_code=404, detail="Dead-lettered delivery not found")
+        
+        return {"success": True, "delivery_id": delivery_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrying webhook delivery {delivery_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retry webhook delivery: {str(e)}")
+
+# OpenAI usage and estimated cost
+@api_router.get("/usage", response_model=UsageSummary, response_model_exclude_none=True)
+async def get_usage(
+    group_by: str = "day,user_id,kind",
+    user_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 100
+):
+    """OpenAI tokens, latency and estimated cost, aggregated by day, user, prompt kind..."""
+    try:
+        fields = [field.strip() for field in group_by.split(",") if field.strip()]
+        unknown = [field for field in fields if field not in USAGE_GROUP_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot group by {', '.join(unknown)}. Supported: {', '.join(USAGE_GROUP_FIELDS)}"
+            )
+        
+        match = {}
+        if user_id:
+            match["user_id"] = user_id
+        if project_id:
+            match["project_id"] = project_id
+        if start or end:
+            match["created_at"] = {}
+            if start:
+                match["created_at"]["$gte"] = start
+            if end:
+                match["created_at"]["$lt"] = end
+        
+        # Include what is still buffered, so the numbers are current
+        await usage_recorder.flush()
+        buckets = await usage_recorder.summary(fields, match, limit=min(limit, 1000))
+        
+        return UsageSummary(
+            group_by=fields,
+            start=start,
+            end=end,
+            buckets=[UsageBucket(**bucket) for bucket in buckets]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error aggregating OpenAI usage: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get usage: {str(e)}")
+
+# On-demand profiling (admin)
+def _check_profiler_access(request: Request):
+    if not PROFILER_SECRET:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiler.check_admin_token(request.headers.get("authorization")):
+        raise HTTPException(status_code=401, detail="Invalid profiler token")
+
+@api_router.post("/admin/profiles", status_code=202)
+async def start_profile_window(request: Request, seconds: float = 30):
+    """Sample every thread of this worker process (and its export pool jobs) for a time window"""
+    _check_profiler_access(request)
+    if not 0 < seconds <= PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {PROFILER_MAX_SECONDS:g}")
+    
+    profile_id = profiler.session.begin_window(seconds)
+    if profile_id is None:
+        raise HTTPException(status_code=409, detail="Another profile is running on this worker")
+    return {"profile_id": profile_id, "seconds": seconds, "pid": os.getpid()}
+
+@api_router.get("/admin/profiles")
+async def list_profiles(request: Request):
+    """Stored profiles of this host, newest first"""
+    _check_profiler_access(request)
+    return {"profiles": await asyncio.to_thread(profiler.list_profiles)}
+
+@api_router.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, request: Request):
+    """Folded stacks of a profile, for flamegraph.pl, speedscope or inferno"""
+    _check_profiler_access(request)
+    folded = await asyncio.to_thread(profiler.read_profile, profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=folded,
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+    )
+
 # Enhanced Stripe integration
 @api_router.get("/stripe/price-suggestion")
 async def get_price_suggestion(niche: str, target_price: float, currency: str = "BRL"):
@@ -476,6 +1168,7 @@ async def get_price_suggestion(niche: str, target_price: float, currency: str =
         if STRIPE_SECRET_KEY:
             try:
                 # You can add Stripe API calls here for market data
+                # (import stripe here and set stripe.api_key: it is kept out of startup)
                 # For now, we'll use the configured multipliers
                 stripe_data = {"stripe_configured": True}
             except Exception as stripe_error:
@@ -561,6 +1254,47 @@ async def get_metrics():
 # Include the router in the main app
 app.include_router(api_router)
 
+# Operational metrics in the Prometheus text format (/api/metrics has the business metrics)
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not check_metrics_token(request.headers.get("authorization")):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+# Tasks started at startup, kept referenced until they finish
+_background_tasks = set()
+
+async def _warm_up_services():
+    """Load the deferred dependencies once the worker is serving"""
+    await warm_up({
+        "export_service": export_service.get,
+        "openai": lambda: ai_service.client,
+        "pain_analysis": lambda: importlib.import_module("pain_analysis")
+    })
+
+@app.on_event("startup")
+async def start_background_workers():
+    await webhook_dispatcher.start()
+    await export_jobs.start()
+    await usage_recorder.start()
+    if LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+    if WARM_UP_ENABLED:
+        task = asyncio.create_task(_warm_up_services())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await webhook_dispatcher.stop()
+    await export_jobs.stop()
+    await usage_recorder.stop()
+    await loop_monitor.stop()
+    client.close()
+    export_pool.shutdown()
+    tracing.shutdown()
+    # A profiling window still open is saved with what it sampled so far
+    if profiler.session.window_id:
+        profiler.session.end(profiler.session.window_id)
\ No newline at end of file
@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Templates live on disk as templates/landing/<name>/{index.html,styles.css,script.js}
+TEMPLATES_DIR = Path(__file__).parent / 'templates' / 'landing'
+TEMPLATE_FILES = {
+    'html': 'index.html',
+    'css': 'styles.css',
+    'js': 'script.js'
+}
+
+# Seconds between stat checks of a template; 0 disables automatic hot-reload
+TEMPLATE_RELOAD_INTERVAL = float(os.getenv('TEMPLATE_RELOAD_INTERVAL', '2'))
+
+TEMPLATE_VAR_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+CompiledSource = Tuple[Tuple[str, ...], Tuple[str, ...]]
+FileStamp = Tuple[Tuple[int, int], ...]
+
+
+@lru_cache(maxsize=64)
+def compile_template(template: str) -> CompiledSource:
+    """Split a template into literal chunks and the variable names between them"""
+    
+    parts = TEMPLATE_VAR_PATTERN.split(template)
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    name: str
+    version: str  # content hash of the template files
+    html: CompiledSource
+    css: CompiledSource
+    js: str
+    stamp: FileStamp  # (mtime_ns, size) per file, for cheap change detection
+
+
+class TemplateRegistry:
+    """Loads landing page templates from a directory, versions them by content hash
+    and swaps in recompiled templates when their files change on disk"""
+    
+    def __init__(self, templates_dir: Optional[Path] = None, reload_interval: float = TEMPLATE_RELOAD_INTERVAL):
+        self.templates_dir = Path(templates_dir or TEMPLATES_DIR)
+        self.reload_interval = reload_interval
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._names: Optional[List[str]] = None
+        self._names_checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def names(self) -> List[str]:
+        """Names of the templates available on disk"""
+        
+        if self._names is None or self._is_due(self._names_checked_at):
+            self._names = sorted(
+                path.name for path in self.templates_dir.iterdir()
+                if path.is_dir() and (path / TEMPLATE_FILES['html']).is_file()
+            )
+            self._names_checked_at = time.monotonic()
+        
+        return self._names
+    
+    def get(self, name: str) -> CompiledTemplate:
+        """Current compiled template; files are only stat-ed once per reload interval"""
+        
+        template = self._templates.get(name)
+        if template is None:
+            return self._refresh(name)
+        
+        if self._is_due(self._checked_at.get(name, 0.0)):
+            return self._refresh(name)
+        
+        return template
+    
+    def versions(self) -> Dict[str, str]:
+        """Template name -> version for every available template"""
+        
+        return {name: self.get(name).version for name in self.names()}
+    
+    def reload(self, name: Optional[str] = None) -> Dict[str, str]:
+        """Check templates on disk now, recompiling the ones that changed"""
+        
+        self._names = None
+        names = [name] if name else self.names()
+        return {template_name: self._refresh(template_name).version for template_name in names}
+    
+    def _is_due(self, checked_at: float) -> bool:
+        return self.reload_interval > 0 and time.monotonic() - checked_at >= self.reload_interval
+    
+    def _stamp(self, template_dir: Path) -> FileStamp:
+        stamps = []
+        for filename in TEMPLATE_FILES.values():
+            stat = (template_dir / filename).stat()
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stamps)
+    
+    def _refresh(self, name: str) -> CompiledTemplate:
+        """Recompile a template if its files changed; the swap is a single dict assignment"""
+        
+        template_dir = self.templates_dir / name
+        current = self._templates.get(name)
+        
+        try:
+            stamp = self._stamp(template_dir)
+            if current is not None and current.stamp == stamp:
+                self._checked_at[name] = time.monotonic()
+                return current
+            
+            sources = {
+                key: (template_dir / filename).read_text(encoding='utf-8')
+                for key, filename in TEMPLATE_FILES.items()
+            }
+        except OSError as e:
+            if current is None:
+                raise
+            # Keep serving the last good version while files are being replaced
+            logger.warning(f"Template {name} could not be reloaded: {str(e)}")
+            self._checked_at[name] = time.monotonic()
+            return current
+        
+        digest = hashlib.sha256()
+        for key in TEMPLATE_FILES:
+            digest.update(sources[key].encode('utf-8'))
+            digest.update(b'\0')
+        version = digest.hexdigest()[:12]
+        
+        if current is not None and current.version == version:
+            template = CompiledTemplate(name, version, current.html, current.css, current.js, stamp)
+        else:
+            template = CompiledTemplate(
+                name=name,
+                version=version,
+                html=compile_template(sources['html']),
+                css=compile_template(sources['css']),
+                js=sources['js'],
+                stamp=stamp
+            )
+            if current is not None:
+                logger.info(f"Template {name} reloaded: {current.version} -> {version}")
+        
+        with self._lock:
+            self._templates[name] = template
+            self._checked_at[name] = time.monotonic()
+        
+        return template
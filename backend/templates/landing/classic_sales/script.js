@@ -0,0 +1 @@
+// Classic template JS
@@ -0,0 +1 @@
+// Minimal template JS
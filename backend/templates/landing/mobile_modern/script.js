@@ -0,0 +1,63 @@
+// Landing Page Interactions
+function scrollToCTA() {
+    const ctaSection = document.getElementById('cta-section');
+    ctaSection.scrollIntoView({ 
+        behavior: 'smooth',
+        block: 'center'
+    });
+}
+
+function handleCTAClick() {
+    // Track conversion
+    if (typeof gtag !== 'undefined') {
+        gtag('event', 'conversion', {
+            'send_to': 'YOUR_CONVERSION_ID',
+            'value': 1.0,
+            'currency': 'BRL'
+        });
+    }
+    
+    // Show success message or redirect
+    alert('Obrigado pelo interesse! Em breve você será redirecionado para o checkout.');
+    
+    // You can replace this with actual checkout URL
+    // window.location.href = 'https://your-checkout-url.com';
+}
+
+// Add scroll animations
+function addScrollAnimations() {
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+    
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.opacity = '1';
+                entry.target.style.transform = 'translateY(0)';
+            }
+        });
+    }, observerOptions);
+    
+    // Observe all sections
+    document.querySelectorAll('section').forEach(section => {
+        section.style.opacity = '0';
+        section.style.transform = 'translateY(30px)';
+        section.style.transition = 'opacity 0.6s ease, transform 0.6s ease';
+        observer.observe(section);
+    });
+}
+
+// Initialize when page loads
+document.addEventListener('DOMContentLoaded', function() {
+    addScrollAnimations();
+    
+    // Add click tracking to all CTA buttons
+    document.querySelectorAll('.cta-button').forEach(button => {
+        button.addEventListener('click', function() {
+            // Track button clicks
+            console.log('CTA clicked:', this.textContent);
+        });
+    });
+});
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stand-in for offline, reproducible benchmarks
+Serves /v1/chat/completions (plain and streamed) with deterministic content
+in the shapes ai_service.py parses: one line per item, VSL sections separated
+by blank lines, e-mails separated by '---'. Honors model and max_tokens (one
+word counts as one token) and can add latency, pace tokens and answer 429s.
+
+Usage (from backend/):
+    python tools/fake_openai.py --port 8098
+    python tools/fake_openai.py --port 8098 --latency-ms 400 --tokens-per-second 60 --error-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8098/v1 uvicorn server:app
+
+GET /stats shows request counters; DELETE /stats resets them.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MODELS = ['gpt-4', 'gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo']
+
+VOCABULARY = {
+    'pt': (
+        "você resultado método rotina semana treino energia corpo saúde meta plano simples rápido "
+        "garantia bônus oferta hoje agora exclusivo acesso comunidade suporte aula guia desafio "
+        "progresso hábito foco transformação cliente família tempo dinheiro valor confiança prova"
+    ).split(),
+    'en': (
+        "you result method routine week training energy body health goal plan simple fast "
+        "guarantee bonus offer today now exclusive access community support lesson guide challenge "
+        "progress habit focus transformation client family time money value trust proof"
+    ).split()
+}
+
+# Item counts asked for in the prompts ("Liste 5", "Crie uma sequência de 5 e-mails"...)
+COUNT_PATTERN = re.compile(r'\b(?:crie|liste|create|list)\b\D{0,30}?(\d+)', re.IGNORECASE)
+
+
+class ContentWriter:
+    """Deterministic completion text for a prompt; the same request always gets the same answer"""
+    
+    def __init__(self, seed_text: str, language: str):
+        digest = hashlib.sha256(seed_text.encode('utf-8')).digest()
+        self.rng = random.Random(int.from_bytes(digest[:8], 'big'))
+        self.words = VOCABULARY[language]
+    
+    def sentence(self, low: int = 6, high: int = 14) -> str:
+        words = [self.rng.choice(self.words) for _ in range(self.rng.randint(low, high))]
+        return ' '.join(words).capitalize() + '.'
+    
+    def paragraph(self, sentences: int = 3) -> str:
+        return ' '.join(self.sentence() for _ in range(sentences))
+    
+    def write(self, prompt: str) -> str:
+        match = COUNT_PATTERN.search(prompt)
+        count = int(match.group(1)) if match else 1
+        
+        if 'VSL' in prompt:
+            # Hook, problem, solution, benefits, social proof, offer, guarantee, CTA
+            return '\n\n'.join(self.paragraph(2) for _ in range(8))
+        if "'---'" in prompt:
+            emails = [f"{self.sentence(4, 8)}\n{self.paragraph(2)}\n{self.paragraph(2)}" for _ in range(count)]
+            return '\n---\n'.join(emails)
+        if re.search(r'uma linha por|one line per', prompt, re.IGNORECASE):
+            return '\n'.join(self.sentence() for _ in range(count))
+        if re.search(r'apenas com a headline|only with the headline', prompt, re.IGNORECASE):
+            return self.sentence(8, 12)
+        return self.paragraph(4)
+
+
+def _truncate(text: str, max_tokens: Optional[int]):
+    """Cut text to max_tokens words, keeping its line structure; returns (text, tokens, finish_reason)"""
+    
+    tokens = re.findall(r'\S+\s*', text)
+    if max_tokens is None or len(tokens) <= max_tokens:
+        return text, len(tokens), 'stop'
+    return ''.join(tokens[:max_tokens]).rstrip(), max_tokens, 'length'
+
+
+def _error(status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+        headers=headers
+    )
+
+
+def create_app(
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    tokens_per_second: float = 0,
+    error_rate: float = 0,
+    fail_first: int = 0,
+    retry_after: float = 1,
+    seed: int = 42
+) -> FastAPI:
+    """Fake API; latency is per request, tokens_per_second paces the generated tokens
+    (0 = instant), and error_rate/fail_first answer with 429 rate-limit errors"""
+    
+    app = FastAPI(title="OfferForge fake OpenAI")
+    rng = random.Random(seed)
+    state = {'requests': 0, 'rate_limited': 0, 'completion_tokens': 0, 'by_model': {}}
+    
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": model, "object": "model", "owned_by": "offerforge-fake"} for model in MODELS]}
+    
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        state['requests'] += 1
+        
+        model = body.get('model')
+        messages: List[Dict[str, Any]] = body.get('messages') or []
+        if not model or not messages:
+            return _error(400, "'model' and 'messages' are required", 'invalid_request_error')
+        
+        if state['requests'] <= fail_first or rng.random() < error_rate:
+            state['rate_limited'] += 1
+            return _error(
+                429, "Rate limit reached (injected by the fake server)", 'rate_limit_error',
+                headers={"retry-after": f"{retry_after:g}", "retry-after-ms": str(int(retry_after * 1000))}
+            )
+        
+        if latency_ms or jitter_ms:
+            await asyncio.sleep((latency_ms + rng.uniform(0, jitter_ms)) / 1000)
+        
+        prompt = next((m.get('content') or '' for m in reversed(messages) if m.get('role') == 'user'), '')
+        conversation = ' '.join(str(m.get('content') or '') for m in messages)
+        language = 'pt' if re.search(r'portugu[eê]s|você|crie|liste', conversation, re.IGNORECASE) else 'en'
+        
+        writer = ContentWriter(f"{model}\n{conversation}", language)
+        content, completion_tokens, finish_reason = _truncate(writer.write(prompt), body.get('max_tokens'))
+        usage = {
+            "prompt_tokens": len(conversation.split()),
+            "completion_tokens": completion_tokens,
+            "total_tokens": len(conversation.split()) + completion_tokens
+        }
+        state['completion_tokens'] += completion_tokens
+        state['by_model'][model] = state['by_model'].get(model, 0) + 1
+        
+        completion_id = f"chatcmpl-fake{state['requests']:08d}"
+        created = int(time.time())
+        
+        if body.get('stream'):
+            include_usage = bool((body.get('stream_options') or {}).get('include_usage'))
+            return StreamingResponse(
+                _stream(completion_id, created, model, content, finish_reason, usage, include_usage, tokens_per_second),
+                media_type="text/event-stream"
+            )
+        
+        if tokens_per_second:
+            await asyncio.sleep(completion_tokens / tokens_per_second)
+        
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": usage
+        }
+    
+    @app.get("/stats")
+    async def stats():
+        return state
+    
+    @app.delete("/stats")
+    async def reset_stats():
+        state.update(requests=0, rate_limited=0, completion_tokens=0, by_model={})
+        return {"success": True}
+    
+    return app
+
+
+async def _stream(completion_id, created, model, content, finish_reason, usage, include_usage, tokens_per_second):
+    """Server-sent events in the chat.completion.chunk format, one token per chunk"""
+    
+    def event(delta: Dict[str, Any], finish: Optional[str] = None, chunk_usage=None) -> bytes:
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}] if delta is not None else []
+        }
+        if chunk_usage is not None:
+            chunk["usage"] = chunk_usage
+        return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8')
+    
+    yield event({"role": "assistant", "content": ""})
+    for token in re.findall(r'\s*\S+', content):
+        if tokens_per_second:
+            await asyncio.sleep(1 / tokens_per_second)
+        yield event({"content": token})
+    yield event({}, finish_reason)
+    if include_usage:
+        yield event(None, chunk_usage=usage)
+    yield b"data: [DONE]\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible fake for OfferForge")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8098)
+    parser.add_argument('--latency-ms', type=float, default=0, help="added to every request")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="random extra latency, up to this much")
+    parser.add_argument('--tokens-per-second', type=float, default=0, help="generation speed (0 = instant)")
+    parser.add_argument('--error-rate', type=float, default=0, help="fraction of requests answered with 429")
+    parser.add_argument('--fail-first', type=int, default=0, help="requests answered with 429 before any succeeds")
+    parser.add_argument('--retry-after', type=float, default=1, help="seconds sent in retry-after on 429")
+    parser.add_argument('--seed', type=int, default=42, help="seed for jitter and injected errors")
+    args = parser.parse_args()
+    
+    import uvicorn
+    app = create_app(
+        args.latency_ms, args.jitter_ms, args.tokens_per_second,
+        args.error_rate, args.fail_first, args.retry_after, args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test replaying the auto-demo journey
+Each virtual user runs the steps of frontend/app/auto-demo.tsx: create the
+project, add brief and pain research, generate offer, materials and landing
+page, then export ZIP and PDF. A failed step ends that user's journey, as in
+the app. Reports throughput, p50/p95/p99 latency and error rate per step.
+
+Run against a local stack (mongod, the fake LLM and the API):
+    python tools/fake_openai.py --port 8098 --latency-ms 300 --tokens-per-second 80 &
+    OPENAI_BASE_URL=http://127.0.0.1:8098/v1 uvicorn server:app --port 8001 --workers 4 &
+    python tools/load_test.py --base-url http://127.0.0.1:8001 --users 2000 --concurrency 500
+
+--json writes the raw summary for comparing runs.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Same brief as the auto-demo screen
+DEMO_BRIEF = {
+    'niche': 'Marketing Digital',
+    'promise': 'Transforme seu negócio em uma máquina de vendas online e fature R$ 30.000/mês em até 90 dias',
+    'target_price': 997,
+    'currency': 'BRL',
+    'avatar_id': 'auto-demo-avatar',
+    'additional_notes': 'Avatar: Empreendedor Digital (28-45 anos)'
+}
+DEMO_PAINS = [
+    'Não consegue gerar leads qualificados',
+    'Gasta dinheiro em anúncios sem retorno',
+    'Não sabe criar funis de vendas eficazes',
+    'Perde vendas por não ter follow-up adequado'
+]
+DEMO_REVIEWS = [
+    'Preciso de algo que realmente funcione, não mais teoria',
+    'Já tentei vários métodos mas nenhum trouxe resultado prático',
+    'Quero algo que me ensine passo a passo como implementar'
+]
+DEMO_FAQS = [
+    'Funciona para iniciantes no marketing digital?',
+    'Preciso investir muito dinheiro em anúncios?',
+    'Em quanto tempo posso ver os primeiros resultados?'
+]
+
+STEPS = [
+    'create_project', 'update_brief', 'generate_offer', 'generate_materials',
+    'generate_landing_page', 'export_zip', 'export_pdf'
+]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LoadTest:
+    def __init__(self, base_url: str, user_id: str, think_time_ms: float = 0):
+        self.base_url = base_url.rstrip('/')
+        self.user_id = user_id
+        self.think_time_ms = think_time_ms
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.journeys_completed = 0
+        self.project_ids: List[str] = []
+    
+    async def call(self, client: httpx.AsyncClient, step: str, method: str, path: str, **kwargs) -> Optional[Any]:
+        """One timed request; returns the JSON body, or None after recording the failure"""
+        
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, f"{self.base_url}/api{path}", **kwargs)
+            elapsed = time.perf_counter() - started
+            self.latencies[step].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[step][str(response.status_code)] += 1
+                return None
+            body = response.json()
+            if isinstance(body, dict) and body.get('success') is False:
+                self.errors[step]['success=false'] += 1
+                return None
+            return body
+        except httpx.HTTPError as e:
+            self.latencies[step].append(time.perf_counter() - started)
+            self.errors[step][type(e).__name__] += 1
+            return None
+    
+    async def journey(self, client: httpx.AsyncClient, user: int):
+        project = await self.call(client, 'create_project', 'POST', '/projects', json={
+            'name': f"LoadTest {user}: {DEMO_BRIEF['niche']}",
+            'user_id': self.user_id,
+            'language': 'pt-BR'
+        })
+        if not project:
+            return
+        project_id = project['_id']
+        self.project_ids.append(project_id)
+        
+        steps = [
+            ('update_brief', 'PUT', f'/projects/{project_id}', {'json': {
+                'brief': DEMO_BRIEF,
+                'pain_research': {
+                    'pain_points': [
+                        {'description': pain, 'frequency': 3, 'source': 'auto-demo', 'category': 'marketing'}
+                        for pain in DEMO_PAINS
+                    ],
+                    'reviews': DEMO_REVIEWS,
+                    'faqs': DEMO_FAQS,
+                    'manual_input': '\n'.join(DEMO_PAINS)
+                },
+                'status': 'research_completed'
+            }}),
+            ('generate_offer', 'POST', f'/generate/offer/{project_id}', {}),
+            ('generate_materials', 'POST', f'/generate/materials/{project_id}', {'json': ['vsl', 'emails', 'social']}),
+            ('generate_landing_page', 'POST', f'/generate/landing-page/{project_id}', {}),
+            ('export_zip', 'POST', f'/export/{project_id}', {'json': {
+                'project_id': project_id, 'export_type': 'zip', 'include_assets': True
+            }}),
+            ('export_pdf', 'POST', f'/export/{project_id}', {'json': {
+                'project_id': project_id, 'export_type': 'pdf', 'include_assets': True
+            }})
+        ]
+        for step, method, path, kwargs in steps:
+            if self.think_time_ms:
+                await asyncio.sleep(random.uniform(0.5, 1.5) * self.think_time_ms / 1000)
+            if await self.call(client, step, method, path, **kwargs) is None:
+                return
+        
+        self.journeys_completed += 1
+    
+    async def run(self, users: int, concurrency: int, ramp_up: float, timeout: float) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            async def virtual_user(user: int):
+                # Users start spread over the ramp-up, then queue for a concurrency slot
+                if ramp_up:
+                    await asyncio.sleep(ramp_up * user / users)
+                async with semaphore:
+                    await self.journey(client, user)
+            
+            started = time.perf_counter()
+            await asyncio.gather(*(virtual_user(user) for user in range(users)))
+            elapsed = time.perf_counter() - started
+        
+        return self.summary(users, concurrency, elapsed)
+    
+    async def cleanup(self, concurrency: int):
+        async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency), timeout=30) as client:
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async def delete(project_id: str):
+                async with semaphore:
+                    try:
+                        await client.delete(f"{self.base_url}/api/projects/{project_id}")
+                    except httpx.HTTPError:
+                        pass
+            
+            await asyncio.gather(*(delete(project_id) for project_id in self.project_ids))
+    
+    def summary(self, users: int, concurrency: int, elapsed: float) -> Dict[str, Any]:
+        steps = {}
+        for step in STEPS:
+            values = sorted(self.latencies.get(step, []))
+            failed = sum(self.errors[step].values()) if step in self.errors else 0
+            steps[step] = {
+                'requests': len(values),
+                'errors': failed,
+                'error_rate': failed / len(values) if values else 0.0,
+                'error_kinds': dict(self.errors[step]) if step in self.errors else {},
+                'throughput_rps': len(values) / elapsed if elapsed else 0.0,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'max_ms': (values[-1] if values else 0.0) * 1000
+            }
+        
+        total_requests = sum(step['requests'] for step in steps.values())
+        return {
+            'users': users,
+            'concurrency': concurrency,
+            'elapsed_s': elapsed,
+            'journeys_completed': self.journeys_completed,
+            'journeys_per_s': self.journeys_completed / elapsed if elapsed else 0.0,
+            'requests': total_requests,
+            'requests_per_s': total_requests / elapsed if elapsed else 0.0,
+            'steps': steps
+        }
+
+
+def print_report(summary: Dict[str, Any]):
+    print(f"🚦 Load test: {summary['users']} users, concurrency {summary['concurrency']}, "
+          f"{summary['elapsed_s']:.1f}s")
+    print(f"   journeys completed: {summary['journeys_completed']}/{summary['users']} "
+          f"({summary['journeys_per_s']:.2f}/s), {summary['requests']} requests ({summary['requests_per_s']:.1f}/s)")
+    print(f"   {'step':<22} {'reqs':>6} {'err%':>6} {'req/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for step, stats in summary['steps'].items():
+        if not stats['requests']:
+            continue
+        print(f"   {step:<22} {stats['requests']:>6} {stats['error_rate'] * 100:>5.1f}% {stats['throughput_rps']:>7.1f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+        if stats['error_kinds']:
+            kinds = ', '.join(f"{kind}: {count}" for kind, count in sorted(stats['error_kinds'].items()))
+            print(f"   {'':<22} errors: {kinds}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test of the OfferForge user journey")
+    parser.add_argument('--base-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--users', type=int, default=200, help="virtual users (one journey each)")
+    parser.add_argument('--concurrency', type=int, default=50, help="users running at the same time")
+    parser.add_argument('--ramp-up', type=float, default=0, help="seconds over which users start")
+    parser.add_argument('--think-time-ms', type=float, default=0, help="average pause between steps")
+    parser.add_argument('--timeout', type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument('--user-id', default='load-test', help="user_id of the created projects")
+    parser.add_argument('--keep', action='store_true', help="keep the created projects")
+    parser.add_argument('--json', help="write the summary to this file")
+    args = parser.parse_args()
+    
+    load_test = LoadTest(args.base_url, args.user_id, args.think_time_ms)
+    summary = asyncio.run(load_test.run(args.users, args.concurrency, args.ramp_up, args.timeout))
+    print_report(summary)
+    
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(summary, output, indent=2)
+    
+    if not args.keep:
+        asyncio.run(load_test.cleanup(args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Profile one request in production
+Signs an X-OfferForge-Profile header for a method and path with PROFILER_SECRET
+and, with --url, sends the request and downloads the resulting profile. The
+folded stacks can be opened in speedscope or rendered with flamegraph.pl.
+
+Usage (from backend/):
+    PROFILER_SECRET=... python tools/profile_request.py POST /api/export/<project_id>
+    PROFILER_SECRET=... python tools/profile_request.py POST /api/export/<project_id> \\
+        --url https://api.example.com --json '{"project_id": "<project_id>", "export_type": "pdf"}' --output export.folded
+    flamegraph.pl export.folded > export.svg
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from profiler import sign_profile_header
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sign (and optionally send) a profiled request")
+    parser.add_argument('method', help="HTTP method of the request")
+    parser.add_argument('path', help="request path, without the query string")
+    parser.add_argument('--ttl', type=float, default=300, help="seconds the header stays valid")
+    parser.add_argument('--url', help="API base URL; sends the request and fetches the profile")
+    parser.add_argument('--json', help="JSON body of the request")
+    parser.add_argument('--output', default='profile.folded', help="where to save the profile")
+    args = parser.parse_args()
+    
+    secret = os.getenv('PROFILER_SECRET')
+    if not secret:
+        parser.error("PROFILER_SECRET is not set")
+    
+    header = sign_profile_header(args.method, args.path, ttl=args.ttl, secret=secret)
+    if not args.url:
+        print(f"X-OfferForge-Profile: {header}")
+        return
+    
+    base_url = args.url.rstrip('/')
+    print(f"🔬 {args.method.upper()} {args.path} with profiling")
+    with httpx.Client(base_url=base_url, timeout=300) as client:
+        response = client.request(
+            args.method.upper(),
+            args.path,
+            json=json.loads(args.json) if args.json else None,
+            headers={'X-OfferForge-Profile': header}
+        )
+        profile_id = response.headers.get('x-profile-id')
+        print(f"   status {response.status_code}, {response.elapsed.total_seconds() * 1000:.0f} ms")
+        if not profile_id:
+            sys.exit("❌ The request was not profiled (profiling disabled, bad signature or another profile running)")
+        
+        profile = client.get(f"/api/admin/profiles/{profile_id}", headers={'Authorization': f"Bearer {secret}"})
+        profile.raise_for_status()
+        Path(args.output).write_text(profile.text, encoding='utf-8')
+        print(f"✅ Profile {profile_id} saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
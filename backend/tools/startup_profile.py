@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+OfferForge cold-start profiler
+Measures how long a fresh worker takes to import server.py and reports the
+heaviest imports, so the API can stay inside its cold-start budget. Fails when
+the median is over budget or when a dependency meant to load after startup
+(DEFERRED_MODULES, see lazy_service.py) is imported by server.py again. Run in
+CI by .github/workflows/cold-start.yml.
+
+Usage (from backend/):
+    python tools/startup_profile.py
+    python tools/startup_profile.py --runs 5 --top 20 --budget-ms 1500
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Target time for `import server` in a fresh interpreter
+DEFAULT_BUDGET_MS = float(os.getenv('COLD_START_BUDGET_MS', '1500'))
+
+# Loaded on first use or by the warm-up after startup, never by `import server`
+DEFERRED_MODULES = ('openai', 'stripe', 'pandas', 'numpy', 'reportlab')
+
+IMPORT_ONLY_SNIPPET = """
+import server
+"""
+
+IMPORT_SNIPPET = """
+import importlib
+import sys
+import time
+started = time.perf_counter()
+import server
+print(f"IMPORT_MS={(time.perf_counter() - started) * 1000:.1f}")
+print(f"EAGER={','.join(name for name in %r if name in sys.modules)}")
+
+# The same steps as server._warm_up_services
+steps = {
+    "export_service": server.export_service.get,
+    "openai": lambda: server.ai_service.client,
+    "pain_analysis": lambda: importlib.import_module("pain_analysis")
+}
+for name, step in steps.items():
+    started = time.perf_counter()
+    step()
+    print(f"WARMUP_MS[{name}]={(time.perf_counter() - started) * 1000:.1f}")
+""" % (DEFERRED_MODULES,)
+
+
+def _worker_env() -> Dict[str, str]:
+    """Environment for the profiled interpreter; no service is contacted at import time"""
+    
+    env = dict(os.environ)
+    env.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    env.setdefault('DB_NAME', 'offerforge_startup_profile')
+    # So the warm-up builds the OpenAI client (no request is made)
+    env.setdefault('OPENAI_API_KEY', 'startup-profile')
+    return env
+
+
+def measure_import(importtime: bool = False) -> Tuple[Dict[str, float], List[str], str]:
+    """Import server.py in a fresh interpreter and return timings, deferred
+    modules it imported and stderr (with importtime, `import server` only)"""
+    
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime', '-c', IMPORT_ONLY_SNIPPET]
+    else:
+        command += ['-c', IMPORT_SNIPPET]
+    
+    completed = subprocess.run(
+        command,
+        cwd=BACKEND_DIR,
+        env=_worker_env(),
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing server.py failed:\n{completed.stderr}")
+    
+    timings = {}
+    eager = []
+    for line in completed.stdout.splitlines():
+        if line.startswith('EAGER='):
+            eager = [name for name in line[len('EAGER='):].split(',') if name]
+        elif '=' in line and line.split('=', 1)[0].endswith(('_MS', ']')):
+            key, value = line.split('=', 1)
+            timings[key] = float(value)
+    
+    return timings, eager, completed.stderr
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse `-X importtime` output into (module, self_us, cumulative_us) rows"""
+    
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = [part.strip() for part in line.split(':', 1)[1].split('|')]
+        rows.append((module, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def top_level_packages(rows: List[Tuple[str, int, int]]) -> List[Tuple[str, int]]:
+    """Total self time per top-level package"""
+    
+    totals: Dict[str, int] = {}
+    for module, self_us, _ in rows:
+        package = module.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile OfferForge API cold start")
+    parser.add_argument('--runs', type=int, default=3, help="fresh interpreters to time")
+    parser.add_argument('--top', type=int, default=15, help="heaviest packages to list")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="fail above this median import time")
+    args = parser.parse_args()
+    
+    import_times = []
+    warm_up_times: Dict[str, List[float]] = {}
+    eager = set()
+    for _ in range(args.runs):
+        timings, eager_modules, _ = measure_import()
+        import_times.append(timings['IMPORT_MS'])
+        eager.update(eager_modules)
+        for key, value in timings.items():
+            if key.startswith('WARMUP_MS'):
+                warm_up_times.setdefault(key[len('WARMUP_MS['):-1], []).append(value)
+    
+    _, _, stderr = measure_import(importtime=True)
+    packages = top_level_packages(parse_importtime(stderr))
+    
+    median_ms = statistics.median(import_times)
+    
+    print("🚀 OfferForge cold-start profile")
+    print(f"   import server: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(import_times):.1f} ms, max {max(import_times):.1f} ms)")
+    print(f"   budget:        {args.budget_ms:.1f} ms")
+    print()
+    print("Deferred to the warm-up after startup (median ms):")
+    for name, values in warm_up_times.items():
+        print(f"   {name:<24} {statistics.median(values):8.1f}")
+    print()
+    print(f"Heaviest packages by self import time (top {args.top}):")
+    for package, self_us in packages[:args.top]:
+        print(f"   {package:<24} {self_us / 1000:8.1f} ms")
+    
+    failed = False
+    if eager:
+        print(f"\n❌ Imported by server.py instead of on first use: {', '.join(sorted(eager))}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\n❌ Cold start over budget by {median_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if failed:
+        return 1
+    
+    print("\n✅ Cold start within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Break down slow requests from a trace file
+Reads the OTLP/JSON lines written with TRACING_EXPORTER=file and prints the
+slowest traces as span trees: duration, time not covered by child spans
+(self), and the main attributes (collection, model, tokens, route, status).
+
+Usage (from backend/):
+    python tools/trace_report.py /tmp/offerforge_traces.jsonl --top 5
+    python tools/trace_report.py /tmp/offerforge_traces.jsonl --route /api/generate/materials
+    python tools/trace_report.py /tmp/offerforge_traces.jsonl --trace-id <X-Trace-Id of a response>
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from typing import Any, Dict, List
+
+SHOWN_ATTRIBUTES = (
+    'http.response.status_code', 'db.mongodb.collection', 'gen_ai.request.model',
+    'gen_ai.usage.input_tokens', 'gen_ai.usage.output_tokens', 'zip.entry', 'zip.entry.size',
+    'export_pool.depth'
+)
+
+
+def _attribute(value: Dict[str, Any]) -> Any:
+    return next(iter(value.values()), None)
+
+
+def load_spans(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Spans of the file grouped by trace id"""
+    
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get('resourceSpans', []):
+                for scope in resource.get('scopeSpans', []):
+                    for span in scope.get('spans', []):
+                        span['start'] = int(span['startTimeUnixNano'])
+                        span['duration_ms'] = (int(span['endTimeUnixNano']) - span['start']) / 1e6
+                        span['attrs'] = {item['key']: _attribute(item['value']) for item in span.get('attributes', [])}
+                        traces[span['traceId']].append(span)
+    return traces
+
+
+def print_tree(spans: List[Dict[str, Any]]):
+    by_id = {span['spanId']: span for span in spans}
+    children: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    roots = []
+    for span in spans:
+        parent = span.get('parentSpanId')
+        if parent in by_id:
+            children[parent].append(span)
+        else:
+            roots.append(span)
+    
+    def show(span: Dict[str, Any], depth: int):
+        nested = sorted(children[span['spanId']], key=lambda child: child['start'])
+        own = span['duration_ms'] - sum(child['duration_ms'] for child in nested)
+        details = ', '.join(f"{key}={span['attrs'][key]}" for key in SHOWN_ATTRIBUTES if key in span['attrs'])
+        error = f"  ❌ {span['status'].get('message', '')}" if span.get('status', {}).get('code') == 2 else ''
+        print(f"   {'  ' * depth}{span['name']:<{56 - 2 * depth}} {span['duration_ms']:>10.1f} ms "
+              f"(self {max(own, 0):>8.1f})  {details}{error}")
+        for child in nested:
+            show(child, depth + 1)
+    
+    for root in sorted(roots, key=lambda span: span['start']):
+        show(root, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Span tree breakdown of the slowest traces")
+    parser.add_argument('path', help="trace file (TRACING_FILE)")
+    parser.add_argument('--top', type=int, default=5, help="slowest traces to show")
+    parser.add_argument('--route', default='', help="only traces whose root span name contains this")
+    parser.add_argument('--trace-id', help="show this trace only")
+    args = parser.parse_args()
+    
+    traces = load_spans(args.path)
+    if args.trace_id:
+        selected = [args.trace_id] if args.trace_id in traces else []
+    else:
+        def root_of(spans):
+            ids = {span['spanId'] for span in spans}
+            roots = [span for span in spans if span.get('parentSpanId') not in ids]
+            return max(roots, key=lambda span: span['duration_ms'])
+        
+        candidates = [
+            (root_of(spans)['duration_ms'], trace_id) for trace_id, spans in traces.items()
+            if args.route in root_of(spans)['name']
+        ]
+        selected = [trace_id for _, trace_id in sorted(candidates, reverse=True)[:args.top]]
+    
+    print(f"🔎 {len(traces)} traces in {args.path}, showing {len(selected)}")
+    for trace_id in selected:
+        print(f"\n trace {trace_id}")
+        print_tree(traces[trace_id])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a webhook receiver (CRM, Zapier...)
+Accepts OfferForge webhook batches, verifies the signature when a secret is
+given, and can fail on purpose to exercise retries and dead-lettering.
+
+Usage (from backend/):
+    python tools/webhook_sink.py --port 8099
+    python tools/webhook_sink.py --port 8099 --fail-first 3 --fail-status 503
+    WEBHOOK_DEFAULT_URL=http://127.0.0.1:8099/hooks uvicorn server:app
+
+GET /hooks lists the deliveries received so far; DELETE /hooks clears them.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+
+
+def create_app(fail_first: int = 0, fail_status: int = 503, secret: Optional[str] = None) -> FastAPI:
+    """Receiver app; the first fail_first requests are answered with fail_status"""
+
+    app = FastAPI(title="OfferForge webhook sink")
+    state = {'requests': 0, 'deliveries': []}
+
+    @app.post("/hooks")
+    async def receive(request: Request):
+        body = await request.body()
+        state['requests'] += 1
+
+        if secret:
+            expected = 'sha256=' + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+            if not hmac.compare_digest(expected, request.headers.get('X-OfferForge-Signature', '')):
+                raise HTTPException(status_code=401, detail="Invalid signature")
+
+        if state['requests'] <= fail_first:
+            raise HTTPException(status_code=fail_status, detail="Failing on purpose")
+
+        deliveries = json.loads(body)['deliveries']
+        state['deliveries'].extend(deliveries)
+        for delivery in deliveries:
+            print(f"📬 {delivery['event']} (attempt {delivery['attempt']}) {delivery['id']}")
+        return {"received": len(deliveries)}
+
+    @app.get("/hooks")
+    async def received():
+        return {"requests": state['requests'], "deliveries": state['deliveries']}
+
+    @app.delete("/hooks")
+    async def clear():
+        state['requests'] = 0
+        state['deliveries'] = []
+        return {"success": True}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local webhook receiver for OfferForge")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--fail-first', type=int, default=0, help="requests to reject before accepting")
+    parser.add_argument('--fail-status', type=int, default=503, help="status code used when rejecting")
+    parser.add_argument('--secret', help="verify X-OfferForge-Signature with this secret")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.fail_first, args.fail_status, args.secret), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,414 @@
+"""
+Request tracing in the OpenTelemetry data model.
+Spans for HTTP requests, MongoDB commands, chat completions, template
+rendering, PDF layout and ZIP writing share a trace id per request (continued
+from an incoming W3C traceparent header). Log records carry the current trace
+and span ids. Finished spans are exported in batches as OTLP/JSON, appended to
+a file (one export request per line, see tools/trace_report.py) or POSTed to
+an OTLP/HTTP collector. Off unless TRACING_EXPORTER is set.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# "none", "file" or "otlp"
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'none').lower()
+TRACING_FILE = os.getenv('TRACING_FILE', os.path.join(tempfile.gettempdir(), 'offerforge_traces.jsonl'))
+TRACING_OTLP_ENDPOINT = os.getenv('TRACING_OTLP_ENDPOINT', 'http://127.0.0.1:4318/v1/traces')
+TRACING_SERVICE_NAME = os.getenv('TRACING_SERVICE_NAME', 'offerforge-api')
+# Fraction of new traces recorded; continued traces follow the caller's decision
+TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', '1'))
+# Spans waiting for export; new spans are dropped beyond this
+TRACING_MAX_QUEUE = int(os.getenv('TRACING_MAX_QUEUE', '10000'))
+# Seconds between exports
+TRACING_EXPORT_INTERVAL = float(os.getenv('TRACING_EXPORT_INTERVAL', '2'))
+
+TRACING_ENABLED = TRACING_EXPORTER in ('file', 'otlp')
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+
+class Span:
+    __slots__ = ('name', 'kind', 'trace_id', 'span_id', 'parent_id', 'sampled',
+                 'attributes', 'start_ns', 'end_ns', 'error')
+    
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: Optional[str], sampled: bool, attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+    
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+    
+    def record_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+    
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.sampled and _processor is not None:
+                _processor.submit(self)
+
+
+class _NoopSpan:
+    """Stand-in while tracing is off, so instrumented code needs no checks"""
+    
+    trace_id = span_id = None
+    
+    def set_attribute(self, key, value):
+        pass
+    
+    def record_error(self, error):
+        pass
+    
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span id, sampled) from a W3C traceparent header"""
+    
+    match = TRACEPARENT.match((header or '').strip().lower())
+    if not match or match.group(1) == '0' * 32 or match.group(2) == '0' * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def start_span(
+    name: str,
+    kind: int = INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    remote_parent: Optional[Tuple[str, str, bool]] = None
+):
+    """Start a span under the current one (or a remote parent); it is not made current"""
+    
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    elif remote_parent is not None:
+        trace_id, parent_id, sampled = remote_parent
+    else:
+        trace_id, parent_id, sampled = f"{random.getrandbits(128):032x}", None, random.random() < TRACING_SAMPLE_RATE
+    return Span(name, kind, trace_id, parent_id, sampled, dict(attributes or {}))
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, **attributes):
+    """Run the block in a child span of the current one"""
+    
+    if not TRACING_ENABLED:
+        yield NOOP_SPAN
+        return
+    
+    current = start_span(name, kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+@contextmanager
+def remote_span(name: str, remote_parent: Optional[Tuple[str, str, bool]], kind: int = SERVER, **attributes):
+    """Run the block in a span continuing a trace from another process"""
+    
+    if not TRACING_ENABLED:
+        yield NOOP_SPAN
+        return
+    
+    token = _current_span.set(None)
+    current = start_span(name, kind, attributes, remote_parent=remote_parent)
+    _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def trace_context() -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, span_id, sampled) of the current span, to continue the trace elsewhere"""
+    
+    current = _current_span.get()
+    return (current.trace_id, current.span_id, current.sampled) if current is not None else None
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def encode_spans(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of finished spans"""
+    
+    return {'resourceSpans': [{
+        'resource': {'attributes': [
+            {'key': 'service.name', 'value': {'stringValue': TRACING_SERVICE_NAME}},
+            {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}}
+        ]},
+        'scopeSpans': [{
+            'scope': {'name': 'offerforge.tracing'},
+            'spans': [{
+                'traceId': s.trace_id,
+                'spanId': s.span_id,
+                **({'parentSpanId': s.parent_id} if s.parent_id else {}),
+                'name': s.name,
+                'kind': s.kind,
+                'startTimeUnixNano': str(s.start_ns),
+                'endTimeUnixNano': str(s.end_ns),
+                'attributes': [{'key': key, 'value': _attribute_value(value)} for key, value in s.attributes.items()],
+                'status': {'code': 2, 'message': s.error} if s.error else {'code': 0}
+            } for s in spans]
+        }]
+    }]}
+
+
+class FileSpanExporter:
+    def __init__(self, path: str = TRACING_FILE):
+        self.path = path
+    
+    def export(self, spans: List[Span]):
+        # One O_APPEND write per batch, so the API process and the export pool
+        # workers can share the file without interleaving lines
+        line = (json.dumps(encode_spans(spans), ensure_ascii=False) + '\n').encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+class OtlpHttpSpanExporter:
+    def __init__(self, endpoint: str = TRACING_OTLP_ENDPOINT):
+        import httpx
+        self.endpoint = endpoint
+        self.client = httpx.Client(timeout=10)
+    
+    def export(self, spans: List[Span]):
+        response = self.client.post(self.endpoint, json=encode_spans(spans))
+        response.raise_for_status()
+
+
+class BatchSpanProcessor:
+    """Queues finished spans and exports them from a background thread"""
+    
+    def __init__(self, exporter, max_queue: int = TRACING_MAX_QUEUE, interval: float = TRACING_EXPORT_INTERVAL):
+        self.exporter = exporter
+        self.interval = interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+    
+    def submit(self, finished: Span):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.flush()
+        self.flush()
+    
+    def flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning(f"Could not export {len(batch)} spans: {str(e)}")
+    
+    def shutdown(self, timeout: float = 5):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        else:
+            self.flush()
+
+
+def _create_processor() -> Optional[BatchSpanProcessor]:
+    if TRACING_EXPORTER == 'file':
+        return BatchSpanProcessor(FileSpanExporter())
+    if TRACING_EXPORTER == 'otlp':
+        return BatchSpanProcessor(OtlpHttpSpanExporter())
+    if TRACING_EXPORTER != 'none':
+        logger.warning(f"Unknown TRACING_EXPORTER {TRACING_EXPORTER!r}, tracing is off")
+    return None
+
+
+_processor = _create_processor()
+
+
+def flush():
+    """Export the queued spans now (export pool workers, after each job)"""
+    
+    if _processor is not None:
+        _processor.flush()
+
+
+def shutdown():
+    """Export the spans still queued (app shutdown)"""
+    
+    if _processor is not None:
+        _processor.shutdown()
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the server span of each HTTP request; answers
+    carry X-Trace-Id so a slow response can be looked up afterwards"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not TRACING_ENABLED:
+            return await self.app(scope, receive, send)
+        
+        headers = dict(scope.get('headers') or [])
+        remote_parent = parse_traceparent(headers.get(b'traceparent', b'').decode('latin-1'))
+        request_span = start_span(scope['method'], SERVER, {
+            'http.request.method': scope['method'],
+            'url.path': scope['path']
+        }, remote_parent=remote_parent)
+        token = _current_span.set(request_span)
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                message.setdefault('headers', [])
+                message['headers'] = list(message['headers']) + [(b'x-trace-id', request_span.trace_id.encode())]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            request_span.record_error(e)
+            raise
+        finally:
+            route = getattr(scope.get('route'), 'path', None)
+            if route:
+                request_span.name = f"{scope['method']} {route}"
+                request_span.set_attribute('http.route', route)
+            request_span.set_attribute('http.response.status_code', status)
+            if status >= 500 and request_span.error is None:
+                request_span.error = f"HTTP {status}"
+            _current_span.reset(token)
+            request_span.end()
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """pymongo command listener opening a client span per MongoDB command.
+    Motor runs commands in threads with a copy of the caller's context, so the
+    spans land under the request that issued them."""
+    
+    def __init__(self):
+        self._spans: Dict[Tuple, Span] = {}
+    
+    def started(self, event):
+        # Background loops (webhooks, usage flushes) would each start a trace per poll
+        if _current_span.get() is None:
+            return
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            target = event.command.get('collection', '')
+        self._spans[(event.connection_id, event.request_id)] = start_span(
+            f"mongodb.{event.command_name}", CLIENT, {
+                'db.system': 'mongodb',
+                'db.name': event.database_name,
+                'db.operation': event.command_name,
+                'db.mongodb.collection': target
+            }
+        )
+    
+    def succeeded(self, event):
+        command_span = self._spans.pop((event.connection_id, event.request_id), None)
+        if command_span is not None:
+            command_span.end()
+    
+    def failed(self, event):
+        command_span = self._spans.pop((event.connection_id, event.request_id), None)
+        if command_span is not None:
+            command_span.error = str(event.failure)
+            command_span.end()
+
+
+def install_log_correlation():
+    """Give every log record trace_id and span_id attributes ("-" outside a span)"""
+    
+    previous = logging.getLogRecordFactory()
+    
+    def record_factory(*args, **kwargs):
+        record = previous(*args, **kwargs)
+        current = _current_span.get()
+        record.trace_id = current.trace_id if current is not None else '-'
+        record.span_id = current.span_id if current is not None else '-'
+        return record
+    
+    logging.setLogRecordFactory(record_factory)
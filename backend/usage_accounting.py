@@ -0,0 +1,226 @@
+"""
+OpenAI token and cost accounting.
+Every chat completion is recorded with its tokens, latency and estimated cost,
+attributed to the project, user and language of the request that made it (set
+with usage_scope). Records are buffered in memory and written to the
+openai_usage collection in batches, off the request path.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Records written together in one insert_many
+USAGE_BATCH_SIZE = int(os.getenv('USAGE_BATCH_SIZE', '50'))
+# Seconds between flushes when the batch does not fill up
+USAGE_FLUSH_INTERVAL = float(os.getenv('USAGE_FLUSH_INTERVAL', '5'))
+# Records kept in memory while MongoDB is unreachable; the oldest are dropped beyond this
+USAGE_MAX_BUFFER = int(os.getenv('USAGE_MAX_BUFFER', '10000'))
+# Usage records expire after this many days (TTL index)
+USAGE_RETENTION_DAYS = float(os.getenv('USAGE_RETENTION_DAYS', '400'))
+
+# USD per million (prompt, completion) tokens; OPENAI_PRICES='{"model": [in, out]}' adds or overrides
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    'gpt-4': (30.0, 60.0),
+    'gpt-4-turbo': (10.0, 30.0),
+    'gpt-4o': (2.5, 10.0),
+    'gpt-4o-mini': (0.15, 0.6),
+    'gpt-3.5-turbo': (0.5, 1.5)
+}
+MODEL_PRICES.update({model: tuple(prices) for model, prices in json.loads(os.getenv('OPENAI_PRICES') or '{}').items()})
+
+# Material each prompt kind (OfferForgeAI._complete operation) belongs to
+PROMPT_MATERIALS = {
+    'headline': 'offer',
+    'proof': 'offer',
+    'bonus': 'offer',
+    'guarantee': 'offer',
+    'price': 'offer',
+    'vsl': 'vsl',
+    'email': 'emails',
+    'social': 'social'
+}
+
+# Fields usage can be grouped by in summaries
+GROUP_FIELDS = ('day', 'user_id', 'project_id', 'language', 'kind', 'material', 'model')
+
+# Attribution of the completions made while handling the current request
+usage_context: ContextVar[Dict[str, Any]] = ContextVar('usage_context', default={})
+
+
+@contextmanager
+def usage_scope(**attributes):
+    """Attribute the completions made inside the block (project_id, user_id, language)"""
+    
+    token = usage_context.set({**usage_context.get(), **attributes})
+    try:
+        yield
+    finally:
+        usage_context.reset(token)
+
+
+def model_prices(model: str) -> Optional[Tuple[float, float]]:
+    """Prices of a model, matching dated snapshots ("gpt-4o-2024-08-06") by longest prefix"""
+    
+    if model in MODEL_PRICES:
+        return MODEL_PRICES[model]
+    matches = [name for name in MODEL_PRICES if model.startswith(f"{name}-")]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost, or None for models without a known price"""
+    
+    prices = model_prices(model)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class UsageRecorder:
+    """Buffers completion usage records and writes them to MongoDB in batches"""
+    
+    def __init__(
+        self,
+        db,
+        batch_size: int = USAGE_BATCH_SIZE,
+        flush_interval: float = USAGE_FLUSH_INTERVAL,
+        max_buffer: int = USAGE_MAX_BUFFER
+    ):
+        self.collection = db.openai_usage
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.dropped = 0
+    
+    def record(self, kind: str, model: str, latency: float, usage=None, outcome: str = 'ok'):
+        """Queue one completion (called on the event loop, right after the API call)"""
+        
+        prompt_tokens = getattr(usage, 'prompt_tokens', None) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', None) or 0
+        context = usage_context.get()
+        
+        self._buffer.append({
+            'created_at': datetime.utcnow(),
+            'project_id': context.get('project_id'),
+            'user_id': context.get('user_id'),
+            'language': context.get('language'),
+            'kind': kind,
+            'material': PROMPT_MATERIALS.get(kind, kind),
+            'model': model,
+            'outcome': outcome,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'latency_ms': round(latency * 1000, 1),
+            'cost_usd': estimate_cost(model, prompt_tokens, completion_tokens)
+        })
+        
+        if len(self._buffer) > self.max_buffer:
+            del self._buffer[0]
+            self.dropped += 1
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def flush(self) -> int:
+        """Write the buffered records; returns how many were written"""
+        
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except Exception as e:
+            # Kept for the next flush, ahead of newer records
+            logger.error(f"Could not write {len(batch)} OpenAI usage records: {str(e)}")
+            self._buffer = (batch + self._buffer)[-self.max_buffer:]
+            return 0
+        return len(batch)
+    
+    async def start(self):
+        """Start the background flush loop (app startup)"""
+        
+        if self._task is not None:
+            return
+        
+        try:
+            await self.collection.create_index('created_at', expireAfterSeconds=int(USAGE_RETENTION_DAYS * 86400))
+            await self.collection.create_index([('user_id', 1), ('created_at', 1)])
+            await self.collection.create_index([('project_id', 1), ('created_at', 1)])
+        except Exception as e:
+            logger.warning(f"Could not create OpenAI usage indexes: {str(e)}")
+        
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+    
+    async def stop(self, timeout: float = 10):
+        """Stop the loop and write what is still buffered (app shutdown)"""
+        
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+        await self.flush()
+    
+    async def summary(
+        self,
+        group_by: List[str],
+        match: Dict[str, Any],
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Usage totals per combination of group_by fields, most expensive first"""
+        
+        keys = {
+            field: {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}} if field == 'day' else f'${field}'
+            for field in group_by
+        }
+        pipeline = [
+            {'$match': match},
+            {'$group': {
+                '_id': keys,
+                'requests': {'$sum': 1},
+                'errors': {'$sum': {'$cond': [{'$eq': ['$outcome', 'error']}, 1, 0]}},
+                'prompt_tokens': {'$sum': '$prompt_tokens'},
+                'completion_tokens': {'$sum': '$completion_tokens'},
+                'total_tokens': {'$sum': '$total_tokens'},
+                'cost_usd': {'$sum': '$cost_usd'},
+                'avg_latency_ms': {'$avg': '$latency_ms'},
+                'max_latency_ms': {'$max': '$latency_ms'}
+            }},
+            {'$sort': {'cost_usd': -1, 'total_tokens': -1}},
+            {'$limit': limit}
+        ]
+        
+        buckets = []
+        async for row in self.collection.aggregate(pipeline):
+            group = row.pop('_id') or {}
+            row['cost_usd'] = round(row['cost_usd'] or 0, 6)
+            row['avg_latency_ms'] = round(row['avg_latency_ms'] or 0, 1)
+            buckets.append({**group, **row})
+        return buckets
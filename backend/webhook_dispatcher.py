@@ -0,0 +1,377 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from webhook_urls import WEBHOOK_DEFAULT_URL, resolve_endpoint_address, validate_webhook_url
+
+logger = logging.getLogger(__name__)
+
+# When set, every request carries X-OfferForge-Signature: sha256=<hmac of the body>
+WEBHOOK_SIGNING_SECRET = os.getenv('WEBHOOK_SIGNING_SECRET')
+# Events sent together in one request to the same endpoint
+WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', '20'))
+# Endpoints delivered to concurrently
+WEBHOOK_MAX_PARALLEL = int(os.getenv('WEBHOOK_MAX_PARALLEL', '8'))
+# Attempts before a delivery is dead-lettered
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '8'))
+# Retry delay: base * 2^(attempt - 1) seconds, capped, with jitter
+WEBHOOK_BACKOFF_BASE = float(os.getenv('WEBHOOK_BACKOFF_BASE', '2'))
+WEBHOOK_BACKOFF_MAX = float(os.getenv('WEBHOOK_BACKOFF_MAX', '900'))
+# Per-request timeout in seconds
+WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', '10'))
+# Seconds between queue polls when nothing wakes the dispatcher up
+WEBHOOK_POLL_INTERVAL = float(os.getenv('WEBHOOK_POLL_INTERVAL', '5'))
+# Delivered events are kept this long for inspection (TTL index)
+WEBHOOK_RETENTION_DAYS = float(os.getenv('WEBHOOK_RETENTION_DAYS', '7'))
+
+# Delivery states; "dead" is the dead-letter state, kept until retried by hand
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DELIVERED = 'delivered'
+DEAD = 'dead'
+
+
+def backoff_delay(attempt: int, base: float = WEBHOOK_BACKOFF_BASE, cap: float = WEBHOOK_BACKOFF_MAX) -> float:
+    """Seconds to wait before retrying after the given failed attempt (1-based).
+    Half of the exponential delay is random so failed batches spread out."""
+    
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return random.uniform(delay / 2, delay)
+
+
+def _retry_after(response: httpx.Response) -> float:
+    """Seconds requested by a Retry-After header, 0 if absent or not a number"""
+    
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', 0)))
+    except ValueError:
+        return 0.0
+
+
+class PinnedAddressTransport(httpx.AsyncBaseTransport):
+    """Sends each request to the address resolve_endpoint_address() checked, so a
+    second DNS answer (rebinding to 127.0.0.1 or 169.254.169.254) is never used.
+    The URL host is swapped for that address; the Host header and the TLS server
+    name keep the host name. Connections are pooled per host name, so a pooled
+    connection is only reused for the host it was opened for."""
+    
+    def __init__(self, **transport_options):
+        self._options = transport_options
+        self._transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        port = request.url.port or (443 if request.url.scheme == 'https' else 80)
+        address = await resolve_endpoint_address(host, port)
+        if address is not None:
+            request.url = request.url.copy_with(host=address)
+            request.extensions = {**request.extensions, 'sni_hostname': host}
+        
+        transport = self._transports.get(host)
+        if transport is None:
+            transport = self._transports[host] = httpx.AsyncHTTPTransport(**self._options)
+        return await transport.handle_async_request(request)
+    
+    async def aclose(self):
+        transports, self._transports = list(self._transports.values()), {}
+        for transport in transports:
+            await transport.aclose()
+
+
+class WebhookDispatcher:
+    """Delivers queued webhook events in the background.
+    
+    Events are persisted in MongoDB (webhook_deliveries) before the request that
+    produced them returns. A background task claims due deliveries, sends them
+    in batches per endpoint over a pooled HTTP client, retries failures with
+    exponential backoff and dead-letters them after WEBHOOK_MAX_ATTEMPTS.
+    Claims are leased, so deliveries held by a crashed worker are picked up again.
+    """
+    
+    def __init__(
+        self,
+        db,
+        client: Optional[httpx.AsyncClient] = None,
+        batch_size: int = WEBHOOK_BATCH_SIZE,
+        max_parallel: int = WEBHOOK_MAX_PARALLEL,
+        max_attempts: int = WEBHOOK_MAX_ATTEMPTS,
+        poll_interval: float = WEBHOOK_POLL_INTERVAL,
+        signing_secret: Optional[str] = WEBHOOK_SIGNING_SECRET
+    ):
+        self.collection = db.webhook_deliveries
+        self.batch_size = batch_size
+        self.max_parallel = max_parallel
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.signing_secret = signing_secret
+        # A claim is released when not settled within this time
+        self.lease = timedelta(seconds=WEBHOOK_TIMEOUT * 3)
+        
+        self._client = client
+        self._owns_client = client is None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        
+        self.delivered = 0
+        self.retried = 0
+        self.dead_lettered = 0
+    
+    async def enqueue(
+        self,
+        endpoint: Optional[str],
+        event: str,
+        payload: Dict[str, Any],
+        project_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Persist an event for delivery; returns the delivery id (None if there is no endpoint)"""
+        
+        endpoint = endpoint or WEBHOOK_DEFAULT_URL
+        if not endpoint:
+            return None
+        try:
+            validate_webhook_url(endpoint)
+        except ValueError as e:
+            logger.warning(f"Skipping webhook {event} to {endpoint!r}: {str(e)}")
+            return None
+        
+        now = datetime.utcnow()
+        result = await self.collection.insert_one({
+            'endpoint': endpoint,
+            'event': event,
+            'project_id': project_id,
+            'payload': payload,
+            'status': PENDING,
+            'attempts': 0,
+            'created_at': now,
+            'next_attempt_at': now,
+            'last_error': None
+        })
+        
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return str(result.inserted_id)
+    
+    async def start(self):
+        """Start the background delivery loop (app startup)"""
+        
+        if self._task is not None:
+            return
+        
+        if self._client is None:
+            # Redirects are not followed: they could point past the endpoint checks
+            self._client = httpx.AsyncClient(
+                timeout=WEBHOOK_TIMEOUT,
+                follow_redirects=False,
+                transport=PinnedAddressTransport(
+                    limits=httpx.Limits(max_connections=self.max_parallel * 2, max_keepalive_connections=self.max_parallel)
+                )
+            )
+        
+        try:
+            await self.collection.create_index([('status', 1), ('next_attempt_at', 1)])
+            await self.collection.create_index('claim_id', sparse=True)
+            await self.collection.create_index(
+                'delivered_at',
+                expireAfterSeconds=int(WEBHOOK_RETENTION_DAYS * 86400)
+            )
+        except Exception as e:
+            logger.warning(f"Could not create webhook delivery indexes: {str(e)}")
+        
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self, timeout: float = 10):
+        """Stop the loop after the batches in flight settle (app shutdown)"""
+        
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+        
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _run(self):
+        while not self._stopping:
+            # Cleared first, so an event queued while a batch is being sent is not missed
+            self._wakeup.clear()
+            try:
+                processed = await self.dispatch_due()
+            except Exception as e:
+                logger.error(f"Webhook dispatch failed: {str(e)}")
+                processed = 0
+            
+            # Keep draining while there is work, otherwise sleep until woken up
+            if not processed and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def dispatch_due(self) -> int:
+        """Claim the due deliveries and send them, one request per endpoint batch.
+        Returns how many deliveries were processed."""
+        
+        claimed = await self._claim_due()
+        if not claimed:
+            return 0
+        
+        by_endpoint: Dict[str, List[Dict[str, Any]]] = OrderedDict()
+        for delivery in claimed:
+            by_endpoint.setdefault(delivery['endpoint'], []).append(delivery)
+        
+        batches = [
+            (endpoint, deliveries[i:i + self.batch_size])
+            for endpoint, deliveries in by_endpoint.items()
+            for i in range(0, len(deliveries), self.batch_size)
+        ]
+        await asyncio.gather(*(self._send_batch(endpoint, batch) for endpoint, batch in batches))
+        return len(claimed)
+    
+    async def _claim_due(self) -> List[Dict[str, Any]]:
+        """Atomically mark due deliveries as in flight under a fresh claim id"""
+        
+        now = datetime.utcnow()
+        due = {'$or': [
+            {'status': PENDING, 'next_attempt_at': {'$lte': now}},
+            {'status': IN_FLIGHT, 'locked_until': {'$lte': now}}
+        ]}
+        
+        cursor = self.collection.find(due, {'_id': 1}).sort('next_attempt_at', 1)
+        candidates = await cursor.limit(self.batch_size * self.max_parallel).to_list(None)
+        if not candidates:
+            return []
+        
+        # Only documents still due are claimed, so concurrent workers never share one
+        claim_id = uuid.uuid4().hex
+        await self.collection.update_many(
+            {'_id': {'$in': [doc['_id'] for doc in candidates]}, **due},
+            {'$set': {'status': IN_FLIGHT, 'claim_id': claim_id, 'locked_until': now + self.lease}}
+        )
+        return await self.collection.find({'claim_id': claim_id}).sort('created_at', 1).to_list(None)
+    
+    def _request_body(self, batch: List[Dict[str, Any]]) -> bytes:
+        return json.dumps({
+            'deliveries': [
+                {
+                    'id': str(delivery['_id']),
+                    'event': delivery['event'],
+                    'attempt': delivery['attempts'] + 1,
+                    'payload': delivery['payload']
+                }
+                for delivery in batch
+            ]
+        }, ensure_ascii=False, default=str).encode('utf-8')
+    
+    async def _send_batch(self, endpoint: str, batch: List[Dict[str, Any]]):
+        """POST one batch and record the outcome of every delivery in it"""
+        
+        body = self._request_body(batch)
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'OfferForge-Webhooks/2.0',
+            'X-OfferForge-Batch-Size': str(len(batch))
+        }
+        if self.signing_secret:
+            signature = hmac.new(self.signing_secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+            headers['X-OfferForge-Signature'] = f"sha256={signature}"
+        
+        try:
+            validate_webhook_url(endpoint)
+            # The transport resolves and checks the host at every attempt, then
+            # connects to the address it checked
+            response = await self._client.post(endpoint, content=body, headers=headers)
+        except ValueError as e:
+            await self._record_failure(batch, f"Blocked endpoint: {str(e)}", retryable=False)
+            return
+        except OSError as e:
+            await self._record_failure(batch, f"DNS lookup failed: {str(e)}", retryable=True)
+            return
+        except httpx.HTTPError as e:
+            await self._record_failure(batch, f"{type(e).__name__}: {str(e)}", retryable=True)
+            return
+        
+        if response.is_success:
+            await self._record_success(batch, response.status_code)
+            return
+        
+        # Other client errors will not succeed by retrying
+        status = response.status_code
+        retryable = status >= 500 or status in (408, 425, 429)
+        await self._record_failure(batch, f"HTTP {status}", retryable, status, _retry_after(response))
+    
+    async def _record_success(self, batch: List[Dict[str, Any]], status_code: int):
+        now = datetime.utcnow()
+        await self.collection.update_many(
+            {'_id': {'$in': [delivery['_id'] for delivery in batch]}},
+            {
+                '$set': {'status': DELIVERED, 'delivered_at': now, 'last_status_code': status_code, 'last_error': None},
+                '$inc': {'attempts': 1},
+                '$unset': {'claim_id': '', 'locked_until': ''}
+            }
+        )
+        self.delivered += len(batch)
+    
+    async def _record_failure(
+        self,
+        batch: List[Dict[str, Any]],
+        error: str,
+        retryable: bool,
+        status_code: Optional[int] = None,
+        retry_after: float = 0.0
+    ):
+        now = datetime.utcnow()
+        
+        for delivery in batch:
+            attempts = delivery['attempts'] + 1
+            update = {'attempts': attempts, 'last_error': error, 'last_status_code': status_code}
+            
+            if retryable and attempts < self.max_attempts:
+                delay = max(backoff_delay(attempts), retry_after)
+                update.update(status=PENDING, next_attempt_at=now + timedelta(seconds=delay))
+                self.retried += 1
+            else:
+                update.update(status=DEAD, dead_at=now)
+                self.dead_lettered += 1
+                logger.warning(
+                    f"Webhook {delivery['event']} to {delivery['endpoint']} dead-lettered "
+                    f"after {attempts} attempt(s): {error}"
+                )
+            
+            await self.collection.update_one(
+                {'_id': delivery['_id']},
+                {'$set': update, '$unset': {'claim_id': '', 'locked_until': ''}}
+            )
+    
+    async def retry(self, delivery_id) -> bool:
+        """Put a dead-lettered delivery back in the queue with a fresh attempt budget"""
+        
+        result = await self.collection.update_one(
+            {'_id': delivery_id, 'status': DEAD},
+            {'$set': {'status': PENDING, 'attempts': 0, 'next_attempt_at': datetime.utcnow()}, '$unset': {'dead_at': ''}}
+        )
+        if result.modified_count and self._wakeup is not None:
+            self._wakeup.set()
+        return bool(result.modified_count)
+    
+    async def queue_depth(self) -> int:
+        """Deliveries waiting to be sent or retried"""
+        
+        return await self.collection.count_documents({'status': {'$in': [PENDING, IN_FLIGHT]}})
@@ -0,0 +1,80 @@
+"""
+Checks on outbound webhook URLs, kept free of HTTP client imports so the
+Pydantic models can validate project webhook_url fields with them.
+"""
+
+import asyncio
+import ipaddress
+import os
+import socket
+from typing import Optional
+from urllib.parse import urlparse
+
+# Endpoint used for projects without their own webhook_url (e.g. the CRM)
+WEBHOOK_DEFAULT_URL = os.getenv('WEBHOOK_DEFAULT_URL')
+# Comma-separated hosts; when set, project webhooks may only target these. Listed
+# hosts (and the WEBHOOK_DEFAULT_URL host) may resolve to internal addresses.
+WEBHOOK_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.getenv('WEBHOOK_ALLOWED_HOSTS', '').split(',') if host.strip()
+}
+
+
+def is_public_address(address: str) -> bool:
+    """False for private, loopback, link-local (cloud metadata), reserved and multicast addresses"""
+    
+    ip = ipaddress.ip_address(address.split('%')[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _trusted_hosts() -> set:
+    hosts = set(WEBHOOK_ALLOWED_HOSTS)
+    if WEBHOOK_DEFAULT_URL:
+        hosts.add((urlparse(WEBHOOK_DEFAULT_URL).hostname or '').lower())
+    return hosts
+
+
+def validate_webhook_url(url: str) -> str:
+    """Check a project webhook URL without resolving it; raises ValueError.
+    Addresses behind a host name are checked again at delivery time."""
+    
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError("Webhook URL must be an http(s) URL with a host")
+    if parsed.username or parsed.password:
+        raise ValueError("Webhook URL must not contain credentials")
+    
+    host = parsed.hostname.lower()
+    if host in _trusted_hosts():
+        return url
+    if WEBHOOK_ALLOWED_HOSTS:
+        raise ValueError(f"Webhook host {host} is not allowed")
+    if host == 'localhost' or host.endswith(('.localhost', '.local', '.internal')):
+        raise ValueError(f"Webhook host {host} is not reachable from the internet")
+    try:
+        public = is_public_address(host)
+    except ValueError:
+        return url  # a host name
+    if not public:
+        raise ValueError(f"Webhook address {host} is not a public address")
+    return url
+
+
+async def resolve_endpoint_address(host: str, port: int) -> Optional[str]:
+    """Resolve the endpoint host once and return the address to connect to, after
+    checking every address it resolves to is public; None for trusted hosts, which
+    are resolved as usual. Raises ValueError, or OSError when the host does not resolve."""
+    
+    host = host.lower()
+    if host in _trusted_hosts():
+        return None
+    
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    if not infos:
+        raise OSError(f"Webhook host {host} has no address")
+    for info in infos:
+        address = info[4][0]
+        if not is_public_address(address):
+            raise ValueError(f"Webhook host {host} resolves to non-public address {address}")
+    return infos[0][4][0]
@@ -148,7 +148,9 @@ export default function ProjectDetail() {
     
     setExporting(true);
     try {
-      const response = await fetch(`${BACKEND_URL}/api/export/${project._id}`, {
+      // Exports run as background jobs; the finished file is kept for a while
+      // and can be downloaded (and resumed) from file_url
+      const response = await fetch(`${BACKEND_URL}/api/export/${project._id}/jobs`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -158,19 +160,30 @@ export default function ProjectDetail() {
         })
       });
 
-      if (response.ok) {
-        const result = await response.json();
-        if (result.success) {
-          Alert.alert(
-            'Export Concluído!', 
-            `${exportType.toUpperCase()} gerado com sucesso!`,
-            [
-              { text: 'OK', style: 'default' }
-            ]
-          );
-        }
-      } else {
+      if (!response.ok) {
         Alert.alert('Erro', `Falha ao exportar ${exportType}`);
+        return;
+      }
+
+      let job = await response.json();
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const statusResponse = await fetch(`${BACKEND_URL}/api/export/jobs/${job.job_id}`);
+        if (!statusResponse.ok) break;
+        job = await statusResponse.json();
+      }
+
+      if (job.status === 'completed' && job.file_url) {
+        Alert.alert(
+          'Export Concluído!', 
+          `${exportType.toUpperCase()} gerado com sucesso!`,
+          [
+            { text: 'Fechar', style: 'cancel' },
+            { text: 'Baixar', onPress: () => Linking.openURL(`${BACKEND_URL}${job.file_url}`) }
+          ]
+        );
+      } else {
+        Alert.alert('Erro', job.message || `Falha ao exportar ${exportType}`);
       }
     } catch (error) {
       console.error(`Error exporting ${exportType}:`, error);
@@ -0,0 +1,169 @@
+import io
+import json
+import random
+import zipfile
+import zlib
+
+import pytest
+
+from archive_stream import (
+    COMPRESSION_PROFILES, ChunkSink, CompressionPolicy, build_zip, open_entry, safe_entry_name, stream_zip
+)
+from batch_export import BatchExporter
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Meu Projeto', 'Meu_Projeto'),
+    ('Café Açaí', 'Café_Açaí'),
+    ('..', 'OfferForge_Project'),
+    ('...', 'OfferForge_Project'),
+    ('.hidden', 'hidden'),
+    ('../../etc/passwd', '_.._etc_passwd'),
+    ('a\\b', 'a_b'),
+    ('C:', 'C_'),
+    ('x\x00y\n', 'x_y_'),
+    ('', 'OfferForge_Project'),
+    ('   ', 'OfferForge_Project'),
+    (None, 'OfferForge_Project')
+])
+def test_safe_entry_name(name, expected):
+    assert safe_entry_name(name) == expected
+
+
+def test_safe_entry_name_is_bounded():
+    assert len(safe_entry_name('x' * 1000)) == 100
+
+
+def test_batch_folders_stay_inside_the_archive():
+    used = set()
+    folders = [
+        BatchExporter._folder_for({'_id': project_id, 'name': name}, used)
+        for project_id, name in [('p1', '..'), ('p2', '..'), ('p3', '..\\..\\windows'), ('p4', '')]
+    ]
+    assert folders == ['OfferForge_Project', 'OfferForge_Project_p2', '_.._windows', 'OfferForge_Project_p4']
+    assert not any(folder.startswith('.') or '/' in folder or '\\' in folder for folder in folders)
+
+
+def deflated_size(data: bytes, level: int) -> int:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return len(compressor.compress(data) + compressor.flush())
+
+
+@pytest.mark.parametrize('profile', list(COMPRESSION_PROFILES))
+def test_streamed_entries_use_the_profile_level(profile):
+    document = json.dumps([{'pain': f"dor {i % 50}", 'frequency': i} for i in range(5000)]).encode()
+    chunks = (document[i:i + 4096] for i in range(0, len(document), 4096))
+    archive = build_zip([('materials.json', chunks)], policy=CompressionPolicy(profile))
+    
+    with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+        info = zip_file.getinfo('materials.json')
+        assert zip_file.read('materials.json') == document
+    assert info.compress_type == zipfile.ZIP_DEFLATED
+    assert info.compress_size == deflated_size(document, COMPRESSION_PROFILES[profile]['level'])
+
+
+def test_open_entry_refuses_an_archive_with_another_level():
+    with zipfile.ZipFile(ChunkSink(), 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        with pytest.raises(ValueError):
+            open_entry(zip_file, 'materials.json', CompressionPolicy('size'))
+
+
+def sample_entries():
+    return [
+        ('Projeto/landing_page/index.html', '<html>' + 'Olá mundo ' * 500 + '</html>'),
+        ('Projeto/Projeto_complete.pdf', bytes(range(256)) * 64),
+        ('Projeto/materials/email_1.md', '# Email\n'),
+        ('Projeto/Projeto_materials.json', (chunk.encode() for chunk in ['{"a": ', '"' + 'x' * 100000 + '"', '}']))
+    ]
+
+
+def expected_contents():
+    return {
+        name: data.encode() if isinstance(data, str) else data if isinstance(data, bytes) else b''.join(data)
+        for name, data in sample_entries()
+    }
+
+
+class TestStreamZip:
+    @pytest.mark.parametrize('profile', list(COMPRESSION_PROFILES))
+    def test_round_trip(self, profile):
+        archive = b''.join(stream_zip(sample_entries(), chunk_size=1024, policy=CompressionPolicy(profile)))
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            assert zip_file.testzip() is None
+            assert {name: zip_file.read(name) for name in zip_file.namelist()} == expected_contents()
+            assert [info.filename for info in zip_file.infolist()] == [name for name, _ in sample_entries()]
+    
+    def test_streamed_entry_is_yielded_while_it_is_written(self):
+        data = random.Random(7).randbytes(256 * 1024)
+        produced = []
+        
+        def pieces():
+            for i in range(0, len(data), 8192):
+                produced.append(i)
+                yield data[i:i + 8192]
+        
+        first_chunk_after = None
+        chunks = []
+        for chunk in stream_zip([('export.bin', pieces())], chunk_size=16 * 1024):
+            if first_chunk_after is None:
+                first_chunk_after = len(produced)
+            chunks.append(chunk)
+        
+        # The archive starts flowing before the entry has been fully produced
+        assert first_chunk_after < len(produced)
+        assert max(len(chunk) for chunk in chunks) < 16 * 1024 + 8192 + 1024
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as zip_file:
+            assert zip_file.read('export.bin') == data
+    
+    def test_build_zip_matches_stream_zip(self):
+        archive = build_zip(sample_entries())
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            assert {name: zip_file.read(name) for name in zip_file.namelist()} == expected_contents()
+    
+    def test_empty_archive(self):
+        with zipfile.ZipFile(io.BytesIO(build_zip([]))) as zip_file:
+            assert zip_file.namelist() == []
+
+
+class TestCompressionPolicy:
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            CompressionPolicy('fastest')
+    
+    def test_small_entries_are_stored(self):
+        assert CompressionPolicy().choose('Projeto/materials/email_1.md', b'# Email\n') == (zipfile.ZIP_STORED, None)
+    
+    @pytest.mark.parametrize('profile', list(COMPRESSION_PROFILES))
+    def test_text_is_deflated_at_the_profile_level(self, profile):
+        data = ('Olá mundo ' * 100).encode()
+        level = COMPRESSION_PROFILES[profile]['level']
+        assert CompressionPolicy(profile).choose('index.HTML', data) == (zipfile.ZIP_DEFLATED, level)
+    
+    def test_incompressible_binary_is_stored(self):
+        data = random.Random(7).randbytes(64 * 1024)
+        policy = CompressionPolicy('size')
+        assert policy.estimate_saving(data) < COMPRESSION_PROFILES['size']['min_saving']
+        assert policy.choose('Projeto_complete.pdf', data) == (zipfile.ZIP_STORED, None)
+    
+    def test_compressible_binary_is_deflated(self):
+        data = bytes(range(256)) * 256
+        assert CompressionPolicy('balanced').choose('Projeto_complete.pdf', data) == (zipfile.ZIP_DEFLATED, 4)
+    
+    def test_probe_samples_the_middle_of_large_entries(self):
+        # Compressible header and trailer around incompressible content
+        data = b'\0' * 2000 + random.Random(7).randbytes(200 * 1024) + b'\0' * 2000
+        assert CompressionPolicy().estimate_saving(data) < 0.05
+    
+    def test_streamed_entries_choose_by_extension(self):
+        policy = CompressionPolicy('speed')
+        assert policy.choose_streamed('materials.json') == (zipfile.ZIP_DEFLATED, 1)
+        assert policy.choose_streamed('export.bin') == (zipfile.ZIP_STORED, None)
+    
+    @pytest.mark.parametrize('profile', list(COMPRESSION_PROFILES))
+    def test_archive_entries_follow_the_policy(self, profile):
+        policy = CompressionPolicy(profile)
+        archive = build_zip(sample_entries(), policy=policy)
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            for name, data in expected_contents().items():
+                expected = policy.choose_streamed(name) if name.endswith('.json') else policy.choose(name, data)
+                assert zip_file.getinfo(name).compress_type == expected[0]
@@ -0,0 +1,180 @@
+import asyncio
+import copy
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+import server
+from benchmarks.fixtures import make_project
+from export_cache import DiskArtifactStore, ExportArtifactCache
+
+
+@pytest.fixture
+def project():
+    project = make_project('small')
+    project.update(_id=ObjectId(), updated_at=datetime(2026, 10, 1, 12, 0))
+    project['materials']['landing_page'] = {
+        'template_name': 'mobile_modern',
+        'template_version': 'v1',
+        'html_content': '<html></html>',
+        'css_content': ''
+    }
+    return project
+
+
+class TestCacheKey:
+    def test_unchanged_project_keeps_its_key(self, project):
+        cache = ExportArtifactCache(backend='none')
+        assert cache.key_for(project, 'pdf') == cache.key_for(copy.deepcopy(project), 'pdf')
+        assert cache.key_for(project, 'pdf').startswith(f"{project['_id']}/pdf-")
+    
+    def test_fields_not_exported_do_not_change_the_key(self, project):
+        cache = ExportArtifactCache(backend='none')
+        changed = dict(project, exports=[{'type': 'pdf'}], completion_time=12.5)
+        assert cache.key_for(changed, 'pdf') == cache.key_for(project, 'pdf')
+    
+    @pytest.mark.parametrize('change', [
+        lambda project: project.update(_id=ObjectId()),
+        lambda project: project.update(updated_at=project['updated_at'] + timedelta(seconds=1)),
+        lambda project: project.update(name='Outro nome'),
+        lambda project: project['generated_offer'].update(headline='Nova headline'),
+        lambda project: project['materials']['landing_page'].update(template_version='v2')
+    ])
+    def test_key_follows_what_is_exported(self, project, change):
+        cache = ExportArtifactCache(backend='none')
+        key = cache.key_for(project, 'pdf')
+        changed = copy.deepcopy(project)
+        change(changed)
+        assert cache.key_for(changed, 'pdf') != key
+    
+    def test_key_includes_type_and_variant(self, project):
+        cache = ExportArtifactCache(backend='none')
+        keys = {cache.key_for(project, 'pdf'), cache.key_for(project, 'zip'), cache.key_for(project, 'zip', 'compact')}
+        assert len(keys) == 3
+
+
+class TestDiskArtifactStore:
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        store = DiskArtifactStore(str(tmp_path), max_bytes=300)
+        for key in ('p1/a', 'p1/b', 'p2/c'):
+            store.put(key, b'x' * 100)
+        assert store.get('p1/a') == b'x' * 100  # now the most recently used
+        
+        store.put('p2/d', b'y' * 100)
+        assert store.get('p1/b') is None
+        assert store.get('p1/a') is not None and store.get('p2/c') is not None
+        assert store.total_bytes == 300
+    
+    def test_artifact_larger_than_the_cache_is_not_kept(self, tmp_path):
+        store = DiskArtifactStore(str(tmp_path), max_bytes=100)
+        store.put('p1/a', b'x' * 101)
+        assert store.get('p1/a') is None
+        assert store.total_bytes == 0
+    
+    def test_index_is_rebuilt_from_disk_in_access_order(self, tmp_path):
+        store = DiskArtifactStore(str(tmp_path), max_bytes=200)
+        store.put('p1/a', b'x' * 100)
+        store.put('p1/b', b'x' * 100)
+        os.utime(tmp_path / 'p1' / 'a', (1, 1))
+        
+        restarted = DiskArtifactStore(str(tmp_path), max_bytes=200)
+        restarted.put('p1/c', b'x' * 100)
+        assert restarted.get('p1/a') is None
+        assert restarted.get('p1/b') is not None
+    
+    def test_delete_project(self, tmp_path):
+        store = DiskArtifactStore(str(tmp_path))
+        store.put('p1/a', b'x' * 10)
+        store.put('p2/a', b'x' * 10)
+        store.delete_project('p1')
+        assert store.get('p1/a') is None
+        assert store.get('p2/a') is not None
+        assert store.total_bytes == 10
+
+
+def test_unchanged_project_hits_and_updated_one_misses(tmp_path, project):
+    cache = ExportArtifactCache(backend='disk')
+    cache.store = DiskArtifactStore(str(tmp_path))
+    renders = []
+    
+    async def render():
+        renders.append(1)
+        return b'%PDF-' + str(len(renders)).encode()
+    
+    async def scenario():
+        first = await cache.get_or_render(project, 'pdf', render)
+        assert await cache.get_or_render(copy.deepcopy(project), 'pdf', render) == first
+        
+        updated = dict(project, updated_at=project['updated_at'] + timedelta(minutes=1))
+        assert await cache.get_or_render(updated, 'pdf', render) != first
+        
+        await cache.invalidate_project(str(project['_id']))
+        await cache.get_or_render(project, 'pdf', render)
+    
+    asyncio.run(scenario())
+    assert len(renders) == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+class FakeProjects:
+    def __init__(self, project):
+        self.project = project
+    
+    async def find_one(self, query, *args, **kwargs):
+        return copy.deepcopy(self.project) if self.project and query.get('_id') == self.project['_id'] else None
+    
+    async def update_one(self, query, update):
+        matched = int(self.project is not None and query['_id'] == self.project['_id'])
+        if matched:
+            self.project.update(update['$set'])
+        return SimpleNamespace(matched_count=matched, modified_count=matched)
+    
+    async def delete_one(self, query):
+        deleted = int(self.project is not None and query['_id'] == self.project['_id'])
+        self.project = None
+        return SimpleNamespace(deleted_count=deleted)
+
+
+class TestInvalidationOnChange:
+    """Endpoints that change what an export contains drop the project's cached artifacts"""
+    
+    @pytest.fixture
+    def invalidated(self, monkeypatch, project):
+        invalidated = []
+        
+        async def invalidate_project(project_id):
+            invalidated.append(project_id)
+        
+        async def no_event(project, event):
+            pass
+        
+        async def delete_uploads(project_id):
+            pass
+        
+        monkeypatch.setattr(server, 'db', SimpleNamespace(projects=FakeProjects(project)))
+        monkeypatch.setattr(server.export_cache, 'invalidate_project', invalidate_project)
+        monkeypatch.setattr(server, '_enqueue_project_event', no_event)
+        monkeypatch.setattr(server.pain_uploads, 'delete_project', delete_uploads)
+        return invalidated
+    
+    def test_update(self, invalidated, project):
+        response = TestClient(server.app).put(f"/api/projects/{project['_id']}", json={'name': 'Novo nome'})
+        assert response.status_code == 200
+        assert invalidated == [str(project['_id'])]
+    
+    def test_delete(self, invalidated, project):
+        response = TestClient(server.app).delete(f"/api/projects/{project['_id']}")
+        assert response.status_code == 200
+        assert invalidated == [str(project['_id'])]
+    
+    def test_landing_page_generation(self, invalidated, project, monkeypatch):
+        monkeypatch.setattr(server.landing_generator, 'generate_landing_page', lambda *args: {
+            'template_version': 'v2', 'html': '<html></html>', 'css': '', 'js': '', 'generated_at': '2026-10-18T12:00:00'
+        })
+        response = TestClient(server.app).post(f"/api/generate/landing-page/{project['_id']}")
+        assert response.status_code == 200
+        assert invalidated == [str(project['_id'])]
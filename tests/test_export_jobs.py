@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+import server
+from export_jobs import COMPLETED, parse_byte_range
+
+ARTIFACT = bytes(range(256)) * 40
+ETAG = '"0123456789abcdef0123456789abcdef"'
+
+
+class FakeExportJobs:
+    """Stands in for ExportJobManager: one finished job, artifact kept in memory"""
+    
+    def __init__(self, job, artifact=ARTIFACT):
+        self.job = job
+        self.artifact = artifact
+    
+    async def get(self, job_id):
+        return self.job if self.job and job_id == self.job['_id'] else None
+    
+    async def has_artifact(self, job):
+        return self.artifact is not None
+    
+    def iter_artifact(self, job, start, end):
+        yield self.artifact[start:end + 1]
+
+
+def completed_job(**fields):
+    job = {
+        '_id': ObjectId(),
+        'status': COMPLETED,
+        'filename': 'Projeto.zip',
+        'media_type': 'application/zip',
+        'size': len(ARTIFACT),
+        'etag': ETAG,
+        'expires_at': datetime.utcnow() + timedelta(hours=1)
+    }
+    job.update(fields)
+    return job
+
+
+@pytest.fixture
+def client():
+    return TestClient(server.app)
+
+
+def use_jobs(monkeypatch, job, artifact=ARTIFACT):
+    monkeypatch.setattr(server, 'export_jobs', FakeExportJobs(job, artifact))
+    return f"/api/export/jobs/{job['_id']}/download"
+
+
+class TestParseByteRange:
+    def test_start_and_end(self):
+        assert parse_byte_range('bytes=10-99', 1000) == (10, 99)
+    
+    def test_open_ended(self):
+        assert parse_byte_range('bytes=500-', 1000) == (500, 999)
+    
+    def test_suffix(self):
+        assert parse_byte_range('bytes=-100', 1000) == (900, 999)
+    
+    def test_suffix_longer_than_file(self):
+        assert parse_byte_range('bytes=-5000', 1000) == (0, 999)
+    
+    def test_end_clamped_to_size(self):
+        assert parse_byte_range('bytes=990-5000', 1000) == (990, 999)
+    
+    def test_case_and_whitespace(self):
+        assert parse_byte_range('Bytes= 0-0', 1000) == (0, 0)
+    
+    @pytest.mark.parametrize('header', ['items=0-10', 'bytes=0-1,5-9', 'bytes=a-b', 'bytes=5-x'])
+    def test_ignored(self, header):
+        assert parse_byte_range(header, 1000) is None
+    
+    @pytest.mark.parametrize('header', ['bytes=1000-', 'bytes=2000-3000', 'bytes=50-10'])
+    def test_not_satisfiable(self, header):
+        with pytest.raises(ValueError):
+            parse_byte_range(header, 1000)
+
+
+class TestDownloadExportJob:
+    def test_full_download(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job())
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.content == ARTIFACT
+        assert response.headers['accept-ranges'] == 'bytes'
+        assert response.headers['etag'] == ETAG
+        assert response.headers['content-length'] == str(len(ARTIFACT))
+        assert 'attachment' in response.headers['content-disposition']
+    
+    def test_range(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job())
+        response = client.get(url, headers={'Range': 'bytes=10-99'})
+        assert response.status_code == 206
+        assert response.content == ARTIFACT[10:100]
+        assert response.headers['content-range'] == f"bytes 10-99/{len(ARTIFACT)}"
+        assert response.headers['content-length'] == '90'
+    
+    def test_suffix_range(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job())
+        response = client.get(url, headers={'Range': 'bytes=-50'})
+        assert response.status_code == 206
+        assert response.content == ARTIFACT[-50:]
+    
+    def test_matching_if_range(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job())
+        response = client.get(url, headers={'Range': 'bytes=0-9', 'If-Range': ETAG})
+        assert response.status_code == 206
+        assert response.content == ARTIFACT[:10]
+    
+    def test_stale_if_range_gets_whole_file(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job())
+        response = client.get(url, headers={'Range': 'bytes=0-9', 'If-Range': '"other"'})
+        assert response.status_code == 200
+        assert response.content == ARTIFACT
+    
+    def test_unsatisfiable_range(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job())
+        response = client.get(url, headers={'Range': f"bytes={len(ARTIFACT)}-"})
+        assert response.status_code == 416
+        assert response.headers['content-range'] == f"bytes */{len(ARTIFACT)}"
+    
+    def test_head(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job())
+        response = client.head(url, headers={'Range': 'bytes=0-9'})
+        assert response.status_code == 206
+        assert response.headers['content-length'] == '10'
+        assert response.content == b''
+    
+    def test_expired_job(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job(expires_at=datetime.utcnow() - timedelta(minutes=1)))
+        assert client.get(url).status_code == 410
+    
+    def test_missing_artifact(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job(), artifact=None)
+        assert client.get(url).status_code == 410
+    
+    def test_unfinished_job(self, client, monkeypatch):
+        url = use_jobs(monkeypatch, completed_job(status='running'))
+        assert client.get(url).status_code == 409
+    
+    def test_unknown_job(self, client, monkeypatch):
+        monkeypatch.setattr(server, 'export_jobs', FakeExportJobs(None))
+        assert client.get(f"/api/export/jobs/{ObjectId()}/download").status_code == 404
+
+
+class TestExportFileUrl:
+    """file_url of POST /api/export/{project_id} downloads the same document"""
+    
+    @pytest.fixture
+    def project(self, monkeypatch):
+        project = {'_id': ObjectId(), 'name': 'Projeto'}
+        
+        class Projects:
+            async def find_one(self, query, *args, **kwargs):
+                return project if query.get('_id') == project['_id'] else None
+        
+        async def render_export(project, export_type, compact=False):
+            return b'{}'
+        
+        monkeypatch.setattr(server, 'db', type('FakeDb', (), {'projects': Projects()})())
+        monkeypatch.setattr(server, '_render_export', render_export)
+        return project
+    
+    def test_compact_json_keeps_compact(self, client, project):
+        body = {'project_id': str(project['_id']), 'export_type': 'json', 'compact': True}
+        response = client.post(f"/api/export/{project['_id']}", json=body)
+        assert response.status_code == 200
+        assert response.json()['file_url'] == f"/api/export/{project['_id']}/download?export_type=json&compact=true"
+    
+    def test_indented_json(self, client, project):
+        body = {'project_id': str(project['_id']), 'export_type': 'json'}
+        response = client.post(f"/api/export/{project['_id']}", json=body)
+        assert response.json()['file_url'] == f"/api/export/{project['_id']}/download?export_type=json"
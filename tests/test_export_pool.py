@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import pytest
+
+from export_pool import ExportPoolBusy, ExportPoolTimeout, ExportWorkerPool
+
+
+def slow_job(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def test_thread_mode_keeps_the_slot_until_a_timed_out_job_finishes():
+    pool = ExportWorkerPool(max_workers=0, max_queue=1, timeout=0.05)
+    
+    async def scenario():
+        with pytest.raises(ExportPoolTimeout):
+            await pool.run(slow_job, 0.3)
+        # The job is still rendering in its thread
+        assert pool.depth == 1
+        with pytest.raises(ExportPoolBusy):
+            await pool.run(slow_job, 0)
+        
+        await asyncio.sleep(0.4)
+        assert pool.depth == 0
+        assert await pool.run(slow_job, 0.01, timeout=1) == 0.01
+    
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
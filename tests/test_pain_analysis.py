@@ -0,0 +1,107 @@
+import io
+
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import make_pain_csv
+from models import PainPoint, PainResearch
+from pain_analysis import (
+    PainAggregator, _sniff_delimiter, analyze_pain_research, normalize_texts, rank_pains, read_pain_csv
+)
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['description', 'frequency', 'source', 'category'])
+
+
+def test_normalize_texts():
+    texts = pd.Series(['Sem TEMPO!', 'sem tempo', '  Não  consigo... ', '???'])
+    assert normalize_texts(texts).tolist() == ['sem tempo', 'sem tempo', 'nao consigo', '']
+
+
+def test_rank_pains_merges_wording_variants():
+    ranked = rank_pains(frame([
+        ('Sem tempo', 3, 'manual', None),
+        ('sem tempo!', 5, 'csv', 'rotina'),
+        ('Caro demais', 6, 'csv', 'preço'),
+        ('SEM TEMPO', 1, 'csv', None),
+        ('???', 50, 'csv', None)
+    ]), top_k=5)
+    
+    assert [(pain.description, pain.frequency, pain.mentions) for pain in ranked] == [
+        ('sem tempo!', 9, 3),
+        ('Caro demais', 6, 1)
+    ]
+    assert ranked[0].sources == ['manual', 'csv']
+    assert ranked[0].category == 'rotina'
+
+
+def test_rank_pains_keeps_listing_order_on_ties():
+    ranked = rank_pains(frame([('B', 2, 'csv', None), ('A', 2, 'csv', None), ('C', 1, 'csv', None)]), top_k=2)
+    assert [pain.description for pain in ranked] == ['B', 'A']
+
+
+def test_read_pain_csv_columns():
+    data = read_pain_csv("Dor,Frequência,Categoria\nSem tempo,3,rotina\nCaro,abc,\n")
+    assert data['description'].tolist() == ['Sem tempo', 'Caro']
+    assert data['frequency'].tolist() == [3, 1]
+    assert data['category'].isna().tolist() == [False, True]
+
+
+def test_analyze_pain_research_merges_manual_points_and_csv():
+    analysis = analyze_pain_research(PainResearch(
+        pain_points=[PainPoint(description='Sem tempo', frequency=2, source='manual')],
+        csv_data="dor,frequencia\nsem tempo,3\nCaro,1\n",
+        reviews=['Ótimo', 'ótimo', 'Bom']
+    ))
+    assert [(pain.description, pain.frequency) for pain in analysis.top_pains] == [('sem tempo', 3 + 2), ('Caro', 1)]
+    assert analysis.total_mentions == 6
+    assert analysis.distinct_pains == 2
+    assert analysis.reviews == ['Ótimo', 'Bom']
+
+
+@pytest.mark.parametrize('sample, delimiter', [
+    (b'dor,frequencia\nsem tempo,3\n', ','),
+    (b'dor;frequ\xc3\xaancia\nsem tempo;3\ncaro;2\n', ';'),
+    (b'dor\tfrequencia\nsem tempo\t3\n', '\t'),
+    (b'', ',')
+])
+def test_sniff_delimiter(sample, delimiter):
+    assert _sniff_delimiter(sample) == delimiter
+
+
+class TestPainAggregator:
+    def test_chunked_upload_ranks_like_a_single_pass(self):
+        csv_bytes = make_pain_csv(3000, distinct=150).encode()
+        
+        whole = PainAggregator()
+        whole.add_csv(io.BytesIO(csv_bytes), chunk_rows=10 ** 6)
+        chunked = PainAggregator()
+        chunked.add_csv(io.BytesIO(csv_bytes), chunk_rows=128)
+        
+        assert chunked.rows == whole.rows == 3000
+        assert chunked.total_mentions == whole.total_mentions
+        assert chunked.distinct_pains == whole.distinct_pains
+        assert chunked.top(20) == whole.top(20)
+        assert not chunked.dropped
+    
+    def test_semicolon_csv_with_bom(self):
+        aggregator = PainAggregator()
+        aggregator.add_csv(io.BytesIO('﻿dor;frequência\nSem tempo;3\nsem tempo!;2\nCaro;1\n'.encode('utf-8')))
+        assert [(pain.description, pain.frequency, pain.mentions) for pain in aggregator.top(5)] == [
+            ('Sem tempo', 5, 2),
+            ('Caro', 1, 1)
+        ]
+    
+    def test_prunes_rarest_pains_past_twice_max_keys(self):
+        aggregator = PainAggregator(max_keys=2)
+        aggregator.add(frame([(f"dor {i}", i + 1, 'csv', None) for i in range(4)]))
+        assert aggregator.distinct_pains == 4
+        assert not aggregator.dropped
+        
+        aggregator.add(frame([('dor 9', 10, 'csv', None)]))
+        assert aggregator.dropped
+        assert [pain.description for pain in aggregator.top(5)] == ['dor 9', 'dor 3']
+        # Counted before pruning
+        assert aggregator.rows == 5
+        assert aggregator.total_mentions == 1 + 2 + 3 + 4 + 10
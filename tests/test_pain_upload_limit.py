@@ -0,0 +1,86 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from pain_uploads import PainUploadLimitMiddleware
+
+BOUNDARY = 'offerforge-test-boundary'
+MAX_BYTES = 4096
+
+
+def multipart_body(data: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="dores.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def make_client():
+    app = FastAPI()
+    app.state.parsed = 0
+    
+    @app.post("/api/projects/{project_id}/pain-research/csv")
+    async def upload(project_id: str, file: UploadFile = File(...)):
+        app.state.parsed += 1
+        return {"size": len(await file.read())}
+    
+    # In the order server.py adds them: CORS wraps the limiter
+    app.add_middleware(PainUploadLimitMiddleware, max_bytes=MAX_BYTES)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    return app, TestClient(app)
+
+
+def post(client, content, **headers):
+    return client.post(
+        "/api/projects/p1/pain-research/csv",
+        content=content,
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **headers}
+    )
+
+
+def test_upload_within_limit():
+    app, client = make_client()
+    response = post(client, multipart_body(b"dor,frequencia\nSem tempo,3\n"))
+    assert response.status_code == 200
+    assert response.json() == {"size": 27}
+
+
+def test_content_length_over_limit_is_refused_before_parsing():
+    app, client = make_client()
+    response = post(client, multipart_body(b"x" * MAX_BYTES * 2))
+    assert response.status_code == 413
+    assert app.state.parsed == 0
+
+
+def test_streamed_body_is_cut_off_at_the_limit():
+    app, client = make_client()
+    body = multipart_body(b"x" * MAX_BYTES * 4)
+    # A generator is sent chunked, without Content-Length
+    chunks = (body[i:i + 1024] for i in range(0, len(body), 1024))
+    response = post(client, chunks)
+    assert response.status_code == 413
+    assert app.state.parsed == 0
+
+
+def test_refusal_is_readable_cross_origin():
+    app, client = make_client()
+    response = post(client, multipart_body(b"x" * MAX_BYTES * 2), Origin="https://app.offerforge.example")
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert "CSV larger than" in response.json()["detail"]
+
+
+def test_streamed_refusal_is_readable_cross_origin():
+    app, client = make_client()
+    body = multipart_body(b"x" * MAX_BYTES * 4)
+    chunks = (body[i:i + 1024] for i in range(0, len(body), 1024))
+    response = post(client, chunks, Origin="https://app.offerforge.example")
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "*"
+
+
+def test_other_routes_are_not_limited():
+    app, client = make_client()
+    response = client.post("/api/projects/p1/other", content=b"x" * MAX_BYTES * 2)
+    assert response.status_code == 404
@@ -0,0 +1,40 @@
+import pytest
+
+import profiler
+from profiler import read_profile, sign_profile_header, verify_profile_header
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILER_SECRET', 'test-secret')
+    return 'test-secret'
+
+
+def test_signed_header_is_accepted_once(secret):
+    header = sign_profile_header('post', '/api/export/p1', secret=secret)
+    assert verify_profile_header(header, 'POST', '/api/export/p1')
+    assert not verify_profile_header(header, 'POST', '/api/export/p1')
+
+
+def test_header_is_bound_to_method_path_and_secret(secret):
+    header = sign_profile_header('POST', '/api/export/p1', secret=secret)
+    assert not verify_profile_header(header, 'GET', '/api/export/p1')
+    assert not verify_profile_header(header, 'POST', '/api/export/p2')
+    assert not verify_profile_header(sign_profile_header('POST', '/api/export/p1', secret='other'), 'POST', '/api/export/p1')
+
+
+def test_expired_or_malformed_header_is_refused(secret):
+    assert not verify_profile_header(sign_profile_header('GET', '/api/health', ttl=-1, secret=secret), 'GET', '/api/health')
+    assert not verify_profile_header('not-a-header', 'GET', '/api/health')
+    assert not verify_profile_header('9999999999.abc', 'GET', '/api/health')
+
+
+def test_read_profile_only_accepts_profile_ids(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILE_DIR', str(tmp_path))
+    (tmp_path / '20261018-101500-0a1b2c3d.folded').write_text('# api\na;b 1\n')
+    (tmp_path / '20261018-101500-0a1b2c3d.worker-42.folded').write_text('# worker\nc;d 2\n')
+    (tmp_path / '20261018-101501-ffffffff.folded').write_text('# other\ne;f 3\n')
+    
+    assert read_profile('20261018-101500-0a1b2c3d') == '# api\na;b 1\n# worker\nc;d 2\n'
+    for profile_id in ('2026*', '20261018-10150?-*', '../20261018-101500-0a1b2c3d', '20261018-101500-0A1B2C3D'):
+        assert read_profile(profile_id) is None